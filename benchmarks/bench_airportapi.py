@@ -0,0 +1,50 @@
+"""Repeated airport lookups: one pooled client vs a new session per lookup
+
+Runs against a local stand-in server, so it measures connection setup
+only; against the real HTTPS API the pooled client also skips DNS and
+TLS. Run with ``python benchmarks/bench_airportapi.py``.
+"""
+import asyncio
+import os
+import sys
+import time
+
+import aiohttp
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "flightplanner"))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tests"))
+
+from airportapi import AirportAPIClient  # noqa: E402
+from test_airportapi import StandInAPI  # noqa: E402
+
+LOOKUPS = 500
+
+
+async def per_lookup_sessions(url):
+    # What lookup_airport did before: a fresh session for every code
+    for _ in range(LOOKUPS):
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f"{url}/airports", params={"iata_code": "SYD", "api_key": "demo"}) as response:
+                await response.json()
+
+
+async def pooled_client(url):
+    client = AirportAPIClient(base_url=url)
+    try:
+        for _ in range(LOOKUPS):
+            await client.fetch_airport("SYD", timeout=2)
+    finally:
+        await client.close()
+
+
+async def main():
+    async with StandInAPI() as api:
+        for name, bench in (("new session per lookup", per_lookup_sessions), ("pooled client", pooled_client)):
+            started = time.perf_counter()
+            await bench(api.url)
+            elapsed = time.perf_counter() - started
+            print(f"{name:>24}: {elapsed / LOOKUPS * 1e6:8.0f} µs per lookup")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
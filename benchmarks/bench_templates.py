@@ -0,0 +1,88 @@
+"""Flight plan embeds: compiled templates vs the old per-airline builders
+
+``old_builder`` is the Qantas branch of the build_flight_plan_embed that
+predates templates.py: an Embed built up with add_field and f-strings on
+every call. Run with ``python benchmarks/bench_templates.py``.
+"""
+import os
+import sys
+import time
+
+import discord
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "flightplanner"))
+
+from templates import flight_plan_values, render  # noqa: E402
+
+RENDERS = 10000
+ROUNDS = 10
+
+
+class Session:
+    flight_number = "QF1"
+    aircraft = "A380-800"
+    departure_code = "SYD"
+    departure_name = "Sydney Kingsford Smith"
+    combined_timestamp = 1800000000
+    arrival_code = "LHR"
+    arrival_name = "London Heathrow"
+    arrival_timestamp = 1800080000
+    route_distance = 17016
+    block_minutes = 1350
+
+
+def old_builder(session):
+    arrival_value = f"**{session.arrival_code}** {session.arrival_name}"
+    if session.arrival_timestamp:
+        arrival_value += f"\n<t:{session.arrival_timestamp}:F> (est.)"
+    route_details = [
+        f"**Distance:** {session.route_distance:,} km",
+        f"**Block Time:** ~{session.block_minutes // 60}h {session.block_minutes % 60:02d}m",
+    ]
+    embed = discord.Embed(title="", description="", color=0xE40000)
+    embed.set_thumbnail(url="https://1000logos.net/wp-content/uploads/2017/05/Qantas-Logo-1536x966.png")
+    embed.add_field(name="<:QFtail2:1401856972180947035> FLIGHT CONFIRMATION",
+                    value=f"**Flight {session.flight_number}** • {session.aircraft}", inline=False)
+    embed.add_field(name="<:Departing:1399308427267801138> DEPARTURE",
+                    value=f"**{session.departure_code}** {session.departure_name}\n<t:{session.combined_timestamp}:F>\n<t:{session.combined_timestamp}:R>",
+                    inline=True)
+    embed.add_field(name="<:Landing:1399308429801029692> ARRIVAL", value=arrival_value, inline=True)
+    embed.add_field(name="​", value="​", inline=False)
+    details = [
+        f"<:Australia:1399308387866640508> **Route:** {session.departure_code} → {session.arrival_code}",
+        f"<:QFseatbelt:1401010857928032316> **Aircraft:** {session.aircraft}",
+        *route_details,
+        "<:Announcment:1399308384502808588> **Status:** Confirmed",
+    ]
+    embed.add_field(name="<:External:1399308477897244705> FLIGHT INFORMATION", value="\n".join(details), inline=False)
+    embed.add_field(name="✈️ AMENITIES & SERVICES",
+                    value="<:QFwifi:1401010833831759922> Wi-Fi Available  •  <:QFmail:1399308493910966322> In-Flight Service  •  <:Link:1399308473342099507> Entertainment",
+                    inline=False)
+    embed.set_footer(text="Qantas Airways • The Spirit of Australia",
+                     icon_url="https://1000logos.net/wp-content/uploads/2017/05/Qantas-Logo-1536x966.png")
+    return embed
+
+
+def template(session):
+    return render("flight_plan", "Qantas", flight_plan_values(session))
+
+
+def main():
+    session = Session()
+    builders = (("old builder", old_builder), ("compiled template", template))
+    # Rounds alternate between builders and the best of each is kept, to
+    # keep scheduler noise out of the comparison
+    best = {}
+    for _ in range(ROUNDS):
+        for name, build in builders:
+            started = time.perf_counter()
+            for _ in range(RENDERS):
+                build(session)
+            elapsed = time.perf_counter() - started
+            best[name] = min(best.get(name, elapsed), elapsed)
+    for name, _ in builders:
+        print(f"{name:>18}: {best[name] / RENDERS * 1e6:6.2f} µs per embed")
+
+
+if __name__ == "__main__":
+    main()
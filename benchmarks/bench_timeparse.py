@@ -0,0 +1,82 @@
+"""Departure time and date parsing: one tokenizer vs the old split chains
+
+The old handlers parsed the time and the date from two separate messages
+with replace/split chains and a strptime fallback; the tokenizer reads
+both from one. Run with ``python benchmarks/bench_timeparse.py``.
+"""
+import os
+import sys
+import time
+from datetime import date, datetime, time as dtime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "flightplanner"))
+
+from timeparse import parse_datetime  # noqa: E402
+
+ROUNDS = 5000
+TODAY = date(2026, 10, 18)
+INPUTS = (
+    ("14:30", "25/01/2027"),
+    ("2:30 PM", "25-01-27"),
+    ("1430", "25 Jan 2027"),
+    ("9:05am", "tomorrow"),
+)
+
+
+def old_time(time_input):
+    if ':' in time_input:
+        time_parts = time_input.replace(' ', '').upper()
+        is_pm = 'PM' in time_parts
+        is_am = 'AM' in time_parts
+        time_parts = time_parts.replace('AM', '').replace('PM', '')
+        hours, minutes = time_parts.split(':')
+        hours = int(hours)
+        minutes = int(minutes)
+        if is_pm and hours != 12:
+            hours += 12
+        elif is_am and hours == 12:
+            hours = 0
+        return dtime(hour=hours, minute=minutes)
+    if len(time_input) == 4 and time_input.isdigit():
+        return dtime(hour=int(time_input[:2]), minute=int(time_input[2:]))
+    raise ValueError("Invalid time")
+
+
+def old_date(date_input, today):
+    date_input = date_input.lower()
+    if date_input == "today":
+        return today
+    if date_input == "tomorrow":
+        return date.fromordinal(today.toordinal() + 1)
+    for separator in ['/', '-', ' ']:
+        if separator in date_input:
+            parts = date_input.split(separator)
+            if len(parts) == 3:
+                try:
+                    year = int(parts[2])
+                    return date(year + 2000 if year < 100 else year, int(parts[1]), int(parts[0]))
+                except (ValueError, IndexError):
+                    continue
+    return datetime.strptime(date_input.title(), "%d %b %Y").date()
+
+
+def two_messages(time_input, date_input):
+    return old_time(time_input), old_date(date_input, TODAY)
+
+
+def one_message(time_input, date_input):
+    return parse_datetime(f"{time_input} on {date_input}", TODAY)
+
+
+def main():
+    for name, parse in (("old split chains", two_messages), ("tokenizer", one_message)):
+        started = time.perf_counter()
+        for _ in range(ROUNDS):
+            for time_input, date_input in INPUTS:
+                parse(time_input, date_input)
+        elapsed = time.perf_counter() - started
+        print(f"{name:>16}: {elapsed / (ROUNDS * len(INPUTS)) * 1e6:6.2f} µs per time and date")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""Departure timestamp conversion: memoised zones vs building the zone per call
+
+The per-call variant is what the time and date handlers did before the
+timezones module: ``pytz.timezone()`` and ``localize()`` on every input.
+Run with ``python benchmarks/bench_timezones.py``.
+"""
+import os
+import sys
+import time
+from datetime import date, datetime, time as dtime
+
+import pytz
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "flightplanner"))
+
+from timezones import local_timestamp  # noqa: E402
+
+CONVERSIONS = 20000
+ZONES = ("Australia/Sydney", "America/New_York", "Europe/London", "Asia/Singapore")
+DAY = date(2026, 10, 4)
+
+
+def per_call_zone(zone_name, day, minutes):
+    zone = pytz.timezone(zone_name)
+    naive = datetime.combine(day, dtime(hour=minutes // 60, minute=minutes % 60))
+    return int(zone.localize(naive).timestamp())
+
+
+def main():
+    inputs = [(ZONES[i % len(ZONES)], DAY, (i * 7) % (24 * 60)) for i in range(CONVERSIONS)]
+    for name, convert in (("zone built per call", per_call_zone), ("memoised zone", local_timestamp)):
+        started = time.perf_counter()
+        for zone_name, day, minutes in inputs:
+            convert(zone_name, day, minutes)
+        elapsed = time.perf_counter() - started
+        print(f"{name:>20}: {elapsed / CONVERSIONS * 1e6:6.2f} µs per conversion")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import logging
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "https://airlabs.co/api/v9"
+# Seconds for the whole request, and for connecting to the API host
+DEFAULT_TIMEOUT = 5
+DEFAULT_CONNECT_TIMEOUT = 2
+DEFAULT_POOL_SIZE = 8
+DNS_CACHE_TTL = 300
+
+
+class AirportAPIClient:
+    """Remote airport lookups over one pooled, keep-alive HTTP session
+
+    The session is created once per cog lifetime by :meth:`start` and closed
+    by :meth:`close`, so repeated lookups reuse connections, DNS answers and
+    TLS sessions instead of paying for them on every code.
+    """
+
+    def __init__(
+        self,
+        base_url=DEFAULT_BASE_URL,
+        api_key="demo",
+        timeout=DEFAULT_TIMEOUT,
+        connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+        pool_size=DEFAULT_POOL_SIZE
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.timeout = aiohttp.ClientTimeout(total=timeout, sock_connect=connect_timeout)
+        self.pool_size = pool_size
+        self._session = None
+
+    async def start(self):
+        if self._session and not self._session.closed:
+            return
+        connector = aiohttp.TCPConnector(
+            limit=self.pool_size,
+            limit_per_host=self.pool_size,
+            ttl_dns_cache=DNS_CACHE_TTL,
+            keepalive_timeout=30
+        )
+        self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+
+    async def close(self):
+        if self._session:
+            await self._session.close()
+            self._session = None
+
+    def request_timeout(self, budget):
+        """The client's timeouts with the total capped at ``budget`` seconds"""
+        total = self.timeout.total
+        return aiohttp.ClientTimeout(
+            total=min(total, budget) if total else budget,
+            sock_connect=self.timeout.sock_connect
+        )
+
+    async def fetch_airport(self, iata_code, timeout=None):
+        """Fetch one airport record, or None if the API doesn't know the code
+
+        ``timeout`` shortens the client's total budget for this request; the
+        connect timeout always applies. Network errors, timeouts and 429/5xx
+        responses propagate to the caller.
+        """
+        if self._session is None:
+            await self.start()
+
+        params = {"iata_code": iata_code, "api_key": self.api_key}
+        options = {}
+        if timeout:
+            # Passing timeout=None would disable the session's timeouts entirely
+            options["timeout"] = self.request_timeout(timeout)
+        async with self._session.get(f"{self.base_url}/airports", params=params, **options) as response:
+            if response.status == 429 or response.status >= 500:
+                # The API itself is struggling; let the caller count a failure
+                response.raise_for_status()
+            if response.status != 200:
+                logger.debug("Airport API returned %s for %s", response.status, iata_code)
+                return None
+            data = await response.json()
+
+        if not data.get('response'):
+            return None
+
+        airport = data['response'][0]
+        return {
+            'code': iata_code,
+            'name': airport.get('name', 'Unknown Airport'),
+            'city': airport.get('city', ''),
+            'country': airport.get('country_code', ''),
+            'timezone': airport.get('timezone'),
+            'lat': airport.get('lat'),
+            'lon': airport.get('lng')
+        }
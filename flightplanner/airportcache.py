@@ -0,0 +1,169 @@
+import asyncio
+import heapq
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_SIZE = 2048
+# Found airports barely change; "not found" answers are retried sooner in
+# case the code was only missing upstream for a while
+DEFAULT_TTL = 7 * 24 * 60 * 60
+DEFAULT_NEGATIVE_TTL = 60 * 60
+
+MISSING = object()
+
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key into one in-flight task
+
+    The shared task runs detached from its callers: a caller that is
+    cancelled stops waiting, but the task carries on for everyone else.
+    """
+
+    def __init__(self):
+        self._inflight = {}
+        self.stats = {"calls": 0, "shared": 0}
+
+    def __len__(self):
+        return len(self._inflight)
+
+    async def do(self, key, func, *args):
+        task = self._inflight.get(key)
+        if task is None:
+            self.stats["calls"] += 1
+            task = asyncio.get_running_loop().create_task(func(*args))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.stats["shared"] += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception retrieved even if every caller gave up waiting
+        if not task.cancelled():
+            task.exception()
+
+
+class AirportCache:
+    """LRU cache of remote airport lookups with positive and negative TTLs
+
+    ``None`` is cached as a "not found" answer under the shorter negative TTL
+    so typos don't hit the API on every retry. Concurrent misses for the same
+    code share a single fetch. With a ``path``, entries and per-code usage
+    counts are saved to a JSON file and reloaded on start so the cache
+    survives restarts and knows which codes to warm up.
+    """
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE, ttl=DEFAULT_TTL, negative_ttl=DEFAULT_NEGATIVE_TTL, path=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.path = path
+        # code -> (expires_at, airport or None); wall-clock so it survives restarts
+        self._entries = OrderedDict()
+        self.stats = {"hits": 0, "negative_hits": 0, "misses": 0, "evictions": 0, "expired": 0}
+        self.inflight = SingleFlight()
+        # code -> number of lookups, kept across restarts to drive warm-up
+        self.usage = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, code):
+        """Return the cached airport, None for a cached miss, or MISSING"""
+        entry = self._entries.get(code)
+        if entry is None:
+            self.stats["misses"] += 1
+            return MISSING
+
+        expires_at, airport = entry
+        if expires_at <= time.time():
+            del self._entries[code]
+            self.stats["expired"] += 1
+            self.stats["misses"] += 1
+            return MISSING
+
+        self._entries.move_to_end(code)
+        self.stats["hits" if airport is not None else "negative_hits"] += 1
+        return airport
+
+    def set(self, code, airport):
+        ttl = self.ttl if airport is not None else self.negative_ttl
+        self._entries[code] = (time.time() + ttl, airport)
+        self._entries.move_to_end(code)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def record_use(self, code):
+        self.usage[code] = self.usage.get(code, 0) + 1
+
+    def most_used(self, count):
+        return heapq.nlargest(count, self.usage, key=self.usage.get)
+
+    async def get_or_fetch(self, code, fetch):
+        """Return the cached answer for ``code`` or await ``fetch(code)`` and cache it
+
+        Concurrent callers missing on the same code wait on one shared fetch.
+        Exceptions from ``fetch`` propagate to every waiter and are not cached.
+        """
+        airport = self.get(code)
+        if airport is not MISSING:
+            return airport
+        return await self.inflight.do(code, self._fetch, code, fetch)
+
+    async def _fetch(self, code, fetch):
+        airport = await fetch(code)
+        self.set(code, airport)
+        if airport is None:
+            # Not worth warming up, even if it was counted before
+            self.usage.pop(code, None)
+        return airport
+
+    async def load(self):
+        """Load persisted entries, dropping any that expired while we were down"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            data = await asyncio.to_thread(self._read)
+        except (OSError, ValueError):
+            logger.exception("Failed to load airport cache from %s", self.path)
+            return
+
+        now = time.time()
+        for code, count in data.get("usage", {}).items():
+            self.usage[code] = self.usage.get(code, 0) + count
+        for code, expires_at, airport in data.get("entries", []):
+            if expires_at > now:
+                self._entries[code] = (expires_at, airport)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def save(self):
+        if not self.path:
+            return
+        data = {
+            "entries": [(code, expires_at, airport) for code, (expires_at, airport) in self._entries.items()],
+            "usage": dict(self.usage)
+        }
+        try:
+            await asyncio.to_thread(self._write, data)
+        except OSError:
+            logger.exception("Failed to save airport cache to %s", self.path)
+
+    def _read(self):
+        with open(self.path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write(self, data):
+        # Write then rename so a crash mid-save never leaves a truncated file
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
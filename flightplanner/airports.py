@@ -0,0 +1,131 @@
+import array
+import bisect
+import mmap
+import os
+import struct
+import sys
+
+# File layout (little-endian):
+#   header   MAGIC, version, record count
+#   keys     uint32 per airport, the IATA code packed as an int, sorted ascending
+#   records  fixed-width RECORD per airport, in key order
+#   strings  UTF-8 "name\x1fcity\x1fcountry\x1ftimezone" blobs referenced by records
+MAGIC = b"APT1"
+VERSION = 1
+HEADER = struct.Struct("<4sHxxI")
+RECORD = struct.Struct("<ffIHxx")
+FIELD_SEPARATOR = "\x1f"
+
+DEFAULT_PATH = os.path.join(os.path.dirname(__file__), "data", "airports.dat")
+
+# Airports most of our flights touch; used to rank search results
+POPULAR_AIRPORTS = (
+    'SYD', 'MEL', 'BNE', 'PER', 'ADL', 'CNS', 'OOL', 'CBR', 'DRW', 'HBA', 'LST',
+    'ASP', 'LHR', 'LAX', 'JFK', 'SIN', 'DXB', 'HKG', 'NRT', 'AKL', 'CHC', 'WLG',
+)
+
+
+def pack_code(code):
+    """Pack a 3-letter IATA code into the int used as its sort key"""
+    return int.from_bytes(code.encode("ascii"), "big")
+
+
+def unpack_code(key):
+    return key.to_bytes(3, "big").decode("ascii")
+
+
+class AirportDatabase:
+    """Read-only airport dataset, memory-mapped and binary-searched by IATA code
+
+    Opening the file parses nothing but the header; pages are faulted in by
+    the OS as lookups touch them.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.count = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} airport database")
+
+        keys_start = HEADER.size
+        self._records_start = keys_start + 4 * self.count
+        self._strings_start = self._records_start + RECORD.size * self.count
+
+        self._view = memoryview(self._mm)[keys_start:self._records_start]
+        if sys.byteorder == "little":
+            self._keys = self._view.cast("I")
+        else:
+            self._keys = array.array("I", self._view)
+            self._keys.byteswap()
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, code):
+        return self._find(code) is not None
+
+    def _find(self, code):
+        if len(code) != 3 or not code.isascii():
+            return None
+        key = int.from_bytes(code.encode("ascii"), "big")
+        keys = self._keys
+        index = bisect.bisect_left(keys, key)
+        if index < self.count and keys[index] == key:
+            return index
+        return None
+
+    def _record(self, index):
+        lat, lon, offset, length = RECORD.unpack_from(self._mm, self._records_start + RECORD.size * index)
+        start = self._strings_start + offset
+        name, city, country, timezone = self._mm[start:start + length].decode("utf-8").split(FIELD_SEPARATOR)
+        return {
+            'code': unpack_code(self._keys[index]),
+            'name': name,
+            'city': city,
+            'country': country,
+            'timezone': timezone,
+            # Stored as float32; round off the representation noise
+            'lat': round(lat, 5),
+            'lon': round(lon, 5)
+        }
+
+    def get(self, code):
+        """Return the airport record for ``code`` (upper case), or None"""
+        index = self._find(code)
+        return self._record(index) if index is not None else None
+
+    def __iter__(self):
+        """Iterate every airport record in code order"""
+        for index in range(self.count):
+            yield self._record(index)
+
+    def close(self):
+        if isinstance(self._keys, memoryview):
+            self._keys.release()
+        self._view.release()
+        self._mm.close()
+
+
+def write_database(path, airports):
+    """Write ``airports`` (dicts shaped like :meth:`AirportDatabase.get`) to ``path``"""
+    airports = sorted(airports, key=lambda airport: airport['code'])
+
+    keys = bytearray()
+    records = bytearray()
+    strings = bytearray()
+    for airport in airports:
+        blob = FIELD_SEPARATOR.join(
+            (airport['name'], airport['city'], airport['country'], airport['timezone'])
+        ).encode("utf-8")
+        keys += struct.pack("<I", pack_code(airport['code']))
+        records += RECORD.pack(airport['lat'], airport['lon'], len(strings), len(blob))
+        strings += blob
+
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(airports)))
+        f.write(keys)
+        f.write(records)
+        f.write(strings)
@@ -0,0 +1,175 @@
+import bisect
+import heapq
+import re
+import unicodedata
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+# Score bands; higher is better
+EXACT_CODE = 100
+CODE_PREFIX = 90
+EXACT_TERM = 80
+TERM_PREFIX = 60
+# Trigram similarity (0-1) is scaled into this band
+FUZZY = 50
+# Nudge for well-known airports so they win ties against namesakes
+POPULAR = 3
+# Words too common in airport names to be worth matching on their own
+STOPWORDS = frozenset({"airport", "international", "intl", "regional", "municipal", "aerodrome", "airfield", "field", "the", "of", "de"})
+
+
+def normalize(text):
+    """Lower-case and strip accents so "Zürich" matches "zurich\""""
+    text = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in text if not unicodedata.combining(c)).lower()
+
+
+def trigrams(term):
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class AirportSearchIndex:
+    """Ranked airport search over codes, names and cities
+
+    Prefix matches come from a sorted term list searched with bisect, which
+    behaves like a compact trie without a node per character. Typos are
+    caught by trigram overlap against the same terms. Codes in ``popular``
+    rank above other airports with the same score.
+    """
+
+    def __init__(self, airports, popular=()):
+        # Compact per-airport rows: (code, name, city, country)
+        self.airports = []
+        self._codes = {}
+        term_postings = {}
+
+        for airport in airports:
+            index = len(self.airports)
+            self.airports.append((airport['code'], airport['name'], airport['city'], airport['country']))
+            self._codes[airport['code'].lower()] = index
+
+            words = set(_WORD.findall(normalize(airport['name'])))
+            words -= STOPWORDS
+            city = normalize(airport['city'])
+            words.update(_WORD.findall(city))
+            if city:
+                # Keep multi-word cities ("gold coast") whole as well
+                words.add(city)
+            for word in words:
+                term_postings.setdefault(word, set()).add(index)
+
+        self._sorted_codes = sorted(self._codes)
+        self._popular = {self._codes[code.lower()] for code in popular if code.lower() in self._codes}
+
+        self._terms = sorted(term_postings)
+        self._postings = [tuple(term_postings[term]) for term in self._terms]
+        # Whole city names, so an exact city match outranks a word in a name
+        self._cities = [normalize(airport[2]) for airport in self.airports]
+
+        grams = {}
+        for term_id, term in enumerate(self._terms):
+            for gram in trigrams(term):
+                grams.setdefault(gram, []).append(term_id)
+        self._grams = grams
+
+    @classmethod
+    def from_database(cls, database, popular=()):
+        return cls(iter(database), popular)
+
+    @staticmethod
+    def _prefix_range(items, prefix):
+        start = bisect.bisect_left(items, prefix)
+        end = bisect.bisect_left(items, prefix + "\uffff", start)
+        return range(start, end)
+
+    def _prefix_terms(self, prefix):
+        return self._prefix_range(self._terms, prefix)
+
+    def _fuzzy_terms(self, term, limit=64):
+        query_grams = trigrams(term)
+        counts = {}
+        for gram in query_grams:
+            for term_id in self._grams.get(gram, ()):
+                counts[term_id] = counts.get(term_id, 0) + 1
+
+        scored = []
+        for term_id, shared in counts.items():
+            candidate = self._terms[term_id]
+            # Dice coefficient over trigram sets
+            similarity = 2 * shared / (len(query_grams) + len(candidate) + 1)
+            if similarity >= 0.45:
+                scored.append((similarity, term_id))
+        return heapq.nlargest(limit, scored)
+
+    def search(self, query, limit=10):
+        """Return up to ``limit`` ``(code, name, city, country)`` rows, best first"""
+        query = normalize(query).strip()
+        if not query:
+            return []
+
+        scores = {}
+
+        def offer(index, score):
+            if score > scores.get(index, 0):
+                scores[index] = score
+
+        code_index = self._codes.get(query)
+        if code_index is not None:
+            offer(code_index, EXACT_CODE)
+        if len(query) < 3:
+            # Too short to say much about names; complete codes only
+            for position in self._prefix_range(self._sorted_codes, query):
+                offer(self._codes[self._sorted_codes[position]], CODE_PREFIX)
+            return self._top(scores, limit)
+
+        words = _WORD.findall(query)
+        whole = " ".join(words)
+        # Each word contributes its best term match; matching more words ranks higher
+        word_scores = {}
+        for word in words:
+            best = {}
+            for term_id in self._prefix_terms(word):
+                term = self._terms[term_id]
+                # Shorter completions are closer to what was typed
+                score = EXACT_TERM if term == word else TERM_PREFIX + 10 * len(word) / len(term)
+                for index in self._postings[term_id]:
+                    if score > best.get(index, 0):
+                        best[index] = score
+            for index, score in best.items():
+                word_scores[index] = word_scores.get(index, 0) + score
+        for index, score in word_scores.items():
+            offer(index, score / len(words) + 10 * (len(words) - 1))
+
+        if len(words) > 1:
+            # Multi-word city names ("gold coast") are indexed whole
+            for term_id in self._prefix_terms(whole):
+                for index in self._postings[term_id]:
+                    offer(index, EXACT_TERM + 10 * len(words))
+
+        for index, score in list(scores.items()):
+            if self._cities[index] == whole:
+                offer(index, score + 5)
+
+        if not scores and whole:
+            # Nothing starts with what was typed; assume a typo
+            for similarity, term_id in self._fuzzy_terms(whole):
+                term = self._terms[term_id]
+                for index in self._postings[term_id]:
+                    bonus = 5 if self._cities[index] == term else 0
+                    offer(index, FUZZY * similarity + bonus)
+
+        return self._top(scores, limit)
+
+    def _top(self, scores, limit):
+        popular = self._popular
+        best = heapq.nlargest(
+            limit,
+            scores.items(),
+            # Break ties towards well-known and then international airports
+            key=lambda item: (
+                item[1] + (POPULAR if item[0] in popular else 0),
+                "International" in self.airports[item[0]][1]
+            )
+        )
+        return [self.airports[index] for index, _ in best]
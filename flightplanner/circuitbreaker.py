@@ -0,0 +1,120 @@
+import asyncio
+import logging
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+DEFAULT_FAILURE_THRESHOLD = 3
+DEFAULT_RESET_TIMEOUT = 30
+# Number of recent call latencies kept for percentile reporting
+LATENCY_WINDOW = 256
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling through while the breaker is open"""
+
+
+class CircuitBreaker:
+    """Stops calling a failing dependency until it has had time to recover
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    every call fails fast with :class:`CircuitOpenError`. Once
+    ``reset_timeout`` seconds have passed a single half-open probe is let
+    through; success closes the breaker, failure opens it again. Calls
+    already in flight when it opened don't change its state when they
+    finish.
+    """
+
+    def __init__(self, name, failure_threshold=DEFAULT_FAILURE_THRESHOLD, reset_timeout=DEFAULT_RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.stats = {"calls": 0, "failures": 0, "rejected": 0, "opened": 0, "closed": 0}
+
+    def _transition(self, state):
+        if state == self.state:
+            return
+        logger.info("Circuit breaker %s: %s -> %s", self.name, self.state, state)
+        self.state = state
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+            self.stats["opened"] += 1
+        elif state == CLOSED:
+            self.stats["closed"] += 1
+
+    def allow(self):
+        """Whether a call may go through right now"""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._transition(HALF_OPEN)
+        if self.state == HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self, latency, probe=False):
+        """Record a call that worked; only the half-open ``probe`` closes the breaker
+
+        A slow call admitted while closed can finish after the breaker has
+        opened; its success says nothing about the dependency now, so it
+        doesn't cut the cooldown short.
+        """
+        self.latencies.append(latency)
+        if probe:
+            self._probing = False
+            self._failures = 0
+            self._transition(CLOSED)
+        elif self.state == CLOSED:
+            self._failures = 0
+
+    def record_failure(self, latency, probe=False):
+        self.latencies.append(latency)
+        self.stats["failures"] += 1
+        if probe:
+            self._probing = False
+            self._transition(OPEN)
+        elif self.state == CLOSED:
+            self._failures += 1
+            if self._failures >= self.failure_threshold:
+                self._transition(OPEN)
+
+    async def call(self, func, *args, **kwargs):
+        """Await ``func(*args, **kwargs)`` through the breaker"""
+        if not self.allow():
+            self.stats["rejected"] += 1
+            raise CircuitOpenError(self.name)
+        # allow() only lets one call through while half-open: the probe
+        probe = self.state == HALF_OPEN
+
+        self.stats["calls"] += 1
+        started = time.monotonic()
+        try:
+            result = await func(*args, **kwargs)
+        except asyncio.CancelledError:
+            # Not the dependency's fault; just free the probe slot
+            if probe:
+                self._probing = False
+            raise
+        except Exception:
+            self.record_failure(time.monotonic() - started, probe)
+            raise
+        self.record_success(time.monotonic() - started, probe)
+        return result
+
+    def percentile(self, fraction):
+        """Latency in seconds at ``fraction`` (0-1) over the recent window, or None"""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
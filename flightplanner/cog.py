@@ -1,15 +1,36 @@
+from discord import app_commands
 from discord.ext import commands
 import discord
 import aiohttp
-import pytz
-from datetime import datetime, timedelta
-from confirmations import (
-    DepartureAirportConfirmationView,
-    ArrivalAirportConfirmationView,
-    DepartureTimeConfirmationView,
-    DepartureDateConfirmationView,
-    FlightNumberConfirmationView
-)
+import asyncio
+import csv
+import os
+import time
+import logging
+from typing import Optional
+from circuitbreaker import CircuitBreaker, CircuitOpenError, DEFAULT_FAILURE_THRESHOLD, DEFAULT_RESET_TIMEOUT
+from confirmations import PERSISTENT_BUTTONS, PLAN_CHANNEL_ID, build_flight_plan_embed, build_milestone_embed, mention_channels
+from destinations import Destinations, parse_destinations
+from airportapi import AirportAPIClient, DEFAULT_BASE_URL, DEFAULT_CONNECT_TIMEOUT, DEFAULT_TIMEOUT
+from airportcache import AirportCache, DEFAULT_MAX_SIZE, DEFAULT_NEGATIVE_TTL, DEFAULT_TTL
+from airports import AirportDatabase, POPULAR_AIRPORTS
+from airportsearch import AirportSearchIndex
+from geometry import RouteGeometry, format_block_time
+from inputqueue import UserInputQueue
+from livestatus import DEFAULT_INTERVAL as STATUS_INTERVAL, LiveStatusBoard, status_phases
+from milestones import DEFAULT_MILESTONES, MilestoneScheduler, parse_milestones, scheduled_departure
+from quickplan import FLIGHT_NUMBER, USAGE as QUICK_PLAN_USAGE, QuickPlanArgs, parse_plan_args, validate_flight
+from scheduleimport import BATCH_SIZE as IMPORT_BATCH_SIZE, REQUIRED as IMPORT_REQUIRED, ImportReport, iter_schedule_rows, normalize_row
+from sender import DEFAULT_WORKERS as OUTBOUND_WORKERS, PRIORITY_BULK, PRIORITY_CHECKIN, OutboundScheduler
+from session import FlightSession, Stage
+from settings import get_setting
+from storage import MongoMilestoneBackend, MongoSessionBackend, SQLiteMilestoneBackend, SQLiteSessionBackend
+from stages import PLANNING
+from templates import flight_plan_values
+from timeparse import parse_datetime
+from timezones import DEFAULT_TIMEZONE, airport_timezone, local_now, local_timestamp
+
+logger = logging.getLogger(__name__)
 
 
 class FlightPlannerCog(commands.Cog):
@@ -18,73 +39,460 @@ class FlightPlannerCog(commands.Cog):
     def __init__(self, bot, flight_handler):
         self.bot = bot
         self.flight_handler = flight_handler
-        self.processing_lock = {}
+        self.flight_handler.on_session_expired = self.on_session_expired
+        self.input_queue = UserInputQueue(self.process_input)
+        self.airports = AirportDatabase()
+        # Built off the event loop in cog_load
+        self.airport_search = None
+        self.route_geometry = None
+        # Every post the planner makes goes through this queue
+        self.outbound = OutboundScheduler(int(get_setting(bot, "flightplanner_outbound_workers", OUTBOUND_WORKERS)))
+        self.destinations = Destinations(
+            bot, self.outbound,
+            parse_destinations(get_setting(bot, "flightplanner_destinations"), [PLAN_CHANNEL_ID])
+        )
+        # Check-in closed and other milestones posted automatically before departure
+        self.milestones = MilestoneScheduler(
+            self.post_milestone,
+            parse_milestones(get_setting(bot, "flightplanner_milestones"), DEFAULT_MILESTONES)
+        )
+        # Edits the Status line of posted plans as departure approaches
+        self.live_status = LiveStatusBoard(
+            self.outbound,
+            status_phases(self.milestones.milestones),
+            interval=float(get_setting(bot, "flightplanner_status_interval", STATUS_INTERVAL))
+        )
+        self.warmup_task = None
+        self.startup_stats = {}
+        self.airport_api = AirportAPIClient(
+            base_url=get_setting(bot, "flightplanner_airport_api_url", DEFAULT_BASE_URL),
+            api_key=get_setting(bot, "flightplanner_airport_api_key", "demo"),
+            timeout=float(get_setting(bot, "flightplanner_airport_api_timeout", DEFAULT_TIMEOUT)),
+            connect_timeout=float(get_setting(bot, "flightplanner_airport_api_connect_timeout", DEFAULT_CONNECT_TIMEOUT))
+        )
+        self.airport_breaker = CircuitBreaker(
+            "airport-api",
+            failure_threshold=int(get_setting(bot, "flightplanner_airport_api_failure_threshold", DEFAULT_FAILURE_THRESHOLD)),
+            reset_timeout=float(get_setting(bot, "flightplanner_airport_api_cooldown", DEFAULT_RESET_TIMEOUT))
+        )
+        # Seconds a user's input may wait on the remote API before we fall back
+        self.airport_lookup_budget = float(get_setting(bot, "flightplanner_airport_lookup_budget", 2))
+        self.airport_cache = AirportCache(
+            max_size=int(get_setting(bot, "flightplanner_airport_cache_size", DEFAULT_MAX_SIZE)),
+            ttl=float(get_setting(bot, "flightplanner_airport_cache_ttl", DEFAULT_TTL)),
+            negative_ttl=float(get_setting(bot, "flightplanner_airport_cache_negative_ttl", DEFAULT_NEGATIVE_TTL)),
+            path=get_setting(bot, "flightplanner_airport_cache_path")
+        )
+        self.listener_stats = {"seen": 0, "rejected": 0, "routed": 0}
+        # Stage -> bound parser, precomputed so dispatch is a single lookup
+        self.stage_parsers = {
+            stage: getattr(self, spec.parser)
+            for stage, spec in PLANNING.specs.items()
+            if spec.parser
+        }
+    
+    async def cog_load(self):
+        self.startup_stats["loaded_at"] = time.perf_counter()
+        self.flight_handler.start()
+        self.outbound.start()
+        self.milestones.start()
+        self.live_status.start()
+        # Stateless handlers for every planner button that outlives its session
+        self.bot.add_dynamic_items(*PERSISTENT_BUTTONS)
+        await self.airport_api.start()
+        await self.airport_cache.load()
+        self.warmup_task = asyncio.create_task(self.warm_up())
+        
+        backend = self.create_session_backend()
+        if backend:
+            await self.flight_handler.attach_backend(
+                backend,
+                FlightSession.to_dict,
+                FlightSession.from_dict,
+                flush_interval=float(get_setting(self.bot, "flightplanner_session_flush_interval", 5))
+            )
+        
+        milestone_backend = self.create_milestone_backend()
+        if milestone_backend:
+            # Anything that fell due while we were offline is posted now
+            await self.milestones.attach_backend(
+                milestone_backend,
+                flush_interval=float(get_setting(self.bot, "flightplanner_session_flush_interval", 5))
+            )
+        self.startup_stats["load_ms"] = (time.perf_counter() - self.startup_stats["loaded_at"]) * 1000
+    
+    def warmup_codes(self):
+        """Codes to preload: the configured list, else our usual airports, plus the most looked-up ones"""
+        configured = get_setting(self.bot, "flightplanner_warmup_airports")
+        if configured:
+            codes = [code.strip().upper() for code in str(configured).split(",") if code.strip()]
+        else:
+            codes = list(POPULAR_AIRPORTS)
+        limit = int(get_setting(self.bot, "flightplanner_warmup_history", 50))
+        for code in self.airport_cache.most_used(limit):
+            if code not in codes:
+                codes.append(code)
+        return codes
+    
+    async def warm_up(self):
+        """Low-priority background warm-up of airport lookups after load
+        
+        Builds the search index off the event loop, then touches each code so
+        its database pages (or remote answer) are ready before anyone asks.
+        Every step yields, so gateway events are never held up.
+        """
+        started = time.perf_counter()
+        self.airport_search = await asyncio.to_thread(
+            AirportSearchIndex.from_database, self.airports, POPULAR_AIRPORTS
+        )
+        self.route_geometry = await asyncio.to_thread(
+            RouteGeometry.from_database, self.airports, POPULAR_AIRPORTS
+        )
+        
+        warmed = 0
+        for code in self.warmup_codes():
+            await asyncio.sleep(0)
+            if self.airports.get(code):
+                warmed += 1
+                continue
+            try:
+                await self.airport_cache.get_or_fetch(code, self.fetch_remote_airport)
+                warmed += 1
+            except (CircuitOpenError, asyncio.TimeoutError, aiohttp.ClientError):
+                # Don't keep hammering an API that's already struggling
+                break
+            except Exception:
+                logger.exception("Warm-up lookup failed for %s", code)
+        
+        self.startup_stats["warmup_ms"] = (time.perf_counter() - started) * 1000
+        self.startup_stats["warmed"] = warmed
+        logger.info(
+            "Flight planner warm-up: %d airports in %.0f ms (cog load %.0f ms)",
+            warmed, self.startup_stats["warmup_ms"], self.startup_stats.get("load_ms", 0)
+        )
+    
+    async def cog_unload(self):
+        if self.warmup_task:
+            self.warmup_task.cancel()
+        self.bot.remove_dynamic_items(*PERSISTENT_BUTTONS)
+        self.input_queue.close()
+        self.live_status.stop()
+        await self.milestones.close()
+        await self.outbound.close()
+        self.airports.close()
+        await self.airport_api.close()
+        await self.airport_cache.save()
+        await self.flight_handler.close()
+    
+    def create_session_backend(self):
+        """Build the persistent session backend chosen in the bot config, if any"""
+        return self.create_backend(MongoSessionBackend, SQLiteSessionBackend)
+    
+    def create_milestone_backend(self):
+        """Build the milestone store, kept wherever sessions are"""
+        return self.create_backend(MongoMilestoneBackend, SQLiteMilestoneBackend)
+    
+    def create_backend(self, mongo_backend, sqlite_backend):
+        kind = str(get_setting(self.bot, "flightplanner_session_backend", "")).lower()
+        
+        if kind == "mongo":
+            return mongo_backend(self.bot.api.get_plugin_partition(self))
+        if kind == "sqlite":
+            default_path = os.path.join(os.path.dirname(__file__), "sessions.db")
+            return sqlite_backend(get_setting(self.bot, "flightplanner_session_path", default_path))
+        return None
+    
+    async def post_milestone(self, job):
+        """Post a scheduled milestone to the flight's guild destinations"""
+        embed = build_milestone_embed(job["milestone"], job["airline"], job["flight_number"])
+        channel_ids = self.destinations.channel_ids(job["guild_id"])
+        deliveries = await self.destinations.post(channel_ids, embed, PRIORITY_CHECKIN)
+        for delivery in deliveries:
+            if delivery.error is not None:
+                logger.warning(
+                    "%s for %s not posted to %s: %s",
+                    job["milestone"], job["flight"], delivery.channel_id, delivery.error
+                )
+    
+    async def on_session_expired(self, user_id, session, reason):
+        """Close off the pending prompt of a session that timed out or was evicted"""
+        prompt = session.prompt_message(self.bot)
+        if not prompt:
+            return
+        
+        embed = discord.Embed(
+            title="⌛ Flight Plan Expired",
+            description="This flight planning session was closed due to inactivity. Use the plan command to start again.",
+            color=discord.Color.dark_grey()
+        )
+        try:
+            await prompt.edit(embed=embed, view=None)
+        except discord.HTTPException:
+            pass
     
     @commands.Cog.listener()
     async def on_flight_awaiting_input(self, flight_data):
         """Handle when we're waiting for user input"""
-        self.flight_handler.start_session(flight_data["author"].id, flight_data)
+        self.flight_handler.start_session(flight_data.user_id, flight_data)
+    
+    @commands.command(name="planstats")
+    @commands.has_permissions(administrator=True)
+    async def plan_stats(self, ctx):
+        """Show flight planner session and listener counters"""
+        stats = self.listener_stats
+        embed = discord.Embed(title="📊 Flight Planner Stats", color=discord.Color.blue())
+        embed.add_field(
+            name="Sessions",
+            value=f"Active: **{len(self.flight_handler.active_sessions)}**\n"
+                  f"Channels: **{len(self.flight_handler.active_channels)}**",
+            inline=True
+        )
+        embed.add_field(
+            name="Message Listener",
+            value=f"Seen: **{stats['seen']}**\n"
+                  f"Rejected: **{stats['rejected']}**\n"
+                  f"Routed: **{stats['routed']}**",
+            inline=True
+        )
+        queue = self.input_queue
+        embed.add_field(
+            name="Input Queue",
+            value=f"Workers: **{queue.workers}**\n"
+                  f"Pending: **{queue.depth}**\n"
+                  f"Coalesced: **{queue.stats['coalesced']}**\n"
+                  f"Pushed back: **{queue.stats['rejected']}**",
+            inline=True
+        )
+        cache = self.airport_cache
+        embed.add_field(
+            name="Airport Cache",
+            value=f"Entries: **{len(cache)}** / {cache.max_size}\n"
+                  f"Hits: **{cache.stats['hits']}** (+{cache.stats['negative_hits']} not found)\n"
+                  f"Misses: **{cache.stats['misses']}**\n"
+                  f"Evictions: **{cache.stats['evictions']}**\n"
+                  f"Coalesced: **{cache.inflight.stats['shared']}**",
+            inline=True
+        )
+        breaker = self.airport_breaker
+        latency = [breaker.percentile(p) for p in (0.5, 0.95, 0.99)]
+        latency = " / ".join(f"{value * 1000:.0f}" if value is not None else "-" for value in latency)
+        embed.add_field(
+            name="Airport API",
+            value=f"Breaker: **{breaker.state}**\n"
+                  f"Opened: **{breaker.stats['opened']}** · Closed: **{breaker.stats['closed']}**\n"
+                  f"Calls: **{breaker.stats['calls']}** · Failed: **{breaker.stats['failures']}** · Fast-failed: **{breaker.stats['rejected']}**\n"
+                  f"p50/p95/p99: **{latency}** ms",
+            inline=False
+        )
+        outbound = self.outbound
+        waits = [outbound.wait_percentile(p) for p in (0.5, 0.95)]
+        waits = " / ".join(f"{value * 1000:.0f}" if value is not None else "-" for value in waits)
+        embed.add_field(
+            name="Outbound Queue",
+            value=f"Queued: **{len(outbound)}** (peak {outbound.stats['max_depth']})\n"
+                  f"Sent: **{outbound.stats['sent']}** · Retried: **{outbound.stats['retries']}** · Failed: **{outbound.stats['failed']}**\n"
+                  f"Wait p50/p95: **{waits}** ms",
+            inline=False
+        )
+        milestones = self.milestones
+        embed.add_field(
+            name="Milestones",
+            value=f"Pending: **{len(milestones)}** · Scheduled: **{milestones.stats['scheduled']}**\n"
+                  f"Posted: **{milestones.stats['posted']}** · Missed: **{milestones.stats['missed']}** · "
+                  f"Failed: **{milestones.stats['failed']}**\n"
+                  f"Overdue after restart: **{milestones.stats['caught_up']}**",
+            inline=False
+        )
+        live = self.live_status
+        embed.add_field(
+            name="Live Status",
+            value=f"Tracked: **{len(live)}** · Edits: **{live.stats['edits']}**\n"
+                  f"Coalesced: **{live.stats['coalesced']}** · Unchanged: **{live.stats['unchanged']}** · "
+                  f"Failed: **{live.stats['failed']}**",
+            inline=False
+        )
+        startup = self.startup_stats
+        if "load_ms" in startup:
+            lines = [
+                f"Cog load: **{startup['load_ms']:.0f}** ms",
+                f"Warm-up: **{startup.get('warmup_ms', 0):.0f}** ms ({startup.get('warmed', 0)} airports)"
+            ]
+            if "first_lookup_ms" in startup:
+                lines.append(f"First lookup: **{startup['first_lookup_ms']:.0f}** ms after load")
+            embed.add_field(name="Startup", value="\n".join(lines), inline=False)
+        await ctx.send(embed=embed)
+    
+    @commands.command(name="planschedule")
+    @commands.has_permissions(administrator=True)
+    async def plan_schedule(self, ctx):
+        """List the next automatic milestone posts for this server"""
+        jobs = self.milestones.upcoming(ctx.guild.id if ctx.guild else None, 15)
+        if not jobs:
+            await ctx.send(embed=discord.Embed(
+                description="No milestones are scheduled.",
+                color=discord.Color.blue()
+            ))
+            return
+        
+        lines = [
+            f"**{job['flight_number']}** · {job['milestone'].replace('_', ' ')} <t:{int(job['due'])}:R> "
+            f"(departs <t:{int(job['departure'])}:f>, ID `{scheduled_departure(job)}`)"
+            for job in jobs
+        ]
+        embed = discord.Embed(title="🗓️ Scheduled Milestones", description="\n".join(lines), color=discord.Color.blue())
+        embed.set_footer(text=f"{len(self.milestones)} pending in total · pass a departure ID to plancancel or plandelay")
+        await ctx.send(embed=embed)
+    
+    def next_departure(self, guild_id, flight_number):
+        """Earliest scheduled departure of a flight with pending milestones or a live plan, or None"""
+        return min(
+            self.milestones.departures(guild_id, flight_number) + self.live_status.departures(guild_id, flight_number),
+            default=None
+        )
+    
+    def cancel_checkin_closed(self, guild_id, flight_number, departure=None):
+        """Drop the automatic check-in closed post once it has been announced by hand
+        
+        Without a ``departure`` (buttons posted before it was recorded) the
+        flight's next departure is assumed.
+        """
+        departure = departure or self.next_departure(guild_id, flight_number)
+        if departure:
+            self.milestones.cancel(guild_id, flight_number, departure, "checkin_closed")
+    
+    @commands.command(name="plancancel")
+    @commands.has_permissions(administrator=True)
+    async def plan_cancel(self, ctx, flight_number: str, departure: Optional[int] = None):
+        """Stop the automatic milestone posts for one departure of a flight
+        
+        ``departure`` is the ID shown by planschedule; without it the
+        flight's next departure is cancelled.
+        """
+        guild_id = ctx.guild.id if ctx.guild else None
+        flight_number = flight_number.upper()
+        departure = departure or self.next_departure(guild_id, flight_number)
+        cancelled = self.milestones.cancel(guild_id, flight_number, departure) if departure else 0
+        if cancelled:
+            description = f"✅ Cancelled {cancelled} scheduled post(s) for **{flight_number}** departing <t:{departure}:f>."
+        else:
+            description = f"❌ Nothing is scheduled for **{flight_number}**" + (f" departing <t:{departure}:f>." if departure else ".")
+        await ctx.send(embed=discord.Embed(description=description, color=discord.Color.blue()))
+    
+    @commands.command(name="plandelay")
+    @commands.has_permissions(administrator=True)
+    async def plan_delay(self, ctx, flight_number: str, minutes: int, departure: Optional[int] = None):
+        """Move one departure of a flight, and its scheduled milestones, by some minutes
+        
+        ``departure`` is the ID shown by planschedule; without it the
+        flight's next departure is moved.
+        """
+        guild_id = ctx.guild.id if ctx.guild else None
+        flight_number = flight_number.upper()
+        departure = departure or self.next_departure(guild_id, flight_number)
+        moved = 0
+        if departure:
+            moved = self.milestones.delay(guild_id, flight_number, departure, minutes)
+            moved += self.live_status.delay(guild_id, flight_number, departure, minutes)
+        if moved:
+            description = (
+                f"✅ Moved {moved} scheduled post(s) and live plan(s) for **{flight_number}** "
+                f"(scheduled <t:{departure}:f>) by {minutes} minutes."
+            )
+        else:
+            description = f"❌ Nothing is scheduled for **{flight_number}**" + (f" departing <t:{departure}:f>." if departure else ".")
+        await ctx.send(embed=discord.Embed(description=description, color=discord.Color.blue()))
+    
+    @commands.command(name="plansync")
+    @commands.has_permissions(administrator=True)
+    async def plan_sync(self, ctx):
+        """Register the /plan and /airport slash commands with Discord
+    
+        Loading the plugin only adds them to the bot's command tree; they
+        appear in Discord once the tree has been synced. Run this after
+        installing or updating the plugin.
+        """
+        try:
+            synced = await self.bot.tree.sync()
+        except discord.HTTPException as e:
+            logger.exception("Syncing application commands failed")
+            embed = discord.Embed(
+                title="❌ Sync Failed",
+                description=f"Discord refused the slash commands: {e}",
+                color=discord.Color.red()
+            )
+        else:
+            names = ", ".join(f"`/{command.name}`" for command in synced) or "none"
+            embed = discord.Embed(
+                title="✅ Slash Commands Synced",
+                description=f"Registered {len(synced)} command(s): {names}",
+                color=discord.Color.green()
+            )
+        await ctx.send(embed=embed)
     
     @commands.Cog.listener()
     async def on_message(self, message):
         """Listen for user input"""
-        if message.author.bot:
-            return
+        stats = self.listener_stats
+        stats["seen"] += 1
         
-        if message.content.startswith(('.', '?', '!', '/', '$')):
+        # Fast path: almost every message is in a channel with no planning session
+        if message.channel.id not in self.flight_handler.active_channels:
+            stats["rejected"] += 1
             return
         
-        session = self.flight_handler.get_session(message.author.id)
-        if not session:
+        if (
+            message.author.bot
+            or message.content.startswith(('.', '?', '!', '/', '$'))
+            or not self.flight_handler.has_route(message.channel.id, message.author.id)
+        ):
+            stats["rejected"] += 1
             return
         
-        if message.channel.id != session["channel"].id:
+        session = await self.flight_handler.load_session(message.author.id)
+        if (
+            not session
+            or message.channel.id != session.channel_id
+            or session.stage not in self.stage_parsers
+        ):
+            stats["rejected"] += 1
             return
         
-        user_id = message.author.id
-        if user_id in self.processing_lock:
-            print(f"DEBUG: Already processing message for user {user_id}")
+        stats["routed"] += 1
+        
+        if not self.input_queue.put(message.author.id, session.stage, message):
+            embed = discord.Embed(
+                description="⏳ Still working on your previous messages, please wait a moment",
+                color=discord.Color.orange()
+            )
+            await message.channel.send(embed=embed, delete_after=5)
+    
+    async def process_input(self, message):
+        """Handle one queued message for the user's current stage"""
+        session = self.flight_handler.get_session(message.author.id)
+        if not session:
             return
         
-        self.processing_lock[user_id] = True
-        print(f"DEBUG: Processing message, stage: {session.get('stage')}")
+        parser = self.stage_parsers.get(session.stage)
+        if parser is None:
+            return
         
-        try:
-            stage = session.get("stage")
-            
-            if stage == "departure_iata":
-                await self.handle_departure_iata(message, session)
-            elif stage == "arrival_iata":
-                await self.handle_arrival_iata(message, session)
-            elif stage == "departure_time":
-                await self.handle_departure_time(message, session)
-            elif stage == "departure_date":
-                await self.handle_departure_date(message, session)
-            elif stage == "flight_number":
-                await self.handle_flight_number(message, session)
-        finally:
-            if user_id in self.processing_lock:
-                del self.processing_lock[user_id]
-            print(f"DEBUG: Finished processing")
+        logger.debug("Processing message for %s at stage %s", message.author.id, session.stage.name)
+        await parser(message, session)
     
     async def handle_departure_iata(self, message, session):
         """Handle departure IATA code input"""
         try:
-            iata_code = message.content.strip().upper()
+            iata_code, alternatives = self.resolve_airport_query(message.content)
             
-            print(f"DEBUG: IATA code: {iata_code}")
-            
-            if len(iata_code) != 3 or not iata_code.isalpha():
+            if not iata_code:
                 embed = discord.Embed(
-                    description="❌ Please enter a valid 3-letter IATA airport code",
+                    description="❌ Please enter a valid 3-letter IATA airport code, or an airport or city name",
                     color=discord.Color.red()
                 )
                 await message.channel.send(embed=embed, delete_after=10)
                 return
             
-            print("DEBUG: Looking up airport")
             airport_info = await self.lookup_airport(iata_code)
-            print(f"DEBUG: Got result: {airport_info}")
             
             if not airport_info:
                 embed = discord.Embed(
@@ -94,39 +502,47 @@ class FlightPlannerCog(commands.Cog):
                 await message.channel.send(embed=embed)
                 return
             
-            print("DEBUG: Creating embed")
-            embed = discord.Embed(
-                title="✅ Departure Airport Found!",
-                description=f"Is this correct?\n\n**{airport_info['name']}**\n`{airport_info['code']}`",
-                color=discord.Color.blue()
-            )
+            if airport_info.get('unverified'):
+                embed = discord.Embed(
+                    title="⚠️ Departure Airport Not Verified",
+                    description=f"The airport lookup service is unavailable, so `{iata_code}` couldn't be checked.\n\nUse it anyway?",
+                    color=discord.Color.orange()
+                )
+            else:
+                embed = discord.Embed(
+                    title="✅ Departure Airport Found!",
+                    description=f"Is this correct?\n\n**{airport_info['name']}**\n`{airport_info['code']}`",
+                    color=discord.Color.blue()
+                )
             
             if airport_info.get('city'):
                 embed.add_field(name="City", value=airport_info['city'], inline=True)
             if airport_info.get('country'):
                 embed.add_field(name="Country", value=airport_info['country'], inline=True)
+            if alternatives:
+                embed.add_field(name="Other Matches", value=self.format_airport_matches(alternatives), inline=False)
             
             embed.set_footer(text="Confirm below")
             
-            print("DEBUG: Creating view")
-            view = DepartureAirportConfirmationView(message.author, self.flight_handler, iata_code, airport_info)
+            view = PLANNING.confirmation_view(
+                Stage.DEPARTURE_IATA, message.author, self.flight_handler,
+                departure_code=iata_code, departure_name=airport_info['name'],
+                departure_timezone=airport_timezone(airport_info)
+            )
             
-            print("DEBUG: Sending message")
-            await message.channel.send(embed=embed, view=view)
-            print("DEBUG: Message sent!")
-        except Exception as e:
-            print(f"ERROR: {e}")
-            import traceback
-            traceback.print_exc()
+            prompt = await message.channel.send(embed=embed, view=view)
+            self.flight_handler.update_session(message.author.id, prompt_message_id=prompt.id)
+        except Exception:
+            logger.exception("Failed to handle departure airport input")
             await message.channel.send("❌ An error occurred")
     
     async def handle_arrival_iata(self, message, session):
         """Handle arrival IATA code input"""
-        iata_code = message.content.strip().upper()
+        iata_code, alternatives = self.resolve_airport_query(message.content)
         
-        if len(iata_code) != 3 or not iata_code.isalpha():
+        if not iata_code:
             embed = discord.Embed(
-                description="❌ Please enter a valid 3-letter IATA airport code",
+                description="❌ Please enter a valid 3-letter IATA airport code, or an airport or city name",
                 color=discord.Color.red()
             )
             await message.channel.send(embed=embed, delete_after=10)
@@ -142,150 +558,133 @@ class FlightPlannerCog(commands.Cog):
             await message.channel.send(embed=embed)
             return
         
-        embed = discord.Embed(
-            title="✅ Arrival Airport Found!",
-            description=f"Is this correct?\n\n**{airport_info['name']}**\n`{airport_info['code']}`",
-            color=discord.Color.blue()
-        )
+        if airport_info.get('unverified'):
+            embed = discord.Embed(
+                title="⚠️ Arrival Airport Not Verified",
+                description=f"The airport lookup service is unavailable, so `{iata_code}` couldn't be checked.\n\nUse it anyway?",
+                color=discord.Color.orange()
+            )
+        else:
+            embed = discord.Embed(
+                title="✅ Arrival Airport Found!",
+                description=f"Is this correct?\n\n**{airport_info['name']}**\n`{airport_info['code']}`",
+                color=discord.Color.blue()
+            )
         
         if airport_info.get('city'):
             embed.add_field(name="City", value=airport_info['city'], inline=True)
         if airport_info.get('country'):
             embed.add_field(name="Country", value=airport_info['country'], inline=True)
+        if alternatives:
+            embed.add_field(name="Other Matches", value=self.format_airport_matches(alternatives), inline=False)
+        
+        estimate = None
+        if self.route_geometry and session.departure_code:
+            estimate = self.route_geometry.estimate(session.departure_code, iata_code, session.aircraft)
+        if estimate:
+            embed.add_field(
+                name="Route",
+                value=f"{estimate.distance_km:,} km • ~{format_block_time(estimate.block_minutes)}",
+                inline=False
+            )
         
         embed.set_footer(text="Confirm below")
         
-        view = ArrivalAirportConfirmationView(message.author, self.flight_handler, iata_code, airport_info)
-        await message.channel.send(embed=embed, view=view)
+        view = PLANNING.confirmation_view(
+            Stage.ARRIVAL_IATA, message.author, self.flight_handler,
+            arrival_code=iata_code, arrival_name=airport_info['name'],
+            arrival_timezone=airport_timezone(airport_info),
+            route_distance=estimate.distance_km if estimate else None,
+            block_minutes=estimate.block_minutes if estimate else None
+        )
+        prompt = await message.channel.send(embed=embed, view=view)
+        self.flight_handler.update_session(message.author.id, prompt_message_id=prompt.id)
     
     async def handle_departure_time(self, message, session):
-        """Handle departure time input"""
-        time_input = message.content.strip()
-        sydney_tz = pytz.timezone('Australia/Sydney')
+        """Handle departure time input, with or without the date"""
+        zone_name = session.departure_timezone or DEFAULT_TIMEZONE
+        today = local_now(zone_name).date()
+        parsed = parse_datetime(message.content.strip(), today)
         
-        try:
-            current_sydney = datetime.now(sydney_tz)
-            time_obj = None
-            
-            if ':' in time_input:
-                time_parts = time_input.replace(' ', '').upper()
-                is_pm = 'PM' in time_parts
-                is_am = 'AM' in time_parts
-                time_parts = time_parts.replace('AM', '').replace('PM', '')
-                
-                if ':' in time_parts:
-                    hours, minutes = time_parts.split(':')
-                    hours = int(hours)
-                    minutes = int(minutes)
-                    
-                    if is_pm and hours != 12:
-                        hours += 12
-                    elif is_am and hours == 12:
-                        hours = 0
-                    
-                    time_obj = current_sydney.replace(hour=hours, minute=minutes, second=0, microsecond=0)
-            
-            elif len(time_input) == 4 and time_input.isdigit():
-                hours = int(time_input[:2])
-                minutes = int(time_input[2:])
-                time_obj = current_sydney.replace(hour=hours, minute=minutes, second=0, microsecond=0)
-            
-            if not time_obj or time_obj.hour > 23 or time_obj.minute > 59:
-                raise ValueError("Invalid time")
-            
-            timestamp = int(time_obj.timestamp())
-            
-            embed = discord.Embed(
-                title="🕐 Confirm Departure Time",
-                description=f"Is this correct?\n\n**Sydney Time:** <t:{timestamp}:F>\n**Relative:** <t:{timestamp}:R>",
-                color=discord.Color.blue()
-            )
-            embed.set_footer(text="Confirm below")
-            
-            view = DepartureTimeConfirmationView(message.author, self.flight_handler, time_obj, timestamp)
-            await message.channel.send(embed=embed, view=view)
-            
-        except (ValueError, IndexError):
+        if not parsed or parsed.minutes is None:
             embed = discord.Embed(
-                description="❌ Invalid time format. Use: 14:30, 2:30 PM, or 1430",
+                description="❌ Invalid time format. Use: 14:30, 2:30 PM, or 1430 - or add the date, e.g. 14:30 25/01/2026",
                 color=discord.Color.red()
             )
             await message.channel.send(embed=embed)
+            return
+        
+        if parsed.day is not None:
+            # Date given too; confirming both skips the date stage
+            await self.confirm_departure(message, session, Stage.DEPARTURE_TIME, parsed.day, parsed.minutes)
+            return
+        
+        timestamp = local_timestamp(zone_name, today, parsed.minutes)
+        local_time = f"{parsed.minutes // 60:02d}:{parsed.minutes % 60:02d}"
+        
+        embed = discord.Embed(
+            title="🕐 Confirm Departure Time",
+            description=f"Is this correct?\n\n**Local Time ({zone_name}):** {local_time}\n**Your Time:** <t:{timestamp}:t>\n**Relative:** <t:{timestamp}:R>",
+            color=discord.Color.blue()
+        )
+        embed.set_footer(text="Confirm below")
+        
+        view = PLANNING.confirmation_view(
+            Stage.DEPARTURE_TIME, message.author, self.flight_handler,
+            departure_time=parsed.minutes, departure_timestamp=timestamp
+        )
+        prompt = await message.channel.send(embed=embed, view=view)
+        self.flight_handler.update_session(message.author.id, prompt_message_id=prompt.id)
     
     async def handle_departure_date(self, message, session):
-        """Handle departure date input"""
-        date_input = message.content.strip().lower()
-        sydney_tz = pytz.timezone('Australia/Sydney')
-        current_sydney = datetime.now(sydney_tz)
+        """Handle departure date input, optionally correcting the time too"""
+        zone_name = session.departure_timezone or DEFAULT_TIMEZONE
+        parsed = parse_datetime(message.content.strip(), local_now(zone_name).date())
         
-        try:
-            date_obj = None
-            
-            if date_input == "today":
-                date_obj = current_sydney.date()
-            elif date_input == "tomorrow":
-                date_obj = (current_sydney + timedelta(days=1)).date()
-            else:
-                for separator in ['/', '-', ' ']:
-                    if separator in date_input:
-                        parts = date_input.split(separator)
-                        if len(parts) == 3:
-                            try:
-                                day = int(parts[0])
-                                month = int(parts[1])
-                                year = int(parts[2])
-                                
-                                if year < 100:
-                                    year += 2000
-                                
-                                date_obj = datetime(year, month, day, tzinfo=sydney_tz).date()
-                                break
-                            except (ValueError, IndexError):
-                                continue
-                
-                if not date_obj:
-                    try:
-                        date_obj = datetime.strptime(date_input.title(), "%d %b %Y").date()
-                    except ValueError:
-                        pass
-            
-            if not date_obj:
-                raise ValueError("Invalid date")
-            
-            if date_obj < current_sydney.date():
-                embed = discord.Embed(
-                    description="❌ Date cannot be in the past",
-                    color=discord.Color.red()
-                )
-                await message.channel.send(embed=embed)
-                return
-            
-            time_obj = session.get("departure_time")
-            combined_datetime = sydney_tz.localize(datetime.combine(date_obj, time_obj.time()))
-            combined_timestamp = int(combined_datetime.timestamp())
-            
+        if not parsed or parsed.day is None:
             embed = discord.Embed(
-                title="📅 Confirm Departure Date",
-                description=f"Is this correct?\n\n**Full Date & Time:** <t:{combined_timestamp}:F>\n**Relative:** <t:{combined_timestamp}:R>",
-                color=discord.Color.blue()
+                description="❌ Invalid date. Use: 25/01/2026, today, or tomorrow",
+                color=discord.Color.red()
             )
-            embed.set_footer(text="Confirm below")
-            
-            view = DepartureDateConfirmationView(message.author, self.flight_handler, date_obj, combined_timestamp)
-            await message.channel.send(embed=embed, view=view)
-            
-        except (ValueError, AttributeError):
+            await message.channel.send(embed=embed)
+            return
+        
+        minutes = parsed.minutes if parsed.minutes is not None else session.departure_time
+        await self.confirm_departure(message, session, Stage.DEPARTURE_DATE, parsed.day, minutes)
+    
+    async def confirm_departure(self, message, session, stage, day, minutes):
+        """Ask the user to confirm a full departure date and time"""
+        zone_name = session.departure_timezone or DEFAULT_TIMEZONE
+        if day < local_now(zone_name).date():
             embed = discord.Embed(
-                description="❌ Invalid date. Use: 25/01/2026, today, or tomorrow",
+                description="❌ Date cannot be in the past",
                 color=discord.Color.red()
             )
             await message.channel.send(embed=embed)
+            return
+        
+        combined_timestamp = local_timestamp(zone_name, day, minutes)
+        
+        embed = discord.Embed(
+            title="📅 Confirm Departure Date",
+            description=f"Is this correct?\n\n**Full Date & Time:** <t:{combined_timestamp}:F>\n**Relative:** <t:{combined_timestamp}:R>",
+            color=discord.Color.blue()
+        )
+        embed.set_footer(text="Confirm below")
+        
+        view = PLANNING.confirmation_view(
+            stage, message.author, self.flight_handler,
+            departure_time=minutes, departure_timestamp=combined_timestamp,
+            departure_date=day.toordinal(), combined_timestamp=combined_timestamp
+        )
+        prompt = await message.channel.send(embed=embed, view=view)
+        self.flight_handler.update_session(message.author.id, prompt_message_id=prompt.id)
     
     async def handle_flight_number(self, message, session):
         """Handle flight number input"""
         flight_number = message.content.strip().upper()
         
-        if len(flight_number) < 2 or not any(c.isalpha() for c in flight_number):
+        if not FLIGHT_NUMBER.fullmatch(flight_number):
             embed = discord.Embed(
                 description="❌ Please enter a valid flight number (e.g., QF94, JQ30)",
                 color=discord.Color.red()
@@ -300,71 +699,355 @@ class FlightPlannerCog(commands.Cog):
         )
         embed.set_footer(text="Confirm below")
         
-        view = FlightNumberConfirmationView(message.author, self.flight_handler, flight_number)
-        await message.channel.send(embed=embed, view=view)
+        view = PLANNING.confirmation_view(
+            Stage.FLIGHT_NUMBER, message.author, self.flight_handler,
+            flight_number=flight_number
+        )
+        prompt = await message.channel.send(embed=embed, view=view)
+        self.flight_handler.update_session(message.author.id, prompt_message_id=prompt.id)
     
-    async def lookup_airport(self, iata_code):
-        """Look up airport information by IATA code"""
-        print(f"DEBUG: lookup_airport called for {iata_code}")
+    async def resolve_airports(self, codes):
+        """Look up a batch of IATA codes concurrently, one lookup per distinct code"""
+        codes = list(set(codes))
+        results = await asyncio.gather(*(self.lookup_airport(code) for code in codes))
+        return dict(zip(codes, results))
+    
+    def plan_from_args(self, args, airports, user_id, channel_id, guild_id=None):
+        """Validate one-shot plan fields against resolved ``airports``
+        
+        Returns ``(session, errors)``. The session is ready for its flight
+        number to be confirmed, or None if anything failed.
+        """
+        errors = list(args.errors)
+        for code in (args.departure, args.arrival):
+            if not (len(code) == 3 and code.isalpha()):
+                errors.append(f"`{code}` isn't a 3-letter IATA code")
+            elif not airports.get(code):
+                errors.append(f"Could not find airport `{code}`")
+        if args.departure == args.arrival:
+            errors.append("Departure and arrival airports are the same")
+        
+        departure = airports.get(args.departure)
+        zone_name = airport_timezone(departure)
+        today = local_now(zone_name).date()
+        parsed = parse_datetime(args.when, today)
+        if not parsed or parsed.minutes is None or parsed.day is None:
+            errors.append(f"`{args.when}` isn't a departure time and date (e.g. 14:30 25/01/2026)")
+        elif parsed.day < today:
+            errors.append("Departure date cannot be in the past")
+        
+        if errors:
+            return None, errors
+        
+        arrival = airports[args.arrival]
+        combined_timestamp = local_timestamp(zone_name, parsed.day, parsed.minutes)
+        estimate = self.route_geometry.estimate(args.departure, args.arrival, args.aircraft) if self.route_geometry else None
+        session = FlightSession(
+            user_id=user_id,
+            channel_id=channel_id,
+            guild_id=guild_id,
+            airline=args.airline,
+            aircraft=args.aircraft,
+            stage=Stage.FLIGHT_NUMBER,
+            departure_code=args.departure,
+            departure_name=departure['name'],
+            departure_timezone=zone_name,
+            arrival_code=args.arrival,
+            arrival_name=arrival['name'],
+            arrival_timezone=airport_timezone(arrival),
+            departure_time=parsed.minutes,
+            departure_timestamp=combined_timestamp,
+            departure_date=parsed.day.toordinal(),
+            combined_timestamp=combined_timestamp,
+            route_distance=estimate.distance_km if estimate else None,
+            block_minutes=estimate.block_minutes if estimate else None
+        )
+        return session, []
+    
+    async def quick_plan(self, ctx, details):
+        """Build a whole flight plan from one ``plan`` invocation
+        
+        Every field is checked up front and all problems are reported
+        together; a valid plan goes straight to a single confirmation.
+        """
+        # Airport lookups may outlast a slash command's response window
+        await ctx.defer()
+        args = parse_plan_args(details)
+        if args is None:
+            embed = discord.Embed(
+                description=f"❌ Not enough details. Use: `{QUICK_PLAN_USAGE}`",
+                color=discord.Color.red()
+            )
+            await ctx.send(embed=embed)
+            return
+        
+        airports = await self.resolve_airports(
+            code for code in (args.departure, args.arrival) if len(code) == 3 and code.isalpha()
+        )
+        session, errors = self.plan_from_args(
+            args, airports, ctx.author.id, ctx.channel.id, ctx.guild.id if ctx.guild else None
+        )
+        
+        if errors:
+            embed = discord.Embed(
+                title="❌ Flight Plan Not Created",
+                description="\n".join(f"• {error}" for error in errors),
+                color=discord.Color.red()
+            )
+            embed.set_footer(text=QUICK_PLAN_USAGE)
+            await ctx.send(embed=embed)
+            return
+        
+        self.flight_handler.start_session(ctx.author.id, session)
+        departure = airports[args.departure]
+        arrival = airports[args.arrival]
+        
+        embed = discord.Embed(
+            title=f"✈️ Confirm Flight {args.flight_number}",
+            description="Is this correct?",
+            color=discord.Color.blue()
+        )
+        embed.add_field(name="Airline", value=args.airline, inline=True)
+        embed.add_field(name="Aircraft", value=args.aircraft, inline=True)
+        embed.add_field(name="\u200b", value="\u200b", inline=True)
+        embed.add_field(
+            name="Departure",
+            value=f"**{args.departure}** {departure['name']}\n<t:{session.combined_timestamp}:F>",
+            inline=True
+        )
+        embed.add_field(name="Arrival", value=f"**{args.arrival}** {arrival['name']}", inline=True)
+        if session.block_minutes is not None:
+            embed.add_field(
+                name="Route",
+                value=f"{session.route_distance:,} km • ~{format_block_time(session.block_minutes)}",
+                inline=False
+            )
+        if departure.get('unverified') or arrival.get('unverified'):
+            embed.add_field(
+                name="⚠️ Not Verified",
+                value="The airport lookup service is unavailable, so some codes couldn't be checked.",
+                inline=False
+            )
+        embed.set_footer(text="Confirm below")
+        
+        view = PLANNING.confirmation_view(
+            Stage.FLIGHT_NUMBER, ctx.author, self.flight_handler,
+            flight_number=args.flight_number
+        )
+        prompt = await ctx.send(embed=embed, view=view)
+        self.flight_handler.update_session(ctx.author.id, prompt_message_id=prompt.id)
+    
+    @commands.command(name="planimport")
+    @commands.has_permissions(administrator=True)
+    async def plan_import(self, ctx, channel: Optional[discord.TextChannel] = None):
+        """Post a whole schedule of flight plans from an attached CSV or JSON file
+        
+        Columns: flight, aircraft, from, to, time and date (or datetime).
+        Plans go to this server's flight plan destinations, or only to
+        ``channel`` if one is given.
+        """
+        if not ctx.message.attachments:
+            embed = discord.Embed(
+                description="❌ Attach a CSV or JSON schedule with columns: flight, aircraft, from, to, time, date",
+                color=discord.Color.red()
+            )
+            await ctx.send(embed=embed)
+            return
+        
+        attachment = ctx.message.attachments[0]
+        channel_ids = [channel.id] if channel else self.destinations.channel_ids(ctx.guild.id)
+        if not channel_ids:
+            await ctx.send(embed=discord.Embed(
+                description="❌ No flight plan destinations are set up for this server.",
+                color=discord.Color.red()
+            ))
+            return
+        
+        report = ImportReport()
+        status = await ctx.send(embed=discord.Embed(
+            description=f"⏳ Importing `{attachment.filename}` into {mention_channels(channel_ids)}...",
+            color=discord.Color.blue()
+        ))
         
         try:
-            common_airports = {
-                'SYD': {'name': 'Sydney Kingsford Smith International Airport', 'city': 'Sydney', 'country': 'Australia'},
-                'MEL': {'name': 'Melbourne Airport', 'city': 'Melbourne', 'country': 'Australia'},
-                'BNE': {'name': 'Brisbane Airport', 'city': 'Brisbane', 'country': 'Australia'},
-                'PER': {'name': 'Perth Airport', 'city': 'Perth', 'country': 'Australia'},
-                'ADL': {'name': 'Adelaide Airport', 'city': 'Adelaide', 'country': 'Australia'},
-                'CNS': {'name': 'Cairns Airport', 'city': 'Cairns', 'country': 'Australia'},
-                'OOL': {'name': 'Gold Coast Airport', 'city': 'Gold Coast', 'country': 'Australia'},
-                'CBR': {'name': 'Canberra Airport', 'city': 'Canberra', 'country': 'Australia'},
-                'DRW': {'name': 'Darwin International Airport', 'city': 'Darwin', 'country': 'Australia'},
-                'HBA': {'name': 'Hobart Airport', 'city': 'Hobart', 'country': 'Australia'},
-                'LST': {'name': 'Launceston Airport', 'city': 'Launceston', 'country': 'Australia'},
-                'ASP': {'name': 'Alice Springs Airport', 'city': 'Alice Springs', 'country': 'Australia'},
-                'LHR': {'name': 'London Heathrow Airport', 'city': 'London', 'country': 'United Kingdom'},
-                'LAX': {'name': 'Los Angeles International Airport', 'city': 'Los Angeles', 'country': 'United States'},
-                'JFK': {'name': 'John F. Kennedy International Airport', 'city': 'New York', 'country': 'United States'},
-                'SIN': {'name': 'Singapore Changi Airport', 'city': 'Singapore', 'country': 'Singapore'},
-                'DXB': {'name': 'Dubai International Airport', 'city': 'Dubai', 'country': 'United Arab Emirates'},
-                'HKG': {'name': 'Hong Kong International Airport', 'city': 'Hong Kong', 'country': 'Hong Kong'},
-                'NRT': {'name': 'Narita International Airport', 'city': 'Tokyo', 'country': 'Japan'},
-                'AKL': {'name': 'Auckland Airport', 'city': 'Auckland', 'country': 'New Zealand'},
-                'CHC': {'name': 'Christchurch Airport', 'city': 'Christchurch', 'country': 'New Zealand'},
-                'WLG': {'name': 'Wellington Airport', 'city': 'Wellington', 'country': 'New Zealand'},
-            }
-            
-            print(f"DEBUG: Checking {iata_code} in list")
-            
-            if iata_code in common_airports:
-                airport_data = common_airports[iata_code]
-                result = {
-                    'code': iata_code,
-                    'name': airport_data['name'],
-                    'city': airport_data['city'],
-                    'country': airport_data['country']
-                }
-                print(f"DEBUG: Found: {result['name']}")
-                return result
-            
-            print(f"DEBUG: Not found, trying API")
-            
-            url = f"https://airlabs.co/api/v9/airports?iata_code={iata_code}&api_key=demo"
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, timeout=5) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        if data.get('response') and len(data['response']) > 0:
-                            airport = data['response'][0]
-                            return {
-                                'code': iata_code,
-                                'name': airport.get('name', 'Unknown Airport'),
-                                'city': airport.get('city', ''),
-                                'country': airport.get('country_code', '')
-                            }
-            
-            return None
+            async with aiohttp.ClientSession() as http:
+                async with http.get(attachment.url) as response:
+                    response.raise_for_status()
+                    batch = []
+                    async for row in iter_schedule_rows(response.content, attachment.filename):
+                        batch.append(row)
+                        if len(batch) >= IMPORT_BATCH_SIZE:
+                            await self.import_batch(batch, channel_ids, ctx, report)
+                            batch = []
+                            await status.edit(embed=discord.Embed(
+                                description=f"⏳ Importing `{attachment.filename}`: {report.rows} rows, {report.posted} posted, {report.failed} failed",
+                                color=discord.Color.blue()
+                            ))
+                    if batch:
+                        await self.import_batch(batch, channel_ids, ctx, report)
+        except (aiohttp.ClientError, ValueError, UnicodeDecodeError, csv.Error) as e:
+            report.fail(report.rows + 1, [f"Import stopped: {e}"])
+        
+        embed = discord.Embed(
+            title="📥 Schedule Import Complete" if not report.failed else "📥 Schedule Import Finished With Errors",
+            description=f"**{report.posted}** of **{report.rows}** flights posted to {mention_channels(channel_ids)}",
+            color=discord.Color.green() if not report.failed else discord.Color.orange()
+        )
+        if report.failed:
+            embed.add_field(name=f"Failed ({report.failed})", value=report.summary()[:1024], inline=False)
+        await status.edit(embed=embed)
+    
+    async def import_batch(self, batch, channel_ids, ctx, report):
+        """Validate a batch of schedule rows, resolving their airports together, and post the good ones
+        
+        Each plan is fanned out to every channel in ``channel_ids``. A row
+        that misses any of them is reported as failed; it still counts as
+        posted, and is tracked, if at least one copy went out.
+        """
+        planned = []
+        for row_number, raw in batch:
+            report.rows += 1
+            fields = normalize_row(raw)
+            if fields is None:
+                report.fail(row_number, ["Not a row of fields"])
+                continue
+            missing = [name for name in IMPORT_REQUIRED if not fields.get(name)]
+            if missing:
+                report.fail(row_number, [f"Missing {', '.join(missing)}"])
+                continue
+            flight_number, airline, aircraft, errors = validate_flight(fields['flight_number'], fields['aircraft'])
+            planned.append((row_number, QuickPlanArgs(
+                flight_number, airline, aircraft,
+                fields['departure'].upper(), fields['arrival'].upper(), fields['when'], errors
+            )))
+        
+        airports = await self.resolve_airports(
+            code for _, args in planned for code in (args.departure, args.arrival)
+            if len(code) == 3 and code.isalpha()
+        )
+        guild_id = ctx.guild.id
+        for row_number, args in planned:
+            session, errors = self.plan_from_args(args, airports, ctx.author.id, ctx.channel.id, guild_id)
+            # Nobody is there to accept an unverified airport, so don't post one
+            errors += [
+                f"Could not verify airport `{code}` while the airport lookup service is unavailable"
+                for code in dict.fromkeys((args.departure, args.arrival))
+                if (airports.get(code) or {}).get('unverified')
+            ]
+            if errors:
+                report.fail(row_number, errors)
+                continue
+            session.flight_number = args.flight_number
+            session.stage = Stage.REVIEW
+            values = flight_plan_values(session)
+            deliveries = await self.destinations.post(channel_ids, build_flight_plan_embed(session, values), PRIORITY_BULK)
+            failed = [delivery for delivery in deliveries if delivery.error is not None]
+            if failed:
+                report.fail(row_number, [f"Not posted to <#{delivery.channel_id}>: {delivery.error}" for delivery in failed])
+            if len(failed) == len(deliveries):
+                continue
+            report.posted += 1
+            for delivery in deliveries:
+                if delivery.messages:
+                    self.live_status.track(delivery.messages[0], session.airline, values)
+            self.milestones.schedule_flight(guild_id, session.airline, session.flight_number, session.combined_timestamp)
+    
+    def resolve_airport_query(self, text):
+        """Turn chat input into an IATA code plus other candidate matches
+        
+        Three letters are taken as a code; anything else (a city or airport
+        name, possibly misspelled) goes through the search index.
+        """
+        text = text.strip()
+        if len(text) == 3 and text.isalpha():
+            return text.upper(), []
+        
+        if self.airport_search is None:
+            return None, []
+        matches = self.airport_search.search(text, 4)
+        if not matches:
+            return None, []
+        return matches[0][0], matches[1:]
+    
+    @staticmethod
+    def format_airport_matches(matches):
+        return "\n".join(f"`{code}` {name} ({city})" if city else f"`{code}` {name}" for code, name, city, _ in matches)
+    
+    @commands.hybrid_command(name="airport")
+    @app_commands.describe(query="IATA code, airport name or city")
+    async def airport_search_command(self, ctx, *, query: str):
+        """Look up an airport by code, name or city"""
+        iata_code, alternatives = self.resolve_airport_query(query)
+        airport_info = await self.lookup_airport(iata_code) if iata_code else None
+        
+        if not airport_info:
+            embed = discord.Embed(
+                description=f"❌ Could not find an airport matching `{query}`",
+                color=discord.Color.red()
+            )
+            await ctx.send(embed=embed)
+            return
+        
+        embed = discord.Embed(
+            title=f"✈️ {airport_info['name']}",
+            description=f"`{airport_info['code']}`",
+            color=discord.Color.blue()
+        )
+        if airport_info.get('city'):
+            embed.add_field(name="City", value=airport_info['city'], inline=True)
+        if airport_info.get('country'):
+            embed.add_field(name="Country", value=airport_info['country'], inline=True)
+        if airport_info.get('timezone'):
+            embed.add_field(name="Timezone", value=airport_info['timezone'], inline=True)
+        if alternatives:
+            embed.add_field(name="Other Matches", value=self.format_airport_matches(alternatives), inline=False)
+        await ctx.send(embed=embed)
+    
+    @airport_search_command.autocomplete("query")
+    async def airport_autocomplete(self, interaction: discord.Interaction, current: str):
+        if self.airport_search is None or not current:
+            return []
+        return [
+            app_commands.Choice(name=f"{code} · {name}, {city}"[:100], value=code)
+            for code, name, city, _ in self.airport_search.search(current, 25)
+        ]
+    
+    async def fetch_remote_airport(self, iata_code):
+        """Ask the airport API through the circuit breaker, within the latency budget"""
+        return await self.airport_breaker.call(
+            self.airport_api.fetch_airport, iata_code, timeout=self.airport_lookup_budget
+        )
+    
+    async def lookup_airport(self, iata_code):
+        """Look up airport information by IATA code
+
+        The bundled airport database answers almost every code; the remote
+        API is only asked about codes it doesn't know, through a cache that
+        also remembers codes the API couldn't find. While the API is failing
+        the code is offered back unverified instead of making the user wait.
+        Only codes that resolve count towards warm-up.
+        """
+        if "first_lookup_ms" not in self.startup_stats and "loaded_at" in self.startup_stats:
+            self.startup_stats["first_lookup_ms"] = (time.perf_counter() - self.startup_stats["loaded_at"]) * 1000
+        try:
+            airport = self.airports.get(iata_code)
+            if not airport:
+                logger.debug("%s is not in the bundled database, asking the airport API", iata_code)
+                airport = await self.airport_cache.get_or_fetch(iata_code, self.fetch_remote_airport)
+            if airport:
+                self.airport_cache.record_use(iata_code)
+            return airport
             
-        except Exception as e:
-            print(f"ERROR in lookup: {e}")
+        except (CircuitOpenError, asyncio.TimeoutError, aiohttp.ClientError) as e:
+            # API down or over budget: let the user accept the code unverified
+            logger.debug("Airport API unavailable (%s), offering %s unverified", type(e).__name__, iata_code)
+            return {
+                'code': iata_code,
+                'name': f"{iata_code} (unverified)",
+                'city': '',
+                'country': '',
+                'unverified': True
+            }
+        except Exception:
+            logger.exception("Airport lookup for %s failed", iata_code)
             return None
@@ -1,54 +1,125 @@
+from urllib.parse import quote, unquote
+
 import discord
-from discord.ui import View, button
-import pytz
-from datetime import datetime
+from discord.ui import Button, DynamicItem, View, button
+
+from embedlimits import message_batches, send_fitted
+from sender import PRIORITY_CHECKIN, PRIORITY_PLAN
+from templates import flight_plan_values, render
+
+# Channel finished flight plans are posted to unless
+# flightplanner_destinations says otherwise
+PLAN_CHANNEL_ID = 1400766110306926652
+# Discord rejects components whose custom_id is longer than this
+CUSTOM_ID_LIMIT = 100
+
+
+def planner(client):
+    """The loaded FlightPlannerCog, or None"""
+    return client.get_cog("FlightPlannerCog")
+
+
+def outbound(client):
+    """The planner's shared outbound scheduler, or None if the cog isn't loaded"""
+    cog = planner(client)
+    return cog.outbound if cog else None
+
+
+def custom_id(prefix, *parts):
+    """Build a persistent button's custom_id from ``prefix`` and its ``parts``
 
+    Parts are percent-encoded so a ``:`` inside one can't break the
+    DynamicItem template; decode them with ``unquote``. Raises ValueError
+    if the result won't fit in a custom_id.
+    """
+    value = ":".join((prefix, *(quote(str(part), safe="") for part in parts)))
+    if len(value) > CUSTOM_ID_LIMIT:
+        raise ValueError(f"custom_id is {len(value)} characters, over Discord's {CUSTOM_ID_LIMIT}")
+    return value
 
-class DepartureAirportConfirmationView(View):
-    """View for confirming the departure airport"""
+
+def mention_channels(channel_ids):
+    return ", ".join(f"<#{channel_id}>" for channel_id in channel_ids)
+
+
+async def report_failed_deliveries(interaction, deliveries, what):
+    """Tell the user which destinations a fan-out couldn't reach, if any"""
+    failed = [delivery for delivery in deliveries if delivery.error is not None]
+    if failed:
+        lines = "\n".join(f"<#{delivery.channel_id}>: {delivery.error}" for delivery in failed)
+        await interaction.followup.send(f"❌ Failed to send {what} to:\n{lines}", ephemeral=True)
+
+
+class StageConfirmationView(View):
+    """Yes/No confirmation for a value parsed at one planning stage
+
+    Confirming applies ``updates`` and advances the session through the
+    planning state machine. A view whose stage the session has already left
+    is stale and is rejected without touching the session.
+    """
     
-    def __init__(self, author, handler, iata_code, airport_info):
+    def __init__(self, author, handler, machine, stage, updates):
         super().__init__(timeout=60)
         self.author = author
         self.handler = handler
-        self.iata_code = iata_code
-        self.airport_info = airport_info
+        self.machine = machine
+        self.stage = stage
+        self.updates = updates
     
-    @button(label="Yes, Correct", style=discord.ButtonStyle.green, emoji="✅")
-    async def confirm_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+    async def interaction_check(self, interaction: discord.Interaction):
         if interaction.user != self.author:
             await interaction.response.send_message(
                 "This isn't your flight planning session!", 
                 ephemeral=True
             )
+            return False
+        return True
+    
+    async def reject_stale(self, interaction: discord.Interaction):
+        await interaction.response.send_message(
+            "This confirmation has expired - please use the latest prompt.",
+            ephemeral=True
+        )
+        self.stop()
+    
+    @button(label="Yes, Correct", style=discord.ButtonStyle.green, emoji="✅")
+    async def confirm_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        session = self.machine.advance(self.handler, self.author.id, self.stage, **self.updates)
+        if session is None:
+            await self.reject_stale(interaction)
             return
         
-        # Save departure airport and ask for arrival
-        self.handler.update_session(self.author.id, "departure_code", self.iata_code)
-        self.handler.update_session(self.author.id, "departure_name", self.airport_info['name'])
-        self.handler.update_session(self.author.id, "stage", "arrival_iata")
-        
-        embed = discord.Embed(
-            title="🛬 Arrival Airport",
-            description="Please enter the **3-letter IATA code** of your arrival airport.\n\nExample: `MEL` for Melbourne, `BNE` for Brisbane",
-            color=discord.Color.blue()
-        )
-        embed.set_footer(text="Type the 3-letter airport code in chat")
+        await self.on_confirmed(interaction, session)
+        self.stop()
+    
+    @button(label="No, Try Again", style=discord.ButtonStyle.red, emoji="❌")
+    async def retry_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        session = self.handler.get_session(self.author.id)
+        if session is None or session.stage != self.stage:
+            await self.reject_stale(interaction)
+            return
         
+        embed = self.machine.prompt(self.stage, session)
         await interaction.response.edit_message(embed=embed, view=None)
         self.stop()
+    
+    async def on_confirmed(self, interaction: discord.Interaction, session):
+        """Ask for the next stage's input"""
+        embed = self.machine.prompt(session.stage, session)
+        await interaction.response.edit_message(embed=embed, view=None)
 
 
 class SendConfirmationView(View):
     """View for confirming whether to send the flight plan"""
     
-    def __init__(self, author, handler, flight_embed, airline, flight_number):
+    def __init__(self, author, handler, flight_embed, airline, flight_number, flight_values):
         super().__init__(timeout=60)
         self.author = author
         self.handler = handler
         self.flight_embed = flight_embed
         self.airline = airline
         self.flight_number = flight_number
+        self.flight_values = flight_values
     
     @button(label="Send Flight Plan", style=discord.ButtonStyle.green, emoji="📤")
     async def send_button(self, interaction: discord.Interaction, button: discord.ui.Button):
@@ -59,720 +130,241 @@ class SendConfirmationView(View):
             )
             return
         
-        # Get the target channel
-        target_channel_id = 1400766110306926652
-        target_channel = interaction.client.get_channel(target_channel_id)
+        # Get this guild's destination channels
+        cog = planner(interaction.client)
+        channel_ids = cog.destinations.channel_ids(interaction.guild_id) if cog else ()
         
-        if not target_channel:
+        if not channel_ids:
             await interaction.response.send_message(
-                "❌ Could not find the destination channel.",
+                "❌ No destination channels are configured for this server.",
                 ephemeral=True
             )
             return
         
+        # Acknowledge straight away; the posts themselves wait their turn in the queue
+        success_embed = discord.Embed(
+            title="✅ Flight Plan Sent!",
+            description=f"Your flight plan is being posted to {mention_channels(channel_ids)}.",
+            color=discord.Color.green()
+        )
+        
+        # Create view with check-in closed button
+        departure = self.flight_values["departure_timestamp"]
         try:
-            # Send the flight plan to the target channel WITHOUT BUTTONS
-            await target_channel.send(embed=self.flight_embed)
-            
-            # Confirm to user WITH BUTTON
-            success_embed = discord.Embed(
-                title="✅ Flight Plan Sent!",
-                description=f"Your flight plan has been successfully sent to <#{target_channel_id}>!",
-                color=discord.Color.green()
-            )
-            
-            # Create view with check-in closed button
-            success_view = CheckInClosedButtonView(self.airline, self.flight_number, target_channel_id)
-            
-            await interaction.response.edit_message(embed=success_embed, view=success_view)
-            
-        except Exception as e:
-            await interaction.response.send_message(
-                f"❌ Failed to send flight plan: {str(e)}",
-                ephemeral=True
-            )
+            success_view = CheckInClosedButtonView(self.author, self.airline, self.flight_number, departure)
+        except ValueError:
+            # Flight number too long to carry in a button; post the plan without one
+            success_view = None
         
-        # Don't end session yet - button is still active
+        await interaction.response.edit_message(embed=success_embed, view=success_view)
+        
+        # The plan is out, so the session is done. The check-in buttons carry
+        # their own context, and ending it here stops the idle sweeper from
+        # later overwriting this message with "expired".
+        self.handler.end_session(self.author.id)
         self.stop()
+        
+        # Check-in closed and any other milestones now post themselves before departure
+        cog.milestones.schedule_flight(interaction.guild_id, self.airline, self.flight_number, departure)
+        
+        # Send the flight plan to every destination WITHOUT BUTTONS
+        deliveries = await cog.destinations.post(channel_ids, self.flight_embed, PRIORITY_PLAN)
+        await report_failed_deliveries(interaction, deliveries, "flight plan")
+        if all(delivery.error is not None for delivery in deliveries):
+            cog.milestones.cancel(interaction.guild_id, self.flight_number, departure)
+        
+        # Keep the Status line of each posted copy current as departure nears
+        for delivery in deliveries:
+            if delivery.messages:
+                cog.live_status.track(delivery.messages[0], self.airline, self.flight_values)
 
 
-class FlightPlanActionsView(View):
-    """Buttons that appear on the sent flight plan message"""
+async def is_session_owner(interaction: discord.Interaction, author_id):
+    if interaction.user.id != author_id:
+        await interaction.response.send_message(
+            "This isn't your flight planning session!", 
+            ephemeral=True
+        )
+        return False
+    return True
+
+
+class CheckInClosedButton(
+    DynamicItem[Button],
+    template=r"flightplanner:checkin:(?P<airline>[^:]+):(?P<flight_number>[^:]+)(?::(?P<departure>\d+))?"
+):
+    """Check-In Closed button on a posted flight plan
+
+    The airline, flight number and scheduled departure live in the
+    custom_id, so the one handler registered at cog load serves every
+    posted plan, before and after restarts, without keeping anything per
+    message. Buttons posted before the departure was included act on the
+    flight's next departure.
+    """
     
-    def __init__(self, airline, flight_number):
-        super().__init__(timeout=None)  # Buttons never expire
+    def __init__(self, airline, flight_number, departure=None):
+        parts = (airline, flight_number) if departure is None else (airline, flight_number, departure)
+        super().__init__(Button(
+            label="Check-In Closed", style=discord.ButtonStyle.red, emoji="🔒",
+            custom_id=custom_id("flightplanner:checkin", *parts)
+        ))
         self.airline = airline
         self.flight_number = flight_number
+        self.departure = departure
     
-    @button(label="Check-In Closed", style=discord.ButtonStyle.red, emoji="🔒", custom_id="checkin_closed")
-    async def checkin_closed_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        # Create professional check-in closed embed
-        if self.airline == "Qantas":
-            checkin_embed = discord.Embed(
-                title="",
-                description="",
-                color=0xE40000
-            )
-            checkin_embed.set_thumbnail(url="https://1000logos.net/wp-content/uploads/2017/05/Qantas-Logo-1536x966.png")
-            
-            checkin_embed.add_field(
-                name="<:QFtail2:1401856972180947035> CHECK-IN STATUS",
-                value=f"**Flight {self.flight_number}**",
-                inline=False
-            )
-            
-            checkin_embed.add_field(
-                name="",
-                value="━━━━━━━━━━━━━━━━━━━━━━",
-                inline=False
-            )
-            
-            checkin_embed.add_field(
-                name="<:QFseatbelt:1401010857928032316> CHECK-IN CLOSED",
-                value="Online check-in for this flight has now closed.\n\nPassengers are advised to proceed directly to the airport and complete check-in at the Qantas service counter.",
-                inline=False
-            )
-            
-            checkin_embed.add_field(
-                name="<:Announcment:1399308384502808588> IMPORTANT INFORMATION",
-                value="• Arrive at the airport at least **2 hours** before departure for domestic flights\n• Arrive at least **3 hours** before departure for international flights\n• Have your booking reference and identification ready",
-                inline=False
-            )
-            
-            checkin_embed.add_field(
-                name="<:External:1399308477897244705> NEED ASSISTANCE?",
-                value="Visit the Qantas service desk or contact our customer service team for support.",
-                inline=False
-            )
-            
-            checkin_embed.set_footer(
-                text="Qantas Airways • The Spirit of Australia",
-                icon_url="https://1000logos.net/wp-content/uploads/2017/05/Qantas-Logo-1536x966.png"
-            )
-            
-        else:  # Jetstar
-            checkin_embed = discord.Embed(
-                title="",
-                description="",
-                color=0xFF6600
-            )
-            checkin_embed.set_thumbnail(url="https://logos-world.net/wp-content/uploads/2023/01/Jetstar-Logo-2003.png")
-            
-            checkin_embed.add_field(
-                name="<:JQtail:1421704382608838776> CHECK-IN STATUS",
-                value=f"**Flight {self.flight_number}**",
-                inline=False
-            )
-            
-            checkin_embed.add_field(
-                name="",
-                value="━━━━━━━━━━━━━━━━━━━━━━",
-                inline=False
-            )
-            
-            checkin_embed.add_field(
-                name="<:JQplane:1421703070907105280> CHECK-IN CLOSED",
-                value="Online check-in for this flight has now closed.\n\nPassengers are advised to proceed directly to the airport and complete check-in at the Jetstar service counter.",
-                inline=False
-            )
-            
-            checkin_embed.add_field(
-                name="<:JQcall:1421702400162402304> IMPORTANT INFORMATION",
-                value="• Arrive at the airport at least **2 hours** before departure for domestic flights\n• Arrive at least **3 hours** before departure for international flights\n• Have your booking reference and identification ready",
-                inline=False
-            )
-            
-            checkin_embed.add_field(
-                name="<:JQtower:1421700708629086250> NEED ASSISTANCE?",
-                value="Visit the Jetstar service desk or contact our customer service team for support.",
-                inline=False
-            )
-            
-            checkin_embed.set_footer(
-                text="Jetstar Airways • All Day, Every Day, Low Fares",
-                icon_url="https://logos-world.net/wp-content/uploads/2023/01/Jetstar-Logo-2003.png"
-            )
-        
-        # Send check-in closed message
-        await interaction.channel.send(embed=checkin_embed)
-        
-        # Acknowledge the button click
-        await interaction.response.send_message("✅ Check-in closed message sent!", ephemeral=True)
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: Button, match):
+        departure = int(match["departure"]) if match["departure"] else None
+        return cls(unquote(match["airline"]), unquote(match["flight_number"]), departure)
     
-    @button(label="Send Check-In Closed", style=discord.ButtonStyle.blurple, emoji="🔒")
-    async def checkin_closed_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if interaction.user != self.author:
-            await interaction.response.send_message(
-                "This isn't your flight planning session!", 
-                ephemeral=True
-            )
-            return
+    async def callback(self, interaction: discord.Interaction):
+        # Acknowledge the button click, then queue the message ahead of routine posts
+        await interaction.response.send_message("✅ Check-in closed message sent!", ephemeral=True)
         
-        # Get the target channel
-        target_channel_id = 1400766110306926652
-        target_channel = interaction.client.get_channel(target_channel_id)
-        
-        if not target_channel:
-            await interaction.response.send_message(
-                "❌ Could not find the destination channel.",
-                ephemeral=True
-            )
-            return
+        # Announced by hand, so the automatic post is no longer needed
+        cog = planner(interaction.client)
+        if cog is not None:
+            cog.cancel_checkin_closed(interaction.guild_id, self.flight_number, self.departure)
         
         try:
-            # Create professional check-in closed embed
-            if self.airline == "Qantas":
-                checkin_embed = discord.Embed(
-                    title="",
-                    description="",
-                    color=0xE40000
-                )
-                checkin_embed.set_thumbnail(url="https://1000logos.net/wp-content/uploads/2017/05/Qantas-Logo-1536x966.png")
-                
-                checkin_embed.add_field(
-                    name="<:QFtail2:1401856972180947035> CHECK-IN STATUS",
-                    value=f"**Flight {self.flight_number}**",
-                    inline=False
-                )
-                
-                checkin_embed.add_field(
-                    name="",
-                    value="━━━━━━━━━━━━━━━━━━━━━━",
-                    inline=False
-                )
-                
-                checkin_embed.add_field(
-                    name="<:QFseatbelt:1401010857928032316> CHECK-IN CLOSED",
-                    value="Online check-in for this flight has now closed.\n\nPassengers are advised to proceed directly to the airport and complete check-in at the Qantas service counter.",
-                    inline=False
-                )
-                
-                checkin_embed.add_field(
-                    name="<:Announcment:1399308384502808588> IMPORTANT INFORMATION",
-                    value="• Arrive at the airport at least **2 hours** before departure for domestic flights\n• Arrive at least **3 hours** before departure for international flights\n• Have your booking reference and identification ready",
-                    inline=False
-                )
-                
-                checkin_embed.add_field(
-                    name="<:External:1399308477897244705> NEED ASSISTANCE?",
-                    value="Visit the Qantas service desk or contact our customer service team for support.",
-                    inline=False
-                )
-                
-                checkin_embed.set_footer(
-                    text="Qantas Airways • The Spirit of Australia",
-                    icon_url="https://1000logos.net/wp-content/uploads/2017/05/Qantas-Logo-1536x966.png"
-                )
-                
-            else:  # Jetstar
-                checkin_embed = discord.Embed(
-                    title="",
-                    description="",
-                    color=0xFF6600
-                )
-                checkin_embed.set_thumbnail(url="https://logos-world.net/wp-content/uploads/2023/01/Jetstar-Logo-2003.png")
-                
-                checkin_embed.add_field(
-                    name="<:JQtail:1421704382608838776> CHECK-IN STATUS",
-                    value=f"**Flight {self.flight_number}**",
-                    inline=False
-                )
-                
-                checkin_embed.add_field(
-                    name="",
-                    value="━━━━━━━━━━━━━━━━━━━━━━",
-                    inline=False
-                )
-                
-                checkin_embed.add_field(
-                    name="<:JQplane:1421703070907105280> CHECK-IN CLOSED",
-                    value="Online check-in for this flight has now closed.\n\nPassengers are advised to proceed directly to the airport and complete check-in at the Jetstar service counter.",
-                    inline=False
-                )
-                
-                checkin_embed.add_field(
-                    name="<:JQcall:1421702400162402304> IMPORTANT INFORMATION",
-                    value="• Arrive at the airport at least **2 hours** before departure for domestic flights\n• Arrive at least **3 hours** before departure for international flights\n• Have your booking reference and identification ready",
-                    inline=False
-                )
-                
-                checkin_embed.add_field(
-                    name="<:JQtower:1421700708629086250> NEED ASSISTANCE?",
-                    value="Visit the Jetstar service desk or contact our customer service team for support.",
-                    inline=False
-                )
-                
-                checkin_embed.set_footer(
-                    text="Jetstar Airways • All Day, Every Day, Low Fares",
-                    icon_url="https://logos-world.net/wp-content/uploads/2023/01/Jetstar-Logo-2003.png"
-                )
-            
-            # Send check-in closed message
-            await target_channel.send(embed=checkin_embed)
-            
-            # Confirm to user
-            success_embed = discord.Embed(
-                title="✅ Check-In Closed Message Sent!",
-                description=f"The check-in closed notification has been sent to <#{target_channel_id}>!",
-                color=discord.Color.green()
+            await send_fitted(
+                interaction.channel, build_checkin_closed_embed(self.airline, self.flight_number),
+                outbound(interaction.client), priority=PRIORITY_CHECKIN
             )
-            
-            await interaction.response.edit_message(embed=success_embed, view=None)
-            
         except Exception as e:
-            await interaction.response.send_message(
-                f"❌ Failed to send message: {str(e)}",
-                ephemeral=True
-            )
-        
-        # End the session
-        self.handler.end_session(self.author.id)
-        self.stop()
-    
-    @button(label="Don't Send", style=discord.ButtonStyle.red, emoji="❌")
-    async def cancel_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if interaction.user != self.author:
-            await interaction.response.send_message(
-                "This isn't your flight planning session!", 
-                ephemeral=True
-            )
-            return
-        
-        # Cancel and end session
-        cancel_embed = discord.Embed(
-            title="❌ Flight Plan Cancelled",
-            description="Your flight plan was not sent. Session closed.",
-            color=discord.Color.red()
-        )
-        
-        await interaction.response.edit_message(embed=cancel_embed, view=None)
-        
-        # End the session
-        self.handler.end_session(self.author.id)
-        self.stop()
+            await interaction.followup.send(f"❌ Failed to send message: {str(e)}", ephemeral=True)
 
 
-class FlightNumberConfirmationView(View):
-    """View for confirming the flight number"""
+class SendCheckInClosedButton(
+    DynamicItem[Button],
+    template=r"flightplanner:checkin-send:(?P<author_id>\d+):(?P<airline>[^:]+):(?P<flight_number>[^:]+)(?::(?P<departure>\d+))?"
+):
+    """Lets the planner announce check-in closed to the guild's destinations"""
     
-    def __init__(self, author, handler, flight_number):
-        super().__init__(timeout=60)
-        self.author = author
-        self.handler = handler
+    def __init__(self, author_id, airline, flight_number, departure=None):
+        parts = (author_id, airline, flight_number) if departure is None else (author_id, airline, flight_number, departure)
+        super().__init__(Button(
+            label="Send Check-In Closed", style=discord.ButtonStyle.blurple, emoji="🔒",
+            custom_id=custom_id("flightplanner:checkin-send", *parts)
+        ))
+        self.author_id = author_id
+        self.airline = airline
         self.flight_number = flight_number
+        self.departure = departure
     
-    @button(label="Yes, Correct", style=discord.ButtonStyle.green, emoji="✅")
-    async def confirm_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if interaction.user != self.author:
-            await interaction.response.send_message(
-                "This isn't your flight planning session!", 
-                ephemeral=True
-            )
-            return
-        
-        # Save flight number
-        self.handler.update_session(self.author.id, "flight_number", self.flight_number)
-        
-        # Get session data
-        session = self.handler.get_session(self.author.id)
-        
-        # Create stylish final summary
-        airline = session["airline"]
-        
-        if airline == "Qantas":
-            # Qantas modern embed
-            embed = discord.Embed(
-                title="",
-                description="",
-                color=0xE40000  # Qantas red
-            )
-            
-            # Set Qantas logo
-            embed.set_thumbnail(url="https://1000logos.net/wp-content/uploads/2017/05/Qantas-Logo-1536x966.png")
-            
-            # Flight header
-            embed.add_field(
-                name="<:QFtail2:1401856972180947035> FLIGHT CONFIRMATION",
-                value=f"**Flight {self.flight_number}** • {session['aircraft']}",
-                inline=False
-            )
-            
-            # Route with emojis
-            embed.add_field(
-                name="<:Departing:1399308427267801138> DEPARTURE",
-                value=f"**{session['departure_code']}** {session['departure_name']}\n<t:{session['combined_timestamp']}:F>\n<t:{session['combined_timestamp']}:R>",
-                inline=True
-            )
-            
-            embed.add_field(
-                name="<:Landing:1399308429801029692> ARRIVAL",
-                value=f"**{session['arrival_code']}** {session['arrival_name']}",
-                inline=True
-            )
-            
-            # Spacer
-            embed.add_field(name="\u200b", value="\u200b", inline=False)
-            
-            # Flight details with custom emojis
-            details = []
-            details.append(f"<:Australia:1399308387866640508> **Route:** {session['departure_code']} → {session['arrival_code']}")
-            details.append(f"<:QFseatbelt:1401010857928032316> **Aircraft:** {session['aircraft']}")
-            details.append(f"<:Announcment:1399308384502808588> **Status:** Confirmed")
-            
-            embed.add_field(
-                name="<:External:1399308477897244705> FLIGHT INFORMATION",
-                value="\n".join(details),
-                inline=False
-            )
-            
-            # Amenities
-            amenities = "<:QFwifi:1401010833831759922> Wi-Fi Available  •  <:QFmail:1399308493910966322> In-Flight Service  •  <:Link:1399308473342099507> Entertainment"
-            embed.add_field(
-                name="✈️ AMENITIES & SERVICES",
-                value=amenities,
-                inline=False
-            )
-            
-            # Footer
-            embed.set_footer(
-                text="Qantas Airways • The Spirit of Australia",
-                icon_url="https://1000logos.net/wp-content/uploads/2017/05/Qantas-Logo-1536x966.png"
-            )
-            
-        else:
-            # Jetstar modern embed
-            embed = discord.Embed(
-                title="",
-                description="",
-                color=0xFF6600  # Jetstar orange
-            )
-            
-            # Set Jetstar logo
-            embed.set_thumbnail(url="https://logos-world.net/wp-content/uploads/2023/01/Jetstar-Logo-2003.png")
-            
-            # Flight header
-            embed.add_field(
-                name="<:JQtail:1421704382608838776> FLIGHT CONFIRMATION",
-                value=f"**Flight {self.flight_number}** • {session['aircraft']}",
-                inline=False
-            )
-            
-            # Route with emojis
-            embed.add_field(
-                name="<:JQplane:1421703070907105280> DEPARTURE",
-                value=f"**{session['departure_code']}** {session['departure_name']}\n<t:{session['combined_timestamp']}:F>\n<t:{session['combined_timestamp']}:R>",
-                inline=True
-            )
-            
-            embed.add_field(
-                name="<:JQtower:1421700708629086250> ARRIVAL",
-                value=f"**{session['arrival_code']}** {session['arrival_name']}",
-                inline=True
-            )
-            
-            # Spacer
-            embed.add_field(name="\u200b", value="\u200b", inline=False)
-            
-            # Flight details with custom emojis
-            details = []
-            details.append(f"<:JQwhite:1421704746355527801> **Route:** {session['departure_code']} → {session['arrival_code']}")
-            details.append(f"<:JQplane:1421703070907105280> **Aircraft:** {session['aircraft']}")
-            details.append(f"<:JQcall:1421702400162402304> **Status:** Confirmed")
-            
-            embed.add_field(
-                name="<:JQwhite:1421704746355527801> FLIGHT INFORMATION",
-                value="\n".join(details),
-                inline=False
-            )
-            
-            # Amenities
-            amenities = "<:JQmusic:1421701618377687050> In-Flight Entertainment  •  <:JQcall:1421702400162402304> Customer Service"
-            embed.add_field(
-                name="✈️ SERVICES",
-                value=amenities,
-                inline=False
-            )
-            
-            # Footer
-            embed.set_footer(
-                text="Jetstar Airways • All Day, Every Day, Low Fares",
-                icon_url="https://logos-world.net/wp-content/uploads/2023/01/Jetstar-Logo-2003.png"
-            )
-        
-        # Create buttons for sending confirmation AND check-in closed
-        send_view = SendConfirmationView(self.author, self.handler, embed, session["airline"], self.flight_number)
-        
-        await interaction.response.edit_message(embed=embed, view=send_view)
-        
-        # Don't end session yet - wait for send confirmation
-        self.stop()
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: Button, match):
+        departure = int(match["departure"]) if match["departure"] else None
+        return cls(int(match["author_id"]), unquote(match["airline"]), unquote(match["flight_number"]), departure)
     
-    @button(label="No, Try Again", style=discord.ButtonStyle.red, emoji="❌")
-    async def retry_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if interaction.user != self.author:
+    async def interaction_check(self, interaction: discord.Interaction):
+        return await is_session_owner(interaction, self.author_id)
+    
+    async def callback(self, interaction: discord.Interaction):
+        cog = planner(interaction.client)
+        if cog is None:
             await interaction.response.send_message(
-                "This isn't your flight planning session!", 
+                "❌ The flight planner isn't loaded.",
                 ephemeral=True
             )
             return
+        channel_ids = cog.destinations.channel_ids(interaction.guild_id)
         
-        # Get airline from session
-        session = self.handler.get_session(self.author.id)
-        airline = session.get("airline", "")
-        
-        # Determine airline prefix
-        prefix_hint = ""
-        if airline == "Qantas":
-            prefix_hint = "\n\n**Hint:** Qantas flights start with `QF` (e.g., QF94)"
-        elif airline == "Jetstar":
-            prefix_hint = "\n\n**Hint:** Jetstar flights start with `JQ` (e.g., JQ30)"
-        
-        embed = discord.Embed(
-            title="✈️ Flight Number",
-            description=f"Please enter your flight number.{prefix_hint}",
-            color=discord.Color.blue()
+        # Confirm to user straight away; the message goes out ahead of routine posts
+        success_embed = discord.Embed(
+            title="✅ Check-In Closed Message Sent!",
+            description=f"The check-in closed notification is being posted to {mention_channels(channel_ids)}.",
+            color=discord.Color.green()
         )
-        embed.add_field(
-            name="Examples",
-            value="• `QF94`\n• `JQ30`\n• `VA803`",
-            inline=False
-        )
-        embed.set_footer(text="Type the flight number in chat")
         
-        await interaction.response.edit_message(embed=embed, view=None)
-        self.stop()
-    
-    @button(label="No, Try Again", style=discord.ButtonStyle.red, emoji="❌")
-    async def retry_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if interaction.user != self.author:
-            await interaction.response.send_message(
-                "This isn't your flight planning session!", 
-                ephemeral=True
-            )
-            return
+        await interaction.response.edit_message(embed=success_embed, view=None)
         
-        embed = discord.Embed(
-            title="🛫 Departure Airport",
-            description="Please enter the **3-letter IATA code** of your departure airport.\n\nExample: `SYD` for Sydney, `MEL` for Melbourne",
-            color=discord.Color.blue()
-        )
-        embed.set_footer(text="Type the 3-letter airport code in chat")
+        # The session ended when the plan was sent; this click can come much
+        # later, so only the automatic check-in closed post is dropped
+        cog.cancel_checkin_closed(interaction.guild_id, self.flight_number, self.departure)
         
-        await interaction.response.edit_message(embed=embed, view=None)
-        self.stop()
+        # Send check-in closed message to the same destinations as the plan
+        embed = build_checkin_closed_embed(self.airline, self.flight_number)
+        deliveries = await cog.destinations.post(channel_ids, embed, PRIORITY_CHECKIN)
+        await report_failed_deliveries(interaction, deliveries, "check-in closed message")
 
 
-class ArrivalAirportConfirmationView(View):
-    """View for confirming the arrival airport"""
+class SkipCheckInClosedButton(DynamicItem[Button], template=r"flightplanner:checkin-skip:(?P<author_id>\d+)"):
+    """Dismisses the check-in closed prompt without announcing it"""
     
-    def __init__(self, author, handler, iata_code, airport_info):
-        super().__init__(timeout=60)
-        self.author = author
-        self.handler = handler
-        self.iata_code = iata_code
-        self.airport_info = airport_info
+    def __init__(self, author_id):
+        super().__init__(Button(
+            label="Don't Send", style=discord.ButtonStyle.red, emoji="❌",
+            custom_id=custom_id("flightplanner:checkin-skip", author_id)
+        ))
+        self.author_id = author_id
     
-    @button(label="Yes, Correct", style=discord.ButtonStyle.green, emoji="✅")
-    async def confirm_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if interaction.user != self.author:
-            await interaction.response.send_message(
-                "This isn't your flight planning session!", 
-                ephemeral=True
-            )
-            return
-        
-        # Save arrival airport and ask for departure time
-        self.handler.update_session(self.author.id, "arrival_code", self.iata_code)
-        self.handler.update_session(self.author.id, "arrival_name", self.airport_info['name'])
-        self.handler.update_session(self.author.id, "stage", "departure_time")
-        
-        # Get current Sydney time for reference
-        sydney_tz = pytz.timezone('Australia/Sydney')
-        current_sydney = datetime.now(sydney_tz)
-        sydney_timestamp = int(current_sydney.timestamp())
-        
-        embed = discord.Embed(
-            title="🕐 Departure Time",
-            description=f"Please enter your departure time in **Sydney time** (AEDT).\n\n**Current Sydney time:** <t:{sydney_timestamp}:t>",
-            color=discord.Color.blue()
-        )
-        embed.add_field(
-            name="Accepted Formats",
-            value="• `14:30` (24-hour)\n• `2:30 PM` (12-hour)\n• `1430` (no colon)",
-            inline=False
-        )
-        embed.set_footer(text="Type the departure time in chat")
-        
-        await interaction.response.edit_message(embed=embed, view=None)
-        self.stop()
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: Button, match):
+        return cls(int(match["author_id"]))
     
-    @button(label="No, Try Again", style=discord.ButtonStyle.red, emoji="❌")
-    async def retry_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if interaction.user != self.author:
-            await interaction.response.send_message(
-                "This isn't your flight planning session!", 
-                ephemeral=True
-            )
-            return
-        
-        embed = discord.Embed(
-            title="🛬 Arrival Airport",
-            description="Please enter the **3-letter IATA code** of your arrival airport.\n\nExample: `MEL` for Melbourne, `BNE` for Brisbane",
-            color=discord.Color.blue()
+    async def interaction_check(self, interaction: discord.Interaction):
+        return await is_session_owner(interaction, self.author_id)
+    
+    async def callback(self, interaction: discord.Interaction):
+        # The plan is already posted and its session ended when it was sent,
+        # so only the check-in closed notice is skipped here
+        skip_embed = discord.Embed(
+            title="Check-In Closed Notice Skipped",
+            description="Your flight plan has been posted. The check-in closed notice was not sent.",
+            color=discord.Color.dark_grey()
         )
-        embed.set_footer(text="Type the 3-letter airport code in chat")
         
-        await interaction.response.edit_message(embed=embed, view=None)
-        self.stop()
+        await interaction.response.edit_message(embed=skip_embed, view=None)
 
 
-class DepartureTimeConfirmationView(View):
-    """View for confirming the departure time"""
-    
-    def __init__(self, author, handler, time_obj, timestamp):
-        super().__init__(timeout=60)
-        self.author = author
-        self.handler = handler
-        self.time_obj = time_obj
-        self.timestamp = timestamp
-    
-    @button(label="Yes, Correct", style=discord.ButtonStyle.green, emoji="✅")
-    async def confirm_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if interaction.user != self.author:
-            await interaction.response.send_message(
-                "This isn't your flight planning session!", 
-                ephemeral=True
-            )
-            return
-        
-        # Save departure time and move to date selection
-        self.handler.update_session(self.author.id, "departure_time", self.time_obj)
-        self.handler.update_session(self.author.id, "departure_timestamp", self.timestamp)
-        self.handler.update_session(self.author.id, "stage", "departure_date")
-        
-        # Get current Sydney time for reference
-        sydney_tz = pytz.timezone('Australia/Sydney')
-        current_sydney = datetime.now(sydney_tz)
-        
-        embed = discord.Embed(
-            title="📅 Departure Date",
-            description="Please enter your departure date.\n\n**Current date:** " + current_sydney.strftime("%d/%m/%Y"),
-            color=discord.Color.blue()
-        )
-        embed.add_field(
-            name="Accepted Formats",
-            value="• `25/01/2026` (DD/MM/YYYY)\n• `25-01-2026` (DD-MM-YYYY)\n• `25 Jan 2026`\n• `today` or `tomorrow`",
-            inline=False
-        )
-        embed.set_footer(text="Type the departure date in chat")
-        
-        await interaction.response.edit_message(embed=embed, view=None)
-        self.stop()
+# Registered once with bot.add_dynamic_items at cog load
+PERSISTENT_BUTTONS = (CheckInClosedButton, SendCheckInClosedButton, SkipCheckInClosedButton)
 
 
-class DepartureDateConfirmationView(View):
-    """View for confirming the departure date"""
-    
-    def __init__(self, author, handler, date_obj, combined_timestamp):
-        super().__init__(timeout=60)
-        self.author = author
-        self.handler = handler
-        self.date_obj = date_obj
-        self.combined_timestamp = combined_timestamp
+class FlightPlanActionsView(View):
+    """Buttons that appear on the sent flight plan message"""
     
-    @button(label="Yes, Correct", style=discord.ButtonStyle.green, emoji="✅")
-    async def confirm_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if interaction.user != self.author:
-            await interaction.response.send_message(
-                "This isn't your flight planning session!", 
-                ephemeral=True
-            )
-            return
-        
-        # Save departure date and move to flight number
-        self.handler.update_session(self.author.id, "departure_date", self.date_obj)
-        self.handler.update_session(self.author.id, "combined_timestamp", self.combined_timestamp)
-        self.handler.update_session(self.author.id, "stage", "flight_number")
-        
-        # Get airline from session
-        session = self.handler.get_session(self.author.id)
-        airline = session.get("airline", "")
-        
-        # Determine airline prefix
-        prefix_hint = ""
-        if airline == "Qantas":
-            prefix_hint = "\n\n**Hint:** Qantas flights start with `QF` (e.g., QF94)"
-        elif airline == "Jetstar":
-            prefix_hint = "\n\n**Hint:** Jetstar flights start with `JQ` (e.g., JQ30)"
-        
-        embed = discord.Embed(
-            title="✈️ Flight Number",
-            description=f"Please enter your flight number.{prefix_hint}",
-            color=discord.Color.blue()
-        )
-        embed.add_field(
-            name="Examples",
-            value="• `QF94`\n• `JQ30`\n• `VA803`",
-            inline=False
-        )
-        embed.set_footer(text="Type the flight number in chat")
-        
-        await interaction.response.edit_message(embed=embed, view=None)
-        self.stop()
+    def __init__(self, airline, flight_number, departure=None):
+        super().__init__(timeout=None)  # Buttons never expire
+        self.add_item(CheckInClosedButton(airline, flight_number, departure))
+
+
+class CheckInClosedButtonView(View):
+    """Lets the planner announce check-in closed once the plan has been sent"""
     
-    @button(label="No, Try Again", style=discord.ButtonStyle.red, emoji="❌")
-    async def retry_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if interaction.user != self.author:
-            await interaction.response.send_message(
-                "This isn't your flight planning session!", 
-                ephemeral=True
-            )
-            return
-        
-        # Get current Sydney time for reference
-        sydney_tz = pytz.timezone('Australia/Sydney')
-        current_sydney = datetime.now(sydney_tz)
-        
-        embed = discord.Embed(
-            title="📅 Departure Date",
-            description="Please enter your departure date.\n\n**Current date:** " + current_sydney.strftime("%d/%m/%Y"),
-            color=discord.Color.blue()
-        )
-        embed.add_field(
-            name="Accepted Formats",
-            value="• `25/01/2026` (DD/MM/YYYY)\n• `25-01-2026` (DD-MM-YYYY)\n• `25 Jan 2026`\n• `today` or `tomorrow`",
-            inline=False
-        )
-        embed.set_footer(text="Type the departure date in chat")
-        
-        await interaction.response.edit_message(embed=embed, view=None)
-        self.stop()
+    def __init__(self, author, airline, flight_number, departure=None):
+        super().__init__(timeout=None)
+        self.add_item(SendCheckInClosedButton(author.id, airline, flight_number, departure))
+        self.add_item(SkipCheckInClosedButton(author.id))
+
+
+def build_milestone_embed(milestone, airline, flight_number):
+    """Check-in closed, boarding and other per-flight notices, by layout name"""
+    return render(milestone, airline, {"flight_number": flight_number})
+
+
+def build_checkin_closed_embed(airline, flight_number):
+    return build_milestone_embed("checkin_closed", airline, flight_number)
+
+
+def build_flight_plan_embed(session, values=None):
+    """The finished flight plan embed, styled for the session's airline"""
+    return render("flight_plan", session.airline, values or flight_plan_values(session))
+
+
+class FlightNumberConfirmationView(StageConfirmationView):
+    """Confirms the flight number and shows the finished flight plan"""
     
-    @button(label="No, Try Again", style=discord.ButtonStyle.red, emoji="❌")
-    async def retry_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if interaction.user != self.author:
-            await interaction.response.send_message(
-                "This isn't your flight planning session!", 
-                ephemeral=True
-            )
-            return
-        
-        # Get current Sydney time for reference
-        sydney_tz = pytz.timezone('Australia/Sydney')
-        current_sydney = datetime.now(sydney_tz)
-        sydney_timestamp = int(current_sydney.timestamp())
+    async def on_confirmed(self, interaction: discord.Interaction, session):
+        values = flight_plan_values(session)
+        embed = build_flight_plan_embed(session, values)
         
-        embed = discord.Embed(
-            title="🕐 Departure Time",
-            description=f"Please enter your departure time in **Sydney time** (AEDT).\n\n**Current Sydney time:** <t:{sydney_timestamp}:t>",
-            color=discord.Color.blue()
-        )
-        embed.add_field(
-            name="Accepted Formats",
-            value="• `14:30` (24-hour)\n• `2:30 PM` (12-hour)\n• `1430` (no colon)",
-            inline=False
+        # Create buttons for sending confirmation AND check-in closed
+        send_view = SendConfirmationView(
+            self.author, self.handler, embed, session.airline, session.flight_number, values
         )
-        embed.set_footer(text="Type the departure time in chat")
         
-        await interaction.response.edit_message(embed=embed, view=None)
-        self.stop()
+        # Don't end session yet - wait for send confirmation. The preview
+        # shows the first message's worth; sending posts every part
+        await interaction.response.edit_message(embeds=message_batches(embed)[0], view=send_view)
@@ -0,0 +1,77 @@
+"""
+Build the bundled airport database (airports.dat) used by airports.py.
+
+The source is the airports.csv shipped with the MIT-licensed ``airportsdata``
+package (https://github.com/mborsetti/airportsdata), or any CSV with the same
+columns. Its copyright and licence notice, which must ship with the built
+file, is in LICENSE-airportsdata next to it. Country codes are expanded to
+names with ``pycountry`` when it is installed.
+
+Usage: python build_airports.py [airports.csv] [airports.dat]
+"""
+
+import csv
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from airports import write_database  # noqa: E402
+
+# Codes pycountry doesn't know about or names it only has in a formal form
+COUNTRY_OVERRIDES = {
+    'XK': 'Kosovo',
+}
+
+
+def default_source():
+    import airportsdata
+    return os.path.join(os.path.dirname(airportsdata.__file__), "airports.csv")
+
+
+def country_namer():
+    try:
+        import pycountry
+    except ImportError:
+        return lambda code: COUNTRY_OVERRIDES.get(code, code)
+
+    def name(code):
+        if code in COUNTRY_OVERRIDES:
+            return COUNTRY_OVERRIDES[code]
+        country = pycountry.countries.get(alpha_2=code)
+        if country is None:
+            return code
+        return getattr(country, 'common_name', None) or country.name
+
+    return name
+
+
+def read_airports(source):
+    country_name = country_namer()
+    with open(source, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            code = row['iata'].strip().upper()
+            if len(code) != 3 or not code.isalpha():
+                continue
+            yield {
+                'code': code,
+                'name': row['name'].strip(),
+                'city': row['city'].strip(),
+                'country': country_name(row['country'].strip()),
+                'timezone': row['tz'].strip(),
+                'lat': float(row['lat']),
+                'lon': float(row['lon'])
+            }
+
+
+def main():
+    source = sys.argv[1] if len(sys.argv) > 1 else default_source()
+    target = sys.argv[2] if len(sys.argv) > 2 else os.path.join(os.path.dirname(os.path.abspath(__file__)), "airports.dat")
+
+    airports = {airport['code']: airport for airport in read_airports(source)}
+    write_database(target, airports.values())
+    print(f"Wrote {len(airports)} airports to {target}")
+
+
+if __name__ == "__main__":
+    main()
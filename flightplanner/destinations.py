@@ -0,0 +1,126 @@
+import asyncio
+import json
+import logging
+from typing import NamedTuple, Optional
+
+import discord
+
+from embedlimits import message_batches
+
+logger = logging.getLogger(__name__)
+
+WEBHOOK_NAME = "Flight Planner"
+# Guild key that applies to every guild without its own destination set
+ANY_GUILD = "*"
+
+
+def parse_destinations(value, default):
+    """Map guild ID (or :data:`ANY_GUILD`) to a tuple of channel IDs
+
+    ``value`` is the ``flightplanner_destinations`` setting: either a comma
+    separated list of channel IDs used for every guild, or a JSON object
+    such as ``{"*": [1, 2], "123": [3]}`` giving guilds their own sets.
+    """
+    if not value:
+        return {ANY_GUILD: tuple(default)}
+    if isinstance(value, str):
+        value = value.strip()
+        if value.startswith("{"):
+            value = json.loads(value)
+        else:
+            value = {ANY_GUILD: value.split(",")}
+    elif not isinstance(value, dict):
+        value = {ANY_GUILD: value}
+    return {
+        str(guild).strip(): tuple(int(channel) for channel in channels if str(channel).strip())
+        for guild, channels in value.items()
+    }
+
+
+class Delivery(NamedTuple):
+    channel_id: int
+    messages: list
+    error: Optional[Exception]
+
+
+class Destinations:
+    """Mirrors posts to each guild's destination channels through cached webhooks
+
+    Every destination is posted to concurrently and independently: a slow
+    or failing channel only shows up in its own :class:`Delivery`. Sends
+    still go through the outbound scheduler, so buckets and priorities
+    apply per webhook. Channels where the bot can't manage webhooks fall
+    back to a normal channel message.
+    """
+
+    def __init__(self, bot, scheduler, routes):
+        self.bot = bot
+        self.scheduler = scheduler
+        self.routes = routes
+        # channel ID -> Webhook, or None where webhooks aren't available
+        self.webhooks = {}
+        self._locks = {}
+
+    def channel_ids(self, guild_id):
+        return self.routes.get(str(guild_id), self.routes.get(ANY_GUILD, ()))
+
+    async def post(self, channel_ids, embed, priority):
+        """Post ``embed`` to every channel in ``channel_ids`` at once; returns one Delivery each"""
+        return await asyncio.gather(*(self._post_one(channel_id, embed, priority) for channel_id in channel_ids))
+
+    async def _post_one(self, channel_id, embed, priority):
+        try:
+            channel = await self._channel(channel_id)
+            webhook = await self._webhook(channel)
+            messages = []
+            # Sent part by part so a webhook lost midway only falls back for
+            # the parts it hadn't posted yet
+            for embeds in message_batches(embed):
+                if webhook is not None:
+                    try:
+                        messages.append(await self._send_webhook(webhook, embeds, priority))
+                        continue
+                    except discord.NotFound:
+                        # Deleted from under us; recreate it next time and post normally now
+                        if self.webhooks.get(channel_id) is webhook:
+                            del self.webhooks[channel_id]
+                        webhook = None
+                messages.append(await self.scheduler.send(channel, priority, embeds=embeds))
+            return Delivery(channel_id, messages, None)
+        except Exception as e:
+            logger.warning("Could not post to destination %s: %s", channel_id, e)
+            return Delivery(channel_id, [], e)
+
+    async def _channel(self, channel_id):
+        channel = self.bot.get_channel(channel_id)
+        if channel is None:
+            channel = await self.bot.fetch_channel(channel_id)
+        return channel
+
+    async def _send_webhook(self, webhook, embeds, priority):
+        user = self.bot.user
+        return await self.scheduler.send(
+            webhook, priority, embeds=embeds, wait=True,
+            username=user.display_name, avatar_url=user.display_avatar.url
+        )
+
+    async def _webhook(self, channel):
+        if channel.id in self.webhooks:
+            return self.webhooks[channel.id]
+        lock = self._locks.setdefault(channel.id, asyncio.Lock())
+        async with lock:
+            if channel.id not in self.webhooks:
+                self.webhooks[channel.id] = await self._find_or_create_webhook(channel)
+        return self.webhooks[channel.id]
+
+    async def _find_or_create_webhook(self, channel):
+        if not isinstance(channel, discord.TextChannel):
+            return None
+        try:
+            for webhook in await channel.webhooks():
+                if webhook.name == WEBHOOK_NAME and webhook.user == self.bot.user:
+                    return webhook
+            return await channel.create_webhook(name=WEBHOOK_NAME)
+        except discord.Forbidden:
+            logger.info("No webhook permission in %s; posting as the bot", channel.id)
+            return None
@@ -0,0 +1,177 @@
+import discord
+
+# Discord's embed limits, in characters
+TITLE_LIMIT = 256
+DESCRIPTION_LIMIT = 4096
+FIELD_COUNT_LIMIT = 25
+FIELD_NAME_LIMIT = 256
+FIELD_VALUE_LIMIT = 1024
+FOOTER_LIMIT = 2048
+AUTHOR_LIMIT = 256
+# Summed over every embed in one message
+TOTAL_LIMIT = 6000
+EMBEDS_PER_MESSAGE = 10
+
+ELLIPSIS = "…"
+CONTINUED = "\u200b"
+
+
+def text_length(text):
+    """Length as Discord counts it (UTF-16 code units, which never undercounts)"""
+    if not text:
+        return 0
+    if text.isascii():
+        return len(text)
+    return len(text.encode("utf-16-le")) // 2
+
+
+def _prefix(text, limit):
+    """Longest prefix of ``text`` within ``limit``"""
+    cut = limit
+    while text_length(text[:cut]) > limit:
+        cut -= text_length(text[:cut]) - limit
+    return cut
+
+
+def truncate(text, limit):
+    if text_length(text) <= limit:
+        return text
+    return text[:_prefix(text, limit - 1)] + ELLIPSIS
+
+
+def split_text(text, limit):
+    """Split ``text`` into chunks of at most ``limit``, preferring line breaks"""
+    chunks = []
+    while text_length(text) > limit:
+        cut = _prefix(text, limit)
+        newline = text.rfind("\n", 0, cut)
+        if newline > 0:
+            cut = newline
+        chunks.append(text[:cut])
+        text = text[cut:].lstrip("\n")
+    if text or not chunks:
+        chunks.append(text)
+    return chunks
+
+
+def embed_length(data):
+    """Characters counted towards :data:`TOTAL_LIMIT` for an embed dict"""
+    total = text_length(data.get("title")) + text_length(data.get("description"))
+    total += text_length(data.get("footer", {}).get("text"))
+    total += text_length(data.get("author", {}).get("name"))
+    for field in data.get("fields", ()):
+        total += text_length(field.get("name")) + text_length(field.get("value"))
+    return total
+
+
+def fit_embed(embed):
+    """Return ``embed`` as one or more embeds that each respect Discord's limits
+
+    Titles, field names, footers and author names are truncated. Long
+    descriptions and field values are split into continuation parts, and
+    fields overflowing one embed move to follow-on embeds in the same
+    colour, so nothing is lost. The footer and timestamp go on the last
+    embed. An embed already within limits is returned unchanged.
+    """
+    data = embed.to_dict()
+    if _within_limits(data):
+        return [embed]
+
+    base = {key: data[key] for key in ("type", "color") if key in data}
+    first = dict(base)
+    for key in ("url", "thumbnail", "image", "author"):
+        if key in data:
+            first[key] = data[key]
+    if "author" in first:
+        first["author"] = {**first["author"], "name": truncate(first["author"].get("name", ""), AUTHOR_LIMIT)}
+    if data.get("title"):
+        first["title"] = truncate(data["title"], TITLE_LIMIT)
+
+    pieces = []
+    descriptions = split_text(data.get("description", ""), DESCRIPTION_LIMIT) if data.get("description") else []
+    fields = []
+    for field in data.get("fields", ()):
+        name = truncate(field.get("name", ""), FIELD_NAME_LIMIT)
+        for index, value in enumerate(split_text(field.get("value", ""), FIELD_VALUE_LIMIT)):
+            fields.append({"name": name if index == 0 else CONTINUED, "value": value or CONTINUED, "inline": field.get("inline", False)})
+
+    footer = None
+    if "footer" in data:
+        footer = {**data["footer"], "text": truncate(data["footer"].get("text", ""), FOOTER_LIMIT)}
+    # Reserve room for the footer on whichever embed ends up last
+    footer_length = text_length(footer["text"]) if footer else 0
+
+    current = first
+    for description in descriptions:
+        if "description" in current:
+            pieces.append(current)
+            current = dict(base)
+        current["description"] = description
+    for field in fields:
+        needed = text_length(field["name"]) + text_length(field["value"])
+        if (
+            len(current.get("fields", ())) >= FIELD_COUNT_LIMIT
+            or embed_length(current) + needed + footer_length > TOTAL_LIMIT
+        ):
+            pieces.append(current)
+            current = dict(base)
+        current.setdefault("fields", []).append(field)
+    if footer:
+        if embed_length(current) + footer_length > TOTAL_LIMIT:
+            pieces.append(current)
+            current = dict(base)
+        current["footer"] = footer
+    if "timestamp" in data:
+        current["timestamp"] = data["timestamp"]
+    pieces.append(current)
+    return [discord.Embed.from_dict(piece) for piece in pieces]
+
+
+def _within_limits(data):
+    fields = data.get("fields", ())
+    return (
+        text_length(data.get("title")) <= TITLE_LIMIT
+        and text_length(data.get("description")) <= DESCRIPTION_LIMIT
+        and len(fields) <= FIELD_COUNT_LIMIT
+        and all(
+            text_length(field.get("name")) <= FIELD_NAME_LIMIT and text_length(field.get("value")) <= FIELD_VALUE_LIMIT
+            for field in fields
+        )
+        and text_length(data.get("footer", {}).get("text")) <= FOOTER_LIMIT
+        and text_length(data.get("author", {}).get("name")) <= AUTHOR_LIMIT
+        and embed_length(data) <= TOTAL_LIMIT
+    )
+
+
+def message_batches(embed):
+    """Group the fitted parts of ``embed`` into lists that can each go in one message"""
+    batches = []
+    batch = []
+    batch_length = 0
+    for part in fit_embed(embed):
+        length = embed_length(part.to_dict())
+        if batch and (len(batch) >= EMBEDS_PER_MESSAGE or batch_length + length > TOTAL_LIMIT):
+            batches.append(batch)
+            batch = []
+            batch_length = 0
+        batch.append(part)
+        batch_length += length
+    batches.append(batch)
+    return batches
+
+
+async def send_fitted(channel, embed, sender=None, **options):
+    """Send ``embed`` in as many messages as its size needs and return them
+
+    Oversized embeds are fitted locally first, so no request is made with
+    a payload Discord would reject. ``sender`` (e.g. an
+    :class:`~sender.OutboundScheduler`) paces the sends if given and gets
+    ``options`` such as ``priority``.
+    """
+    messages = []
+    for embeds in message_batches(embed):
+        if sender is not None:
+            messages.append(await sender.send(channel, embeds=embeds, **options))
+        else:
+            messages.append(await channel.send(embeds=embeds))
+    return messages
@@ -1,7 +1,9 @@
+from discord import app_commands
 from discord.ext import commands
 import discord
 import sys
 import os
+from typing import Optional
 
 # Add the plugin directory to the path
 plugin_dir = os.path.dirname(__file__)
@@ -25,9 +27,16 @@ class FlightPlannerCommands(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
     
-    @commands.command(name="plan")
-    async def plan_flight(self, ctx):
-        """Start planning a flight - choose between Qantas or Jetstar"""
+    @commands.hybrid_command(name="plan")
+    @app_commands.describe(details="Optional: flight, aircraft, airports, time and date, e.g. QF1 A380 SYD LHR 14:30 25/01/2026")
+    async def plan_flight(self, ctx, *, details: Optional[str] = None):
+        """Start planning a flight - choose between Qantas or Jetstar, or give every detail at once"""
+        
+        if details:
+            # One-shot plan: skip the step-by-step prompts
+            planner = self.bot.get_cog("FlightPlannerCog")
+            await planner.quick_plan(ctx, details)
+            return
         
         # Create an embed with the question
         embed = discord.Embed(
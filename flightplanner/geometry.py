@@ -0,0 +1,135 @@
+from collections import OrderedDict
+from typing import NamedTuple
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+
+# Typical cruise speeds (km/h) for the aircraft offered in the planner dropdowns
+CRUISE_SPEEDS = {
+    "Airbus A320": 828,
+    "Airbus A320neo": 833,
+    "Airbus A321": 828,
+    "Airbus A321neo": 833,
+    "Airbus A330-200": 871,
+    "Airbus A330-300": 871,
+    "Airbus A380": 903,
+    "Boeing 737-800": 842,
+    "Boeing 787-8": 903,
+    "Boeing 787-9": 903,
+    "Bombardier Dash 8 Q400": 556,
+}
+DEFAULT_CRUISE_SPEED = 828
+# Taxi, climb and descent on top of time at cruise
+BLOCK_OVERHEAD_MINUTES = 30
+# Number of per-origin distance rows kept for airports outside the matrix
+ROW_CACHE_SIZE = 64
+
+
+def great_circle(lat1, lon1, lat2, lon2):
+    """Haversine distance in km between points given in radians; broadcasts over arrays"""
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def block_minutes(distance_km, aircraft):
+    """Estimated gate-to-gate minutes for ``aircraft`` over ``distance_km``"""
+    speed = CRUISE_SPEEDS.get(aircraft, DEFAULT_CRUISE_SPEED)
+    return round(distance_km / speed * 60 + BLOCK_OVERHEAD_MINUTES)
+
+
+def format_block_time(minutes):
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes:02d}m"
+
+
+class RouteEstimate(NamedTuple):
+    distance_km: int
+    block_minutes: int
+
+
+class RouteGeometry:
+    """Great-circle distances between catalogued airports
+
+    Coordinates are held as NumPy arrays in radians. Distances between the
+    ``hubs`` are precomputed into a matrix; any other origin gets its whole
+    row (distance to every airport) computed in one vectorised pass and kept
+    in a small LRU, so repeated lookups from the same airport are free.
+    """
+
+    def __init__(self, airports, hubs=()):
+        codes = []
+        coordinates = []
+        for airport in airports:
+            codes.append(airport['code'])
+            coordinates.append((airport['lat'], airport['lon']))
+
+        self.codes = codes
+        self._index = {code: index for index, code in enumerate(codes)}
+        coordinates = np.radians(np.array(coordinates, dtype=np.float64).reshape(-1, 2))
+        self._lat = coordinates[:, 0]
+        self._lon = coordinates[:, 1]
+
+        hub_rows = [self._index[code] for code in hubs if code in self._index]
+        self._hubs = {self.codes[row]: position for position, row in enumerate(hub_rows)}
+        self.matrix = self.pairwise(hub_rows, hub_rows)
+        self._rows = OrderedDict()
+
+    @classmethod
+    def from_database(cls, database, hubs=()):
+        return cls(iter(database), hubs)
+
+    def __contains__(self, code):
+        return code in self._index
+
+    def pairwise(self, origins, destinations):
+        """Distance matrix (km) between two lists of airport row indices"""
+        origins = np.asarray(origins, dtype=np.intp)
+        destinations = np.asarray(destinations, dtype=np.intp)
+        return great_circle(
+            self._lat[origins, None], self._lon[origins, None],
+            self._lat[None, destinations], self._lon[None, destinations]
+        )
+
+    def distances_from(self, code):
+        """Distances (km) from ``code`` to every airport, indexed like :attr:`codes`"""
+        row = self._rows.get(code)
+        if row is not None:
+            self._rows.move_to_end(code)
+            return row
+
+        index = self._index[code]
+        row = great_circle(self._lat[index], self._lon[index], self._lat, self._lon)
+        self._rows[code] = row
+        if len(self._rows) > ROW_CACHE_SIZE:
+            self._rows.popitem(last=False)
+        return row
+
+    def distance(self, origin, destination):
+        """Great-circle distance in km, or None if either airport isn't catalogued"""
+        if origin not in self._index or destination not in self._index:
+            return None
+        if origin in self._hubs and destination in self._hubs:
+            return float(self.matrix[self._hubs[origin], self._hubs[destination]])
+        return float(self.distances_from(origin)[self._index[destination]])
+
+    def distances(self, pairs):
+        """Distances for many ``(origin, destination)`` pairs in one vectorised pass
+
+        Pairs with an uncatalogued airport come back as NaN.
+        """
+        origins = np.array([self._index.get(origin, -1) for origin, _ in pairs], dtype=np.intp)
+        destinations = np.array([self._index.get(destination, -1) for _, destination in pairs], dtype=np.intp)
+        result = great_circle(
+            self._lat[origins], self._lon[origins],
+            self._lat[destinations], self._lon[destinations]
+        )
+        result[(origins < 0) | (destinations < 0)] = np.nan
+        return result
+
+    def estimate(self, origin, destination, aircraft):
+        """Distance and block time for a flight, or None if it can't be placed"""
+        distance = self.distance(origin, destination)
+        if distance is None:
+            return None
+        return RouteEstimate(round(distance), block_minutes(distance, aircraft))
@@ -1,19 +1,307 @@
+import asyncio
+import heapq
+import logging
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Sessions idle for longer than this are swept away
+DEFAULT_IDLE_TTL = 15 * 60
+# Hard cap on concurrent sessions; the least recently used one is evicted first
+DEFAULT_MAX_SESSIONS = 1000
+# Upper bound on how long the sweeper sleeps between passes
+SWEEP_INTERVAL = 60
+# How often dirty sessions are written behind to the persistent backend
+DEFAULT_FLUSH_INTERVAL = 5
+
+
 class FlightDataHandler:
-    """Handles storing flight planning data temporarily"""
-    
-    def __init__(self):
-        self.active_sessions = {}
-    
-    def start_session(self, user_id, data):
+    """Handles storing flight planning data temporarily
+
+    Sessions expire after ``idle_ttl`` seconds without activity and the store
+    never holds more than ``max_sessions`` entries. Expiry is driven by a
+    single sweeper task walking a heap of deadlines, so there is no timer per
+    session. Assign an async ``on_session_expired(user_id, session, reason)``
+    callable to clean up after sessions that are dropped.
+
+    With a backend attached, changes are recorded in memory and written behind
+    in batches every ``flush_interval`` seconds, so callers never wait on I/O.
+    Stored sessions are only read back the first time their user is seen.
+
+    A secondary index of ``(channel_id, user_id)`` routes lets the message
+    listener reject traffic from channels without a session in one set test.
+    """
+
+    def __init__(self, idle_ttl=DEFAULT_IDLE_TTL, max_sessions=DEFAULT_MAX_SESSIONS):
+        self.idle_ttl = idle_ttl
+        self.max_sessions = max_sessions
+        self.on_session_expired = None
+        # user_id -> session, kept in least-recently-used order
+        self.active_sessions = OrderedDict()
+        # user_id -> (last_active, ttl)
+        self._activity = {}
+        # (deadline, user_id); entries are re-checked against _activity when popped
+        self._deadlines = []
+        self._sweeper = None
+        self._wakeup = None
+
+        self.backend = None
+        self._encode = None
+        self._decode = None
+        self._flusher = None
+        self._flush_interval = DEFAULT_FLUSH_INTERVAL
+        # Write-behind journal: users whose session changed or ended since the last flush
+        self._dirty = set()
+        self._deleted = set()
+        # user_id -> channel_id for stored sessions not loaded into memory yet
+        self._persisted = {}
+
+        # (channel_id, user_id) for every live or stored session
+        self.routes = set()
+        # channel_id -> number of sessions in that channel
+        self.active_channels = {}
+
+    async def attach_backend(self, backend, encode, decode, flush_interval=DEFAULT_FLUSH_INTERVAL):
+        """Persist sessions to ``backend`` and start the write-behind flusher
+
+        Only the keys of stored sessions are read here; the sessions
+        themselves are rehydrated on demand by :meth:`load_session`.
+        """
+        self.backend = backend
+        self._encode = encode
+        self._decode = decode
+        self._flush_interval = flush_interval
+        for user_id, channel_id in await backend.keys(self.idle_ttl):
+            if user_id not in self.active_sessions:
+                self._persisted[user_id] = channel_id
+                self._index(channel_id, user_id)
+        self._flusher = asyncio.get_running_loop().create_task(self._flush_loop())
+
+    async def close(self):
+        """Stop background tasks and flush any pending writes"""
+        self.stop()
+        if self._flusher:
+            self._flusher.cancel()
+            self._flusher = None
+        if self.backend:
+            await self.flush()
+            await self.backend.close()
+            self.backend = None
+
+    def start(self):
+        """Start the sweeper task; must be called from a running event loop"""
+        if self._sweeper and not self._sweeper.done():
+            return
+        self._wakeup = asyncio.Event()
+        self._sweeper = asyncio.get_running_loop().create_task(self._sweep_loop())
+
+    def stop(self):
+        """Cancel the sweeper task"""
+        if self._sweeper:
+            self._sweeper.cancel()
+            self._sweeper = None
+
+    def start_session(self, user_id, data, ttl=None):
+        self._forget(user_id)
+        self._mark_dirty(user_id)
+        self._track(user_id, data, ttl)
+
+    def _track(self, user_id, data, ttl=None):
+        ttl = ttl or self.idle_ttl
         self.active_sessions[user_id] = data
-    
+        self._index(data.channel_id, user_id)
+        self.active_sessions.move_to_end(user_id)
+
+        now = time.monotonic()
+        self._activity[user_id] = (now, ttl)
+        heapq.heappush(self._deadlines, (now + ttl, user_id))
+        if self._wakeup and self._deadlines[0] == (now + ttl, user_id):
+            # New earliest deadline; let the sweeper shorten its sleep
+            self._wakeup.set()
+
+        while len(self.active_sessions) > self.max_sessions:
+            oldest = next(iter(self.active_sessions))
+            self._expire(oldest, "evicted")
+
     def get_session(self, user_id):
-        return self.active_sessions.get(user_id)
-    
-    def update_session(self, user_id, key, value):
-        if user_id in self.active_sessions:
-            self.active_sessions[user_id][key] = value
-    
+        session = self.active_sessions.get(user_id)
+        if session is not None:
+            self._touch(user_id)
+        return session
+
+    async def load_session(self, user_id):
+        """Return the session for ``user_id``, rehydrating it from the backend if needed"""
+        session = self.get_session(user_id)
+        if session is not None or user_id not in self._persisted:
+            return session
+
+        channel_id = self._persisted.pop(user_id)
+        try:
+            doc = await self.backend.load(user_id)
+            failed = False
+        except Exception:
+            logger.exception("Failed to load stored flight session for %s", user_id)
+            doc, failed = None, True
+
+        # Another coroutine may have started a fresh session while we waited
+        active = self.active_sessions.get(user_id)
+        if active is None or active.channel_id != channel_id:
+            self._unindex(channel_id, user_id)
+        if active is not None:
+            return self.get_session(user_id)
+
+        session = self._decode(doc) if doc else None
+        if session is None:
+            if not failed:
+                # Stored session can no longer be resumed
+                self._mark_deleted(user_id)
+            return None
+
+        self._track(user_id, session)
+        return session
+
+    def has_route(self, channel_id, user_id):
+        """Whether ``user_id`` has a session in ``channel_id``, in memory or waiting to be rehydrated"""
+        return (channel_id, user_id) in self.routes
+
+    def update_session(self, user_id, **changes):
+        session = self.active_sessions.get(user_id)
+        if session is None:
+            return
+        for key, value in changes.items():
+            setattr(session, key, value)
+        self._touch(user_id)
+        self._mark_dirty(user_id)
+
     def end_session(self, user_id):
-        if user_id in self.active_sessions:
-            del self.active_sessions[user_id]
+        if self._forget(user_id):
+            self._mark_deleted(user_id)
+
+    def _forget(self, user_id):
+        """Drop ``user_id`` from memory and the indexes; returns whether anything was held"""
+        channel_id = self._persisted.pop(user_id, None)
+        if channel_id is not None:
+            self._unindex(channel_id, user_id)
+
+        session = self.active_sessions.pop(user_id, None)
+        if session is None:
+            return channel_id is not None
+        del self._activity[user_id]
+        self._unindex(session.channel_id, user_id)
+        return True
+
+    def _index(self, channel_id, user_id):
+        route = (channel_id, user_id)
+        if route not in self.routes:
+            self.routes.add(route)
+            self.active_channels[channel_id] = self.active_channels.get(channel_id, 0) + 1
+
+    def _unindex(self, channel_id, user_id):
+        route = (channel_id, user_id)
+        if route in self.routes:
+            self.routes.remove(route)
+            remaining = self.active_channels[channel_id] - 1
+            if remaining:
+                self.active_channels[channel_id] = remaining
+            else:
+                del self.active_channels[channel_id]
+
+    def _mark_dirty(self, user_id):
+        if self.backend:
+            self._deleted.discard(user_id)
+            self._dirty.add(user_id)
+
+    def _mark_deleted(self, user_id):
+        if self.backend:
+            self._dirty.discard(user_id)
+            self._deleted.add(user_id)
+
+    def _touch(self, user_id):
+        # The heap entry is left alone; the sweeper reschedules it when popped
+        _, ttl = self._activity[user_id]
+        self._activity[user_id] = (time.monotonic(), ttl)
+        self.active_sessions.move_to_end(user_id)
+
+    def _expire(self, user_id, reason):
+        session = self.active_sessions.get(user_id)
+        if session is None:
+            return
+        self._forget(user_id)
+        self._mark_deleted(user_id)
+
+        logger.debug("Flight session for %s %s", user_id, reason)
+        if self.on_session_expired:
+            try:
+                asyncio.get_running_loop().create_task(
+                    self.on_session_expired(user_id, session, reason)
+                )
+            except RuntimeError:
+                # No running loop (e.g. eviction during shutdown); nothing to tidy
+                pass
+
+    def sweep(self, now=None):
+        """Expire every session whose idle deadline has passed"""
+        now = time.monotonic() if now is None else now
+        deadlines = self._deadlines
+
+        while deadlines and deadlines[0][0] <= now:
+            _, user_id = heapq.heappop(deadlines)
+            activity = self._activity.get(user_id)
+            if activity is None:
+                # Session already ended
+                continue
+
+            last_active, ttl = activity
+            if last_active + ttl <= now:
+                self._expire(user_id, "expired")
+            else:
+                heapq.heappush(deadlines, (last_active + ttl, user_id))
+
+        # Drop stale entries for ended sessions so the heap tracks live sessions
+        if len(deadlines) > 2 * len(self._activity) + 64:
+            self._deadlines = [
+                (self._activity[uid][0] + self._activity[uid][1], uid)
+                for uid in self._activity
+            ]
+            heapq.heapify(self._deadlines)
+
+    async def _sweep_loop(self):
+        while True:
+            self.sweep()
+
+            delay = SWEEP_INTERVAL
+            if self._deadlines:
+                delay = min(delay, max(self._deadlines[0][0] - time.monotonic(), 0))
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def flush(self):
+        """Write every pending change to the backend in one batch"""
+        if not self.backend or not (self._dirty or self._deleted):
+            return
+
+        dirty, self._dirty = self._dirty, set()
+        deleted, self._deleted = self._deleted, set()
+        upserts = {
+            user_id: self._encode(self.active_sessions[user_id])
+            for user_id in dirty
+            if user_id in self.active_sessions
+        }
+
+        try:
+            await self.backend.write(upserts, deleted)
+        except Exception:
+            logger.exception("Failed to flush %d flight sessions", len(upserts) + len(deleted))
+            # Requeue anything that was not superseded while the write was in flight
+            self._dirty |= dirty - self._deleted
+            self._deleted |= deleted - self._dirty
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self._flush_interval)
+            await self.flush()
@@ -0,0 +1,80 @@
+import asyncio
+import logging
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# Pending inputs a single user may have queued before we push back
+DEFAULT_MAX_PENDING = 3
+
+
+class UserInputQueue:
+    """Ordered, bounded per-user input queues drained by one worker per user
+
+    Each item carries a coalescing key (the planning stage it was sent in). A
+    newer item replaces a still-pending one with the same key, so a burst of
+    corrections only processes the latest. Workers exit as soon as their
+    queue is drained, so idle users never hold a live task.
+    """
+
+    def __init__(self, process, max_pending=DEFAULT_MAX_PENDING):
+        self._process = process
+        self.max_pending = max_pending
+        # user_id -> deque of (key, item)
+        self._pending = {}
+        # user_id -> worker task
+        self._workers = {}
+        self.stats = {"queued": 0, "coalesced": 0, "rejected": 0, "processed": 0}
+
+    @property
+    def depth(self):
+        return sum(len(queue) for queue in self._pending.values())
+
+    @property
+    def workers(self):
+        return len(self._workers)
+
+    def put(self, user_id, key, item):
+        """Queue ``item`` for ``user_id``; returns False if the user's queue is full"""
+        queue = self._pending.get(user_id)
+        if queue is None:
+            queue = self._pending[user_id] = deque()
+
+        for index, (pending_key, _) in enumerate(queue):
+            if pending_key == key:
+                del queue[index]
+                self.stats["coalesced"] += 1
+                break
+        else:
+            if len(queue) >= self.max_pending:
+                self.stats["rejected"] += 1
+                return False
+
+        queue.append((key, item))
+        self.stats["queued"] += 1
+
+        if user_id not in self._workers:
+            self._workers[user_id] = asyncio.get_running_loop().create_task(self._work(user_id))
+        return True
+
+    async def _work(self, user_id):
+        queue = self._pending[user_id]
+        try:
+            while queue:
+                _, item = queue.popleft()
+                try:
+                    await self._process(item)
+                except Exception:
+                    logger.exception("Failed to process flight planner input for %s", user_id)
+                self.stats["processed"] += 1
+        finally:
+            # Drained (or cancelled): reap the worker and its queue
+            self._workers.pop(user_id, None)
+            self._pending.pop(user_id, None)
+
+    def close(self):
+        """Cancel every worker and drop pending input"""
+        for task in list(self._workers.values()):
+            task.cancel()
+        self._workers.clear()
+        self._pending.clear()
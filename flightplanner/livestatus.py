@@ -0,0 +1,166 @@
+import asyncio
+import logging
+import time
+
+import discord
+
+from embedlimits import message_batches
+from templates import DEFAULT_STATUS, render
+
+logger = logging.getLogger(__name__)
+
+# Seconds between passes over every live flight
+DEFAULT_INTERVAL = 15
+# Milestone -> status shown once it is reached, and its default minutes before departure
+MILESTONE_STATUSES = {"checkin_closed": "Check-in Closed", "boarding": "Boarding"}
+DEFAULT_STATUS_MINUTES = {"checkin_closed": 45, "boarding": 30}
+FINAL_STATUS = "Departed"
+
+
+def status_phases(milestones):
+    """``(minutes before departure, status)`` pairs, nearest departure first
+
+    Uses the configured milestone offsets so the status line changes when
+    the matching notice is posted.
+    """
+    minutes = {**DEFAULT_STATUS_MINUTES, **milestones}
+    phases = [(minutes[name], status) for name, status in MILESTONE_STATUSES.items()]
+    return ((0, FINAL_STATUS),) + tuple(sorted(phases))
+
+
+def flight_status(departure, now, phases):
+    """Status of a flight departing at unix time ``departure``, as of ``now``"""
+    for minutes, status in phases:
+        if now >= departure - minutes * 60:
+            return status
+    return DEFAULT_STATUS
+
+
+class LiveFlight:
+    __slots__ = ("message", "airline", "values", "scheduled", "departure", "status", "payload", "pending")
+
+    def __init__(self, message, airline, values):
+        self.message = message
+        self.airline = airline
+        self.values = values
+        # As posted; identifies the departure even after it is delayed
+        self.scheduled = self.departure = values["departure_timestamp"]
+        self.status = values["status"]
+        # Embed dicts last queued for this message; None until the first edit
+        self.payload = None
+        self.pending = None
+
+
+class LiveStatusBoard:
+    """Keeps the Status line of posted flight plans current by editing them in place
+
+    One ticker task walks every live flight each ``interval`` seconds. The
+    departure countdown is a Discord relative timestamp that clients keep
+    up to date themselves, so a message only needs editing when its phase
+    changes (check-in closed, boarding, departed): a handful of edits per
+    flight instead of a new message per event.
+
+    Edits go through the outbound scheduler at status priority. A newer
+    edit replaces one for the same message that is still queued, and an
+    edit whose rendered embeds match the last one queued is skipped.
+    Flights leave the board once they show as departed, or when their
+    message is deleted.
+    """
+
+    def __init__(self, scheduler, phases, interval=DEFAULT_INTERVAL):
+        self.scheduler = scheduler
+        self.phases = phases
+        self.interval = interval
+        # message_id -> LiveFlight
+        self.flights = {}
+        self._ticker = None
+        self.stats = {"edits": 0, "coalesced": 0, "unchanged": 0, "failed": 0}
+
+    def __len__(self):
+        return len(self.flights)
+
+    def start(self):
+        """Start the ticker; must be called from a running event loop"""
+        if self._ticker and not self._ticker.done():
+            return
+        self._ticker = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self._ticker:
+            self._ticker.cancel()
+            self._ticker = None
+
+    def track(self, message, airline, values):
+        """Follow a posted flight plan; ``values`` are the ones it was rendered from"""
+        self.flights[message.id] = LiveFlight(message, airline, values)
+
+    def departures(self, guild_id, flight_number):
+        """Scheduled departure times of a flight's live plans, earliest first"""
+        return sorted({flight.scheduled for _, flight in self._flights(guild_id, flight_number)})
+
+    def delay(self, guild_id, flight_number, departure, minutes):
+        """Move one departure (by scheduled time) by ``minutes`` and re-render its plans now
+
+        Returns how many posted plans moved.
+        """
+        moved = 0
+        for message_id, flight in self._flights(guild_id, flight_number):
+            if flight.scheduled != departure:
+                continue
+            flight.departure += minutes * 60
+            flight.values = {**flight.values, "departure_timestamp": flight.departure}
+            self._update(message_id, flight, flight_status(flight.departure, time.time(), self.phases))
+            moved += 1
+        return moved
+
+    def _flights(self, guild_id, flight_number):
+        for message_id, flight in list(self.flights.items()):
+            guild = getattr(flight.message, "guild", None)
+            if flight.values["flight_number"] == flight_number and (guild.id if guild else None) == guild_id:
+                yield message_id, flight
+
+    def tick(self, now=None):
+        """Queue an edit for every flight whose status has changed"""
+        now = time.time() if now is None else now
+        for message_id, flight in list(self.flights.items()):
+            status = flight_status(flight.departure, now, self.phases)
+            if status != flight.status:
+                self._update(message_id, flight, status)
+            if status == FINAL_STATUS:
+                # Its last edit is already queued
+                del self.flights[message_id]
+
+    def _update(self, message_id, flight, status):
+        flight.status = status
+        embeds = message_batches(render("flight_plan", flight.airline, {**flight.values, "status": status}))[0]
+        payload = [embed.to_dict() for embed in embeds]
+        if payload == flight.payload:
+            self.stats["unchanged"] += 1
+            return
+
+        if flight.pending is not None and not flight.pending.done():
+            # Still waiting in the queue; send only the newest state
+            flight.pending.cancel()
+            self.stats["coalesced"] += 1
+        flight.payload = payload
+        flight.pending = self.scheduler.submit_edit(flight.message, embeds=embeds)
+        flight.pending.add_done_callback(lambda future: self._edited(message_id, future))
+
+    def _edited(self, message_id, future):
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is None:
+            self.stats["edits"] += 1
+            return
+        self.stats["failed"] += 1
+        if isinstance(error, discord.NotFound):
+            # Message deleted; nothing left to update
+            self.flights.pop(message_id, None)
+        else:
+            logger.warning("Could not update flight plan message %s: %s", message_id, error)
+
+    async def _run(self):
+        while True:
+            self.tick()
+            await asyncio.sleep(self.interval)
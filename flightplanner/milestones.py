@@ -0,0 +1,281 @@
+import asyncio
+import heapq
+import logging
+import time
+
+from templates import LAYOUTS
+
+logger = logging.getLogger(__name__)
+
+# Milestone -> minutes before departure it is posted. Each needs a layout
+# of the same name in templates.LAYOUTS.
+DEFAULT_MILESTONES = {"checkin_closed": 45}
+# How often changed jobs are written behind to the persistent backend
+DEFAULT_FLUSH_INTERVAL = 5
+# Upper bound on how long the sleeper waits between checks of the heap
+MAX_SLEEP = 3600
+
+
+def parse_milestones(value, default):
+    """``{"checkin_closed": 45, ...}`` from a setting like ``"checkin_closed:45, boarding:30"``"""
+    if not value:
+        return dict(default)
+    milestones = {}
+    for part in str(value).split(","):
+        name, _, minutes = part.partition(":")
+        name = name.strip().lower()
+        if name not in LAYOUTS:
+            logger.warning("Ignoring unknown flight milestone %r", name)
+            continue
+        milestones[name] = int(minutes) if minutes.strip() else default.get(name, 0)
+    return milestones
+
+
+def flight_key(guild_id, flight_number, departure):
+    """Identifies one departure of a flight; ``departure`` is its originally scheduled unix time"""
+    return f"{guild_id}:{flight_number}:{departure}"
+
+
+def scheduled_departure(job):
+    """The departure time a job was first scheduled for, before any delay"""
+    # Jobs stored before departures were told apart only have the current time
+    return job.get("scheduled", job["departure"])
+
+
+class MilestoneScheduler:
+    """Posts flight milestones such as check-in closed a set time before departure
+
+    Jobs are kept in a dict by ``guild:flight:departure:milestone`` and a
+    heap of ``(due, job_id)``. One sleeper task waits for the earliest due
+    time, so thousands of scheduled flights cost no timers. ``departure``
+    is the originally scheduled time, so a daily flight number keeps one
+    set of jobs per day and a delay doesn't change which departure they
+    belong to. Scheduling a departure again replaces its jobs; cancelling
+    drops them. Heap entries that no longer match their job are skipped
+    when popped.
+
+    With a backend attached, changes are written behind in batches, as
+    sessions are. Jobs that fell due while the bot was down are posted as
+    soon as they are loaded, unless the flight has already departed.
+    ``on_due(job)`` is an async callable that does the posting.
+    """
+
+    def __init__(self, on_due, milestones=None):
+        self.on_due = on_due
+        self.milestones = dict(DEFAULT_MILESTONES if milestones is None else milestones)
+        # job_id -> job dict; the source of truth the heap is checked against
+        self.jobs = {}
+        # (due, job_id)
+        self._heap = []
+        self._sleeper = None
+        self._wakeup = None
+        self._posting = set()
+
+        self.backend = None
+        self._flusher = None
+        self._flush_interval = DEFAULT_FLUSH_INTERVAL
+        self._dirty = set()
+        self._deleted = set()
+        self.stats = {"scheduled": 0, "posted": 0, "caught_up": 0, "missed": 0, "failed": 0}
+
+    def __len__(self):
+        return len(self.jobs)
+
+    def start(self):
+        """Start the sleeper task; must be called from a running event loop"""
+        if self._sleeper and not self._sleeper.done():
+            return
+        self._wakeup = asyncio.Event()
+        self._sleeper = asyncio.get_running_loop().create_task(self._run())
+
+    async def attach_backend(self, backend, flush_interval=DEFAULT_FLUSH_INTERVAL):
+        """Load stored jobs from ``backend`` and persist changes to it from now on"""
+        self.backend = backend
+        self._flush_interval = flush_interval
+        now = time.time()
+        for job in await backend.load_all():
+            if job["id"] in self.jobs:
+                continue
+            if job["due"] <= now:
+                self.stats["caught_up"] += 1
+            self._push(job)
+        self._flusher = asyncio.get_running_loop().create_task(self._flush_loop())
+
+    async def close(self):
+        """Stop the sleeper and flush any pending writes"""
+        for task in (self._sleeper, self._flusher):
+            if task:
+                task.cancel()
+        self._sleeper = self._flusher = None
+        if self.backend:
+            await self.flush()
+            await self.backend.close()
+            self.backend = None
+
+    def schedule_flight(self, guild_id, airline, flight_number, departure):
+        """(Re)schedule every milestone for a flight departing at unix time ``departure``
+
+        Replaces the jobs of that departure only; other departures of the
+        same flight number are left alone. Milestones already in the past
+        are not scheduled. Returns how many were.
+        """
+        flight = flight_key(guild_id, flight_number, departure)
+        self.cancel(guild_id, flight_number, departure)
+        now = time.time()
+        scheduled = 0
+        for milestone, minutes in self.milestones.items():
+            due = departure - minutes * 60
+            if due <= now:
+                continue
+            self._put({
+                "id": f"{flight}:{milestone}",
+                "flight": flight,
+                "milestone": milestone,
+                "due": due,
+                "departure": departure,
+                "scheduled": departure,
+                "guild_id": guild_id,
+                "airline": airline,
+                "flight_number": flight_number,
+            })
+            scheduled += 1
+        self.stats["scheduled"] += scheduled
+        return scheduled
+
+    def departures(self, guild_id, flight_number):
+        """Scheduled departure times of a flight that still have pending milestones, earliest first"""
+        return sorted({scheduled_departure(job) for job in self._flight_jobs(guild_id, flight_number)})
+
+    def cancel(self, guild_id, flight_number, departure, milestone=None):
+        """Drop one departure's pending milestones (or just ``milestone``); returns how many"""
+        cancelled = 0
+        for job in self._flight_jobs(guild_id, flight_number, departure):
+            if milestone is None or job["milestone"] == milestone:
+                del self.jobs[job["id"]]
+                self._mark_deleted(job["id"])
+                cancelled += 1
+        return cancelled
+
+    def delay(self, guild_id, flight_number, departure, minutes):
+        """Move one departure and its pending milestones by ``minutes``; returns how many moved"""
+        jobs = self._flight_jobs(guild_id, flight_number, departure)
+        for job in jobs:
+            self._put({**job, "due": job["due"] + minutes * 60, "departure": job["departure"] + minutes * 60})
+        return len(jobs)
+
+    def _flight_jobs(self, guild_id, flight_number, departure=None):
+        """Pending jobs of one departure of a flight by scheduled time, or of every departure"""
+        if departure is None:
+            return [
+                job for job in self.jobs.values()
+                if job["flight_number"] == flight_number and job["guild_id"] == guild_id
+            ]
+        flight = flight_key(guild_id, flight_number, departure)
+        # Ids from before the departure was part of the key
+        legacy = f"{guild_id}:{flight_number}"
+        jobs = []
+        # Every known layout, so jobs survive the milestone setting changing
+        for name in LAYOUTS:
+            job = self.jobs.get(f"{flight}:{name}") or self.jobs.get(f"{legacy}:{name}")
+            if job is not None and scheduled_departure(job) == departure:
+                jobs.append(job)
+        return jobs
+
+    def upcoming(self, guild_id, limit):
+        """The next ``limit`` jobs for ``guild_id`` in due order"""
+        return heapq.nsmallest(
+            limit,
+            (job for job in self.jobs.values() if job["guild_id"] == guild_id),
+            key=lambda job: job["due"]
+        )
+
+    def _put(self, job):
+        self._push(job)
+        self._mark_dirty(job["id"])
+
+    def _push(self, job):
+        self.jobs[job["id"]] = job
+        heapq.heappush(self._heap, (job["due"], job["id"]))
+        if self._wakeup and self._heap[0] == (job["due"], job["id"]):
+            # New earliest job; let the sleeper shorten its wait
+            self._wakeup.set()
+
+    def run_due(self, now=None):
+        """Post every job whose time has come"""
+        now = time.time() if now is None else now
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            due, job_id = heapq.heappop(heap)
+            job = self.jobs.get(job_id)
+            if job is None or job["due"] != due:
+                # Cancelled or moved since this entry was pushed
+                continue
+            del self.jobs[job_id]
+            self._mark_deleted(job_id)
+            if job["departure"] <= now:
+                self.stats["missed"] += 1
+                logger.info("Skipping %s for %s: the flight has already departed", job["milestone"], job["flight"])
+                continue
+            task = asyncio.get_running_loop().create_task(self._post(job))
+            self._posting.add(task)
+            task.add_done_callback(self._posting.discard)
+
+        # Drop stale entries for cancelled or moved jobs so the heap tracks live jobs
+        if len(heap) > 2 * len(self.jobs) + 64:
+            self._heap = [(job["due"], job_id) for job_id, job in self.jobs.items()]
+            heapq.heapify(self._heap)
+
+    async def _post(self, job):
+        try:
+            await self.on_due(job)
+        except Exception:
+            self.stats["failed"] += 1
+            logger.exception("Failed to post %s for %s", job["milestone"], job["flight"])
+            return
+        self.stats["posted"] += 1
+
+    async def _run(self):
+        while True:
+            self.run_due()
+
+            delay = MAX_SLEEP
+            if self._heap:
+                delay = min(delay, max(self._heap[0][0] - time.time(), 0))
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def _mark_dirty(self, job_id):
+        if self.backend:
+            self._deleted.discard(job_id)
+            self._dirty.add(job_id)
+
+    def _mark_deleted(self, job_id):
+        if self.backend:
+            self._dirty.discard(job_id)
+            self._deleted.add(job_id)
+
+    async def flush(self):
+        """Write every pending change to the backend in one batch"""
+        if not self.backend or not (self._dirty or self._deleted):
+            return
+
+        dirty, self._dirty = self._dirty, set()
+        deleted, self._deleted = self._deleted, set()
+        upserts = {job_id: self.jobs[job_id] for job_id in dirty if job_id in self.jobs}
+
+        try:
+            await self.backend.write(upserts, deleted)
+        except Exception:
+            logger.exception("Failed to flush %d flight milestones", len(upserts) + len(deleted))
+            # Requeue anything that was not superseded while the write was in flight
+            self._dirty |= dirty - self._deleted
+            self._deleted |= deleted - self._dirty
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self._flush_interval)
+            await self.flush()
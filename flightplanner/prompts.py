@@ -0,0 +1,93 @@
+import discord
+
+from timezones import DEFAULT_TIMEZONE, local_now
+
+
+# Emoji and colour for each airline on the first prompt of a session
+AIRLINE_BADGES = {
+    "Qantas": ("🦘", discord.Color.red()),
+    "Jetstar": ("⭐", discord.Color.green()),
+}
+
+
+def departure_airport_prompt(session):
+    emoji, color = AIRLINE_BADGES.get(session.airline, ("✈️", discord.Color.blue()))
+    embed = discord.Embed(
+        title="🛫 Departure Airport",
+        description="Please enter the **3-letter IATA code** of your departure airport.\n\nExample: `SYD` for Sydney, `MEL` for Melbourne",
+        color=color
+    )
+    # Recap the choices made in the selection menus
+    embed.add_field(name="Airline", value=f"{emoji} {session.airline}", inline=True)
+    embed.add_field(name="Aircraft", value=f"✈️ {session.aircraft}", inline=True)
+    embed.set_footer(text="Type the 3-letter airport code in chat")
+    return embed
+
+
+def arrival_airport_prompt(session):
+    embed = discord.Embed(
+        title="🛬 Arrival Airport",
+        description="Please enter the **3-letter IATA code** of your arrival airport.\n\nExample: `MEL` for Melbourne, `BNE` for Brisbane",
+        color=discord.Color.blue()
+    )
+    embed.set_footer(text="Type the 3-letter airport code in chat")
+    return embed
+
+
+def departure_time_prompt(session):
+    # Current local time at the departure airport for reference
+    zone_name = session.departure_timezone or DEFAULT_TIMEZONE
+    current_local = local_now(zone_name)
+
+    embed = discord.Embed(
+        title="🕐 Departure Time",
+        description=f"Please enter your departure time in **local time at {session.departure_code}** ({zone_name}, {current_local.tzname()}).\n\n**Current local time:** {current_local.strftime('%H:%M')}",
+        color=discord.Color.blue()
+    )
+    embed.add_field(
+        name="Accepted Formats",
+        value="• `14:30` (24-hour)\n• `2:30 PM` (12-hour)\n• `1430` (no colon)\n• `14:30 25/01/2026` or `tomorrow 2pm` (time and date together)",
+        inline=False
+    )
+    embed.set_footer(text="Type the departure time in chat")
+    return embed
+
+
+def departure_date_prompt(session):
+    # Current local date at the departure airport for reference
+    current_local = local_now(session.departure_timezone or DEFAULT_TIMEZONE)
+
+    embed = discord.Embed(
+        title="📅 Departure Date",
+        description="Please enter your departure date.\n\n**Current date:** " + current_local.strftime("%d/%m/%Y"),
+        color=discord.Color.blue()
+    )
+    embed.add_field(
+        name="Accepted Formats",
+        value="• `25/01/2026` (DD/MM/YYYY)\n• `25-01-2026` (DD-MM-YYYY)\n• `25 Jan 2026`\n• `today` or `tomorrow`",
+        inline=False
+    )
+    embed.set_footer(text="Type the departure date in chat")
+    return embed
+
+
+def flight_number_prompt(session):
+    # Determine airline prefix
+    prefix_hint = ""
+    if session.airline == "Qantas":
+        prefix_hint = "\n\n**Hint:** Qantas flights start with `QF` (e.g., QF94)"
+    elif session.airline == "Jetstar":
+        prefix_hint = "\n\n**Hint:** Jetstar flights start with `JQ` (e.g., JQ30)"
+
+    embed = discord.Embed(
+        title="✈️ Flight Number",
+        description=f"Please enter your flight number.{prefix_hint}",
+        color=discord.Color.blue()
+    )
+    embed.add_field(
+        name="Examples",
+        value="• `QF94`\n• `JQ30`\n• `VA803`",
+        inline=False
+    )
+    embed.set_footer(text="Type the flight number in chat")
+    return embed
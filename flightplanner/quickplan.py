@@ -0,0 +1,81 @@
+import re
+from typing import List, NamedTuple, Optional
+
+from views import FLEETS
+
+# Flight number prefix -> airline
+AIRLINE_PREFIXES = {"QF": "Qantas", "JQ": "Jetstar"}
+
+FLIGHT_NUMBER = re.compile(r"(?P<prefix>[A-Z]{2})(?P<number>\d{1,4}[A-Z]?)")
+USAGE = "plan <flight> <aircraft> <from> <to> <time and date>, e.g. plan QF1 A380 SYD LHR 14:30 25/01/2026"
+
+
+def _squash(text):
+    return re.sub(r"[^a-z0-9]", "", text.lower())
+
+
+def match_aircraft(text, airline):
+    """Resolve shorthand like ``A380`` or ``787-9`` to one of ``airline``'s aircraft"""
+    wanted = _squash(text)
+    if not wanted:
+        return None
+    fleet = FLEETS.get(airline, ())
+    for aircraft in fleet:
+        if _squash(aircraft) == wanted:
+            return aircraft
+    # Shorthand is usually the tail of the full name ("A380", "Q400")
+    matches = [aircraft for aircraft in fleet if _squash(aircraft).endswith(wanted)]
+    if not matches:
+        matches = [aircraft for aircraft in fleet if wanted in _squash(aircraft)]
+    return matches[0] if len(matches) == 1 else None
+
+
+def validate_flight(flight_word, aircraft_word):
+    """Check a flight number and aircraft together
+
+    Returns ``(flight_number, airline, aircraft, errors)``; fields that
+    couldn't be resolved are None and explained in ``errors``.
+    """
+    errors = []
+    flight_number = airline = aircraft = None
+    match = FLIGHT_NUMBER.fullmatch(flight_word.strip().upper())
+    if match is None:
+        errors.append(f"`{flight_word}` isn't a flight number (e.g. QF1, JQ30)")
+    else:
+        flight_number = match.group(0)
+        airline = AIRLINE_PREFIXES.get(match.group("prefix"))
+        if airline is None:
+            errors.append(f"`{flight_number}` isn't a Qantas (QF) or Jetstar (JQ) flight")
+
+    if airline:
+        aircraft = match_aircraft(aircraft_word, airline)
+        if aircraft is None:
+            errors.append(f"`{aircraft_word}` isn't in the {airline} fleet: {', '.join(FLEETS[airline])}")
+    return flight_number, airline, aircraft, errors
+
+
+class QuickPlanArgs(NamedTuple):
+    flight_number: Optional[str]
+    airline: Optional[str]
+    aircraft: Optional[str]
+    departure: str
+    arrival: str
+    # Everything after the airports, for the date/time parser
+    when: str
+    errors: List[str]
+
+
+def parse_plan_args(text):
+    """Split one-shot ``plan`` arguments into fields, collecting every problem at once
+
+    Returns None if there aren't even enough words to try.
+    """
+    words = text.split()
+    if len(words) < 5:
+        return None
+    flight_word, aircraft_word, departure, arrival = words[:4]
+    flight_number, airline, aircraft, errors = validate_flight(flight_word, aircraft_word)
+    return QuickPlanArgs(
+        flight_number, airline, aircraft,
+        departure.upper(), arrival.upper(), " ".join(words[4:]), errors
+    )
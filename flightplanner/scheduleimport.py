@@ -0,0 +1,130 @@
+import codecs
+import csv
+import json
+
+# Rows validated and posted together; airports are resolved once per batch
+BATCH_SIZE = 50
+# Failures listed individually in the summary; the rest are only counted
+MAX_REPORTED_FAILURES = 20
+CHUNK_SIZE = 64 * 1024
+# Larger undecodable runs mean the JSON is broken, not just split across chunks
+MAX_ROW_SIZE = 1024 * 1024
+
+# Accepted column/key names -> field
+COLUMNS = {
+    "flight": "flight_number",
+    "flight_number": "flight_number",
+    "flightnumber": "flight_number",
+    "aircraft": "aircraft",
+    "type": "aircraft",
+    "from": "departure",
+    "departure": "departure",
+    "origin": "departure",
+    "to": "arrival",
+    "arrival": "arrival",
+    "destination": "arrival",
+    "time": "time",
+    "departure_time": "time",
+    "date": "date",
+    "departure_date": "date",
+    "datetime": "when",
+    "departure_datetime": "when",
+}
+REQUIRED = ("flight_number", "aircraft", "departure", "arrival", "when")
+
+
+def normalize_row(raw):
+    """Map a raw CSV/JSON row onto planner fields, or None if it isn't a row at all"""
+    if not isinstance(raw, dict):
+        return None
+    fields = {}
+    for key, value in raw.items():
+        name = COLUMNS.get(str(key).strip().lower().replace(" ", "_"))
+        if name and value is not None:
+            fields[name] = str(value).strip()
+    if not fields.get("when"):
+        fields["when"] = " ".join(fields[name] for name in ("time", "date") if fields.get(name))
+    return fields
+
+
+async def iter_csv_rows(stream):
+    """Yield ``(row_number, dict)`` from a CSV stream, one line at a time
+
+    The first line is the header. Quoted fields may not span lines.
+    """
+    header = None
+    row_number = 0
+    async for line in stream:
+        text = line.decode("utf-8-sig").rstrip("\r\n")
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = values
+            continue
+        row_number += 1
+        yield row_number, dict(zip(header, values))
+
+
+async def iter_json_rows(stream):
+    """Yield ``(row_number, object)`` from a JSON array or JSON Lines stream
+
+    Objects are decoded as soon as they are complete, so the whole document
+    is never held in memory.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    row_number = 0
+    async for chunk in stream.iter_chunked(CHUNK_SIZE):
+        buffer += text_decoder.decode(chunk)
+        position = 0
+        while True:
+            # Skip array brackets, separators and whitespace between objects
+            while position < len(buffer) and buffer[position] in "[],\r\n\t ":
+                position += 1
+            if position == len(buffer):
+                break
+            try:
+                item, position_after = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # Object cut off at the chunk boundary; wait for more
+                if len(buffer) - position > MAX_ROW_SIZE:
+                    raise ValueError(f"Invalid JSON after row {row_number}")
+                break
+            row_number += 1
+            yield row_number, item
+            position = position_after
+        buffer = buffer[position:]
+
+    buffer += text_decoder.decode(b"", final=True)
+    if buffer.strip(" \r\n\t],"):
+        raise ValueError(f"Invalid JSON after row {row_number}")
+
+
+def iter_schedule_rows(stream, filename):
+    if filename.lower().endswith((".json", ".jsonl", ".ndjson")):
+        return iter_json_rows(stream)
+    return iter_csv_rows(stream)
+
+
+class ImportReport:
+    """Running totals for a bulk import, keeping only the first few failures"""
+
+    def __init__(self):
+        self.rows = 0
+        self.posted = 0
+        self.failed = 0
+        self.failures = []
+
+    def fail(self, row_number, reasons):
+        self.failed += 1
+        if len(self.failures) < MAX_REPORTED_FAILURES:
+            self.failures.append((row_number, reasons))
+
+    def summary(self):
+        lines = [f"**Row {row_number}:** {'; '.join(reasons)}" for row_number, reasons in sorted(self.failures)]
+        hidden = self.failed - len(self.failures)
+        if hidden:
+            lines.append(f"…and {hidden} more")
+        return "\n".join(lines)
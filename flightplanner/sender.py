@@ -0,0 +1,247 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import time
+from collections import deque
+
+import aiohttp
+import discord
+
+logger = logging.getLogger(__name__)
+
+# Lower goes first
+PRIORITY_CHECKIN = 0
+PRIORITY_PLAN = 1
+PRIORITY_STATUS = 2
+PRIORITY_BULK = 3
+
+# Discord allows about 5 messages per 5 seconds in a channel and 50
+# requests per second per bot overall
+CHANNEL_RATE = 5
+CHANNEL_PER = 5.0
+GLOBAL_RATE = 50
+GLOBAL_PER = 1.0
+DEFAULT_WORKERS = 4
+MAX_RETRIES = 3
+BACKOFF_BASE = 1.0
+# Number of recent queue waits kept for percentile reporting
+WAIT_WINDOW = 256
+
+
+class TokenBucket:
+    """Allows ``rate`` acquisitions per ``per`` seconds, smoothing bursts"""
+
+    def __init__(self, rate, per):
+        self.rate = rate
+        self.per = per
+        self._tokens = float(rate)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate / self.per)
+        self._updated = now
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) * self.per / self.rate)
+
+    def try_acquire(self):
+        """Take a token if one is free; returns 0, or the seconds until one will be"""
+        self._refill()
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0
+        return (1 - self._tokens) * self.per / self.rate
+
+    def pause(self, seconds):
+        """Empty the bucket for ``seconds``, e.g. after a 429"""
+        self._tokens = -seconds * self.rate / self.per
+        self._updated = time.monotonic()
+
+
+class OutboundScheduler:
+    """Central priority queue for the planner's outgoing messages
+
+    Every post or edit spends a token from its channel's bucket and the
+    global bucket, so bursts are paced here instead of inside discord.py
+    where nobody can see them. Lower priorities go first (check-in closed
+    before routine plans before status edits before bulk imports);
+    requests to one channel keep their order. Workers only take requests
+    whose channel has a token free: the rest are parked per channel until
+    its bucket refills, so a backlog for one busy channel never holds a
+    worker while urgent posts to other channels wait. 429s pause the
+    bucket for ``retry_after`` and network or 5xx failures retry with
+    jittered exponential backoff, parked the same way.
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS):
+        self.worker_count = workers
+        self._queue = []
+        self._sequence = itertools.count()
+        self._ready = asyncio.Event()
+        self._workers = []
+        self._channels = {}
+        # Bucket id -> requests waiting for it to refill, in queue order
+        self._parked = {}
+        # Bucket id -> when its parked requests go back on the queue
+        self._held = {}
+        self._timers = []
+        self._global = TokenBucket(GLOBAL_RATE, GLOBAL_PER)
+        self.waits = deque(maxlen=WAIT_WINDOW)
+        self.stats = {"sent": 0, "retries": 0, "failed": 0, "max_depth": 0}
+
+    def __len__(self):
+        return len(self._queue) + sum(len(parked) for parked in self._parked.values())
+
+    def start(self):
+        if self._workers:
+            return
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.worker_count)]
+
+    async def close(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        pending = self._queue + [item for parked in self._parked.values() for item in parked]
+        self._queue, self._parked, self._held, self._timers = [], {}, {}, []
+        for *_, future, _ in pending:
+            if not future.done():
+                future.cancel()
+
+    def submit(self, channel, priority=PRIORITY_PLAN, **kwargs):
+        """Queue ``channel.send(**kwargs)``; returns a future for the sent message"""
+        return self._enqueue(channel.id, channel.send, kwargs, priority)
+
+    def submit_edit(self, message, priority=PRIORITY_STATUS, **kwargs):
+        """Queue ``message.edit(**kwargs)``; cancel the returned future to drop it unsent"""
+        # Edits have their own bucket so they never spend a channel's post budget
+        return self._enqueue(("edit", message.channel.id), message.edit, kwargs, priority)
+
+    def _enqueue(self, bucket_id, call, kwargs, priority):
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._sequence), time.monotonic(), bucket_id, call, kwargs, future, 0))
+        self.stats["max_depth"] = max(self.stats["max_depth"], len(self))
+        self._ready.set()
+        if not self._workers:
+            self.start()
+        return future
+
+    async def send(self, channel, priority=PRIORITY_PLAN, **kwargs):
+        """Queue a message and wait until it has been sent"""
+        return await self.submit(channel, priority, **kwargs)
+
+    def _bucket(self, bucket_id):
+        bucket = self._channels.get(bucket_id)
+        if bucket is None:
+            bucket = self._channels[bucket_id] = TokenBucket(CHANNEL_RATE, CHANNEL_PER)
+        return bucket
+
+    def _park(self, item, ready_at):
+        """Hold ``item`` off the queue until its bucket may send again at ``ready_at``"""
+        bucket_id = item[3]
+        self._parked.setdefault(bucket_id, []).append(item)
+        if ready_at > self._held.get(bucket_id, 0):
+            self._held[bucket_id] = ready_at
+            heapq.heappush(self._timers, (ready_at, next(self._sequence), bucket_id))
+            # Idle workers recompute how long to sleep
+            self._ready.set()
+
+    def _release_due(self):
+        now = time.monotonic()
+        while self._timers and self._timers[0][0] <= now:
+            ready_at, _, bucket_id = heapq.heappop(self._timers)
+            # A later hold on the same bucket supersedes this timer
+            if self._held.get(bucket_id) == ready_at:
+                del self._held[bucket_id]
+                for item in self._parked.pop(bucket_id):
+                    heapq.heappush(self._queue, item)
+
+    async def _next(self):
+        """The most urgent queued request whose bucket has a token, which it takes"""
+        while True:
+            self._release_due()
+            while self._queue:
+                item = heapq.heappop(self._queue)
+                bucket_id, future = item[3], item[6]
+                if future.done():
+                    # Cancelled or superseded while queued
+                    continue
+                if bucket_id in self._held:
+                    # Stay behind the requests already waiting on this channel
+                    self._park(item, self._held[bucket_id])
+                    continue
+                wait = self._bucket(bucket_id).try_acquire()
+                if wait:
+                    self._park(item, time.monotonic() + wait)
+                    continue
+                return item
+            self._ready.clear()
+            timeout = max(self._timers[0][0] - time.monotonic(), 0) if self._timers else None
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _work(self):
+        while True:
+            item = await self._next()
+            priority, sequence, queued_at, bucket_id, call, kwargs, future, attempt = item
+            try:
+                await self._global.acquire()
+                message = await call(**kwargs)
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                delay = self._retry_delay(bucket_id, e, attempt)
+                if delay is not None:
+                    self.stats["retries"] += 1
+                    logger.warning("Retrying request to %s (attempt %d)", bucket_id, attempt + 2)
+                    # Keeps its place ahead of later requests to the same channel
+                    self._park(item[:-1] + (attempt + 1,), time.monotonic() + delay)
+                    continue
+                self.stats["failed"] += 1
+                if not future.done():
+                    future.set_exception(e)
+                continue
+            self.waits.append(time.monotonic() - queued_at)
+            self.stats["sent"] += 1
+            if not future.done():
+                future.set_result(message)
+
+    def _retry_delay(self, bucket_id, error, attempt):
+        """Seconds to hold a failed request before retrying it, or None to give up"""
+        if attempt == MAX_RETRIES:
+            return None
+        if isinstance(error, discord.HTTPException):
+            if error.status == 429:
+                retry_after = getattr(error, "retry_after", None) or CHANNEL_PER
+                self._bucket(bucket_id).pause(retry_after)
+                return retry_after
+            if error.status >= 500:
+                return self._backoff(attempt)
+            return None
+        if isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError, OSError)):
+            return self._backoff(attempt)
+        return None
+
+    @staticmethod
+    def _backoff(attempt):
+        return BACKOFF_BASE * 2 ** attempt * random.uniform(0.5, 1.5)
+
+    def wait_percentile(self, fraction):
+        """Queue wait in seconds at ``fraction`` (0-1) over recent sends, or None"""
+        if not self.waits:
+            return None
+        ordered = sorted(self.waits)
+        return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
@@ -0,0 +1,90 @@
+from dataclasses import asdict, dataclass, fields
+from enum import IntEnum
+from typing import Optional
+
+
+class Stage(IntEnum):
+    """Which input the planner is waiting for"""
+    DEPARTURE_IATA = 1
+    ARRIVAL_IATA = 2
+    DEPARTURE_TIME = 3
+    DEPARTURE_DATE = 4
+    FLIGHT_NUMBER = 5
+    # Plan complete, waiting on the send/cancel buttons
+    REVIEW = 6
+
+
+@dataclass(slots=True)
+class FlightSession:
+    """A flight plan in progress
+
+    Only IDs and primitives are stored so sessions stay small and can be
+    serialised as-is; Discord objects are resolved from the bot cache when
+    they are needed. Being slotted, assigning a misspelled field raises
+    ``AttributeError`` instead of silently adding a new key.
+    """
+    user_id: int
+    channel_id: int
+    airline: str
+    aircraft: str
+    guild_id: Optional[int] = None
+    stage: Stage = Stage.DEPARTURE_IATA
+    prompt_message_id: Optional[int] = None
+    departure_code: Optional[str] = None
+    departure_name: Optional[str] = None
+    # IANA zone of the departure airport; local times are read in it
+    departure_timezone: Optional[str] = None
+    arrival_code: Optional[str] = None
+    arrival_name: Optional[str] = None
+    arrival_timezone: Optional[str] = None
+    # Minutes after local midnight
+    departure_time: Optional[int] = None
+    departure_timestamp: Optional[int] = None
+    # Proleptic Gregorian ordinal, as returned by date.toordinal()
+    departure_date: Optional[int] = None
+    combined_timestamp: Optional[int] = None
+    # Great-circle km and estimated gate-to-gate minutes, when both airports are catalogued
+    route_distance: Optional[int] = None
+    block_minutes: Optional[int] = None
+    flight_number: Optional[str] = None
+
+    def author(self, bot):
+        """Resolve the planning user as a Member where possible, else a User"""
+        guild = bot.get_guild(self.guild_id) if self.guild_id else None
+        member = guild.get_member(self.user_id) if guild else None
+        return member or bot.get_user(self.user_id)
+
+    def channel(self, bot):
+        return bot.get_channel(self.channel_id)
+
+    def prompt_message(self, bot):
+        """The bot's latest prompt in this session as a PartialMessage, if known"""
+        channel = self.channel(bot)
+        if channel is None or self.prompt_message_id is None:
+            return None
+        return channel.get_partial_message(self.prompt_message_id)
+
+    @property
+    def arrival_timestamp(self):
+        """Estimated arrival as a Unix timestamp, if departure and block time are known"""
+        if self.combined_timestamp is None or self.block_minutes is None:
+            return None
+        return self.combined_timestamp + self.block_minutes * 60
+
+    def to_dict(self):
+        data = asdict(self)
+        data["stage"] = int(self.stage)
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a session from :meth:`to_dict` output, or None if the shape doesn't match"""
+        known = {field.name for field in fields(cls)}
+        if not known.issuperset(data):
+            return None
+        try:
+            session = cls(**data)
+            session.stage = Stage(session.stage)
+        except (TypeError, ValueError):
+            return None
+        return session
@@ -0,0 +1,20 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def get_setting(bot, key, default=None):
+    """Read an optional plugin setting from the bot config
+
+    Unknown or unset keys fall back to ``default`` so the plugin runs with
+    sensible behaviour on a bot that has never been configured for it.
+    """
+    try:
+        value = bot.config.get(key)
+    except Exception:
+        logger.debug("Flight planner setting %s is not available", key)
+        return default
+
+    if value is None or value == "":
+        return default
+    return value
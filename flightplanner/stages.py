@@ -0,0 +1,103 @@
+from dataclasses import dataclass
+from typing import Callable, Optional, Tuple
+
+from confirmations import StageConfirmationView, FlightNumberConfirmationView
+from prompts import (
+    departure_airport_prompt,
+    arrival_airport_prompt,
+    departure_time_prompt,
+    departure_date_prompt,
+    flight_number_prompt
+)
+from session import Stage
+
+
+@dataclass(frozen=True)
+class StageSpec:
+    """How one planning stage is prompted, parsed, confirmed and left"""
+    stage: Stage
+    # Name of the FlightPlannerCog coroutine that parses chat input for this stage
+    parser: Optional[str]
+    prompt: Optional[Callable]
+    view: Optional[type] = StageConfirmationView
+    next: Optional[Stage] = None
+    # Session fields this stage fills in; if an earlier stage already
+    # supplied all of them, the stage is skipped
+    provides: Tuple[str, ...] = ()
+
+    def satisfied_by(self, updates):
+        return bool(self.provides) and all(updates.get(name) is not None for name in self.provides)
+
+
+class PlanningStateMachine:
+    """Declarative table of planning stages and their legal transitions
+
+    Adding a stage means adding a :class:`Stage` member, a parser on the cog
+    and one :class:`StageSpec` here.
+    """
+
+    def __init__(self, specs):
+        self.specs = {spec.stage: spec for spec in specs}
+        self.transitions = {spec.stage: spec.next for spec in specs if spec.next is not None}
+
+    def prompt(self, stage, session):
+        return self.specs[stage].prompt(session)
+
+    def confirmation_view(self, stage, author, handler, **updates):
+        """Build the confirmation view for a value parsed at ``stage``"""
+        return self.specs[stage].view(author, handler, self, stage, updates)
+
+    def advance(self, handler, user_id, from_stage, **updates):
+        """Apply ``updates`` and move the session on from ``from_stage``
+
+        Returns the updated session, or None when the session is gone or has
+        already left ``from_stage`` (e.g. a stale confirmation view).
+        """
+        session = handler.get_session(user_id)
+        if session is None or session.stage != from_stage:
+            return None
+
+        next_stage = self.transitions.get(from_stage)
+        while next_stage is not None and self.specs[next_stage].satisfied_by(updates):
+            next_stage = self.transitions.get(next_stage)
+        if next_stage is not None:
+            updates["stage"] = next_stage
+        handler.update_session(user_id, **updates)
+        return session
+
+
+PLANNING = PlanningStateMachine([
+    StageSpec(
+        Stage.DEPARTURE_IATA,
+        parser="handle_departure_iata",
+        prompt=departure_airport_prompt,
+        next=Stage.ARRIVAL_IATA
+    ),
+    StageSpec(
+        Stage.ARRIVAL_IATA,
+        parser="handle_arrival_iata",
+        prompt=arrival_airport_prompt,
+        next=Stage.DEPARTURE_TIME
+    ),
+    StageSpec(
+        Stage.DEPARTURE_TIME,
+        parser="handle_departure_time",
+        prompt=departure_time_prompt,
+        next=Stage.DEPARTURE_DATE
+    ),
+    StageSpec(
+        Stage.DEPARTURE_DATE,
+        parser="handle_departure_date",
+        prompt=departure_date_prompt,
+        next=Stage.FLIGHT_NUMBER,
+        provides=("departure_date", "combined_timestamp")
+    ),
+    StageSpec(
+        Stage.FLIGHT_NUMBER,
+        parser="handle_flight_number",
+        prompt=flight_number_prompt,
+        view=FlightNumberConfirmationView,
+        next=Stage.REVIEW
+    ),
+    StageSpec(Stage.REVIEW, parser=None, prompt=None, view=None),
+])
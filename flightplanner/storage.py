@@ -0,0 +1,177 @@
+import asyncio
+import json
+import sqlite3
+import time
+
+
+class _SQLiteBackend:
+    """One SQLite connection, opened and used only from worker threads
+
+    The connection is made and ``SCHEMA`` applied on first use, inside the
+    same executor path as every query, so the event loop never blocks on
+    disk. Queries are serialised by a lock.
+    """
+
+    # CREATE TABLE statement applied when the connection is opened
+    SCHEMA = None
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = asyncio.Lock()
+        self._conn = None
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute(self.SCHEMA)
+        conn.commit()
+        return conn
+
+    async def _run(self, func, *args):
+        async with self._lock:
+            if self._conn is None:
+                self._conn = await asyncio.to_thread(self._connect)
+            return await asyncio.to_thread(func, *args)
+
+    async def close(self):
+        async with self._lock:
+            if self._conn is not None:
+                conn, self._conn = self._conn, None
+                await asyncio.to_thread(conn.close)
+
+
+class SQLiteSessionBackend(_SQLiteBackend):
+    """Stores flight planning sessions in a local SQLite file
+
+    Meant for testing and single-instance setups.
+    """
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS sessions ("
+        "user_id INTEGER PRIMARY KEY, channel_id INTEGER NOT NULL, "
+        "updated_at REAL NOT NULL, data TEXT NOT NULL)"
+    )
+
+    def _keys(self, max_age):
+        cutoff = time.time() - max_age
+        self._conn.execute("DELETE FROM sessions WHERE updated_at < ?", (cutoff,))
+        self._conn.commit()
+        return self._conn.execute("SELECT user_id, channel_id FROM sessions").fetchall()
+
+    def _load(self, user_id):
+        row = self._conn.execute(
+            "SELECT data FROM sessions WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _write(self, upserts, deletes):
+        now = time.time()
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO sessions (user_id, channel_id, updated_at, data) VALUES (?, ?, ?, ?)",
+            [(user_id, doc["channel_id"], now, json.dumps(doc)) for user_id, doc in upserts.items()]
+        )
+        self._conn.executemany(
+            "DELETE FROM sessions WHERE user_id = ?", [(user_id,) for user_id in deletes]
+        )
+        self._conn.commit()
+
+    async def keys(self, max_age):
+        """Return ``(user_id, channel_id)`` for every stored session younger than ``max_age``"""
+        return await self._run(self._keys, max_age)
+
+    async def load(self, user_id):
+        return await self._run(self._load, user_id)
+
+    async def write(self, upserts, deletes):
+        await self._run(self._write, upserts, deletes)
+
+
+class SQLiteMilestoneBackend(_SQLiteBackend):
+    """Stores scheduled flight milestones in a local SQLite file"""
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS milestones ("
+        "job_id TEXT PRIMARY KEY, due REAL NOT NULL, data TEXT NOT NULL)"
+    )
+
+    def _load_all(self):
+        return [json.loads(row[0]) for row in self._conn.execute("SELECT data FROM milestones")]
+
+    def _write(self, upserts, deletes):
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO milestones (job_id, due, data) VALUES (?, ?, ?)",
+            [(job_id, job["due"], json.dumps(job)) for job_id, job in upserts.items()]
+        )
+        self._conn.executemany(
+            "DELETE FROM milestones WHERE job_id = ?", [(job_id,) for job_id in deletes]
+        )
+        self._conn.commit()
+
+    async def load_all(self):
+        return await self._run(self._load_all)
+
+    async def write(self, upserts, deletes):
+        await self._run(self._write, upserts, deletes)
+
+
+class MongoSessionBackend:
+    """Stores flight planning sessions in a MongoDB collection"""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def keys(self, max_age):
+        cutoff = time.time() - max_age
+        await self.collection.delete_many({"type": "session", "updated_at": {"$lt": cutoff}})
+        cursor = self.collection.find({"type": "session"}, {"user_id": 1, "data.channel_id": 1})
+        return [(doc["user_id"], doc["data"]["channel_id"]) async for doc in cursor]
+
+    async def load(self, user_id):
+        doc = await self.collection.find_one({"_id": f"session:{user_id}"})
+        return doc["data"] if doc else None
+
+    async def write(self, upserts, deletes):
+        from pymongo import DeleteOne, ReplaceOne
+
+        now = time.time()
+        requests = [
+            ReplaceOne(
+                {"_id": f"session:{user_id}"},
+                {"type": "session", "user_id": user_id, "updated_at": now, "data": doc},
+                upsert=True
+            )
+            for user_id, doc in upserts.items()
+        ]
+        requests.extend(DeleteOne({"_id": f"session:{user_id}"}) for user_id in deletes)
+        if requests:
+            await self.collection.bulk_write(requests, ordered=False)
+
+    async def close(self):
+        pass
+
+
+class MongoMilestoneBackend:
+    """Stores scheduled flight milestones in a MongoDB collection"""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def load_all(self):
+        return [doc["data"] async for doc in self.collection.find({"type": "milestone"})]
+
+    async def write(self, upserts, deletes):
+        from pymongo import DeleteOne, ReplaceOne
+
+        requests = [
+            ReplaceOne(
+                {"_id": f"milestone:{job_id}"},
+                {"type": "milestone", "due": job["due"], "data": job},
+                upsert=True
+            )
+            for job_id, job in upserts.items()
+        ]
+        requests.extend(DeleteOne({"_id": f"milestone:{job_id}"}) for job_id in deletes)
+        if requests:
+            await self.collection.bulk_write(requests, ordered=False)
+
+    async def close(self):
+        pass
@@ -0,0 +1,180 @@
+import string
+from functools import lru_cache
+
+import discord
+
+from geometry import format_block_time
+
+# Branding per airline. Adding an airline is a new entry here (plus its
+# fleet in views.FLEETS); the layouts below pick these keys up by name.
+AIRLINES = {
+    "Qantas": {
+        "color": 0xE40000,
+        "logo": "https://1000logos.net/wp-content/uploads/2017/05/Qantas-Logo-1536x966.png",
+        "footer": "Qantas Airways • The Spirit of Australia",
+        "name": "Qantas",
+        "header_emoji": "<:QFtail2:1401856972180947035>",
+        "departure_emoji": "<:Departing:1399308427267801138>",
+        "arrival_emoji": "<:Landing:1399308429801029692>",
+        "route_emoji": "<:Australia:1399308387866640508>",
+        "aircraft_emoji": "<:QFseatbelt:1401010857928032316>",
+        "status_emoji": "<:Announcment:1399308384502808588>",
+        "info_emoji": "<:External:1399308477897244705>",
+        "services_title": "✈️ AMENITIES & SERVICES",
+        "services": "<:QFwifi:1401010833831759922> Wi-Fi Available  •  <:QFmail:1399308493910966322> In-Flight Service  •  <:Link:1399308473342099507> Entertainment",
+        "checkin_emoji": "<:QFseatbelt:1401010857928032316>",
+        "notice_emoji": "<:Announcment:1399308384502808588>",
+        "assistance_emoji": "<:External:1399308477897244705>",
+    },
+    "Jetstar": {
+        "color": 0xFF6600,
+        "logo": "https://logos-world.net/wp-content/uploads/2023/01/Jetstar-Logo-2003.png",
+        "footer": "Jetstar Airways • All Day, Every Day, Low Fares",
+        "name": "Jetstar",
+        "header_emoji": "<:JQtail:1421704382608838776>",
+        "departure_emoji": "<:JQplane:1421703070907105280>",
+        "arrival_emoji": "<:JQtower:1421700708629086250>",
+        "route_emoji": "<:JQwhite:1421704746355527801>",
+        "aircraft_emoji": "<:JQplane:1421703070907105280>",
+        "status_emoji": "<:JQcall:1421702400162402304>",
+        "info_emoji": "<:JQwhite:1421704746355527801>",
+        "services_title": "✈️ SERVICES",
+        "services": "<:JQmusic:1421701618377687050> In-Flight Entertainment  •  <:JQcall:1421702400162402304> Customer Service",
+        "checkin_emoji": "<:JQplane:1421703070907105280>",
+        "notice_emoji": "<:JQcall:1421702400162402304>",
+        "assistance_emoji": "<:JQtower:1421700708629086250>",
+    },
+}
+# Unknown airlines are shown with this branding
+DEFAULT_AIRLINE = "Jetstar"
+
+# Embed layouts as (name, value, inline) fields. Branding keys are filled in
+# when a template is compiled; the remaining placeholders are per flight.
+LAYOUTS = {
+    "flight_plan": (
+        ("{header_emoji} FLIGHT CONFIRMATION", "**Flight {flight_number}** • {aircraft}", False),
+        ("{departure_emoji} DEPARTURE", "**{departure_code}** {departure_name}\n<t:{departure_timestamp}:F>\n<t:{departure_timestamp}:R>", True),
+        ("{arrival_emoji} ARRIVAL", "**{arrival_code}** {arrival_name}{arrival_estimate}", True),
+        ("\u200b", "\u200b", False),
+        ("{info_emoji} FLIGHT INFORMATION", "{route_emoji} **Route:** {departure_code} → {arrival_code}\n{aircraft_emoji} **Aircraft:** {aircraft}{route_details}\n{status_emoji} **Status:** {status}", False),
+        ("{services_title}", "{services}", False),
+    ),
+    "checkin_closed": (
+        ("{header_emoji} CHECK-IN STATUS", "**Flight {flight_number}**", False),
+        ("", "━━━━━━━━━━━━━━━━━━━━━━", False),
+        ("{checkin_emoji} CHECK-IN CLOSED", "Online check-in for this flight has now closed.\n\nPassengers are advised to proceed directly to the airport and complete check-in at the {name} service counter.", False),
+        ("{notice_emoji} IMPORTANT INFORMATION", "• Arrive at the airport at least **2 hours** before departure for domestic flights\n• Arrive at least **3 hours** before departure for international flights\n• Have your booking reference and identification ready", False),
+        ("{assistance_emoji} NEED ASSISTANCE?", "Visit the {name} service desk or contact our customer service team for support.", False),
+    ),
+    "boarding": (
+        ("{header_emoji} BOARDING STATUS", "**Flight {flight_number}**", False),
+        ("", "━━━━━━━━━━━━━━━━━━━━━━", False),
+        ("{departure_emoji} NOW BOARDING", "Flight {flight_number} is now boarding.\n\nPlease make your way to the gate with your boarding pass and identification ready.", False),
+        ("{assistance_emoji} NEED ASSISTANCE?", "Speak to {name} staff at the gate.", False),
+    ),
+}
+
+_formatter = string.Formatter()
+
+
+class _KeepMissing(dict):
+    """format_map() mapping that leaves unknown placeholders for later"""
+
+    def __missing__(self, key):
+        return "{" + key + "}"
+
+
+def _escape(value):
+    return str(value).replace("{", "{{").replace("}", "}}")
+
+
+def _compile_text(text):
+    """Split the format string ``text`` into literal pieces and ``(position, key)`` slots
+
+    Filling a copy of the pieces and joining them is about twice as fast
+    as ``format_map``, which re-parses the string on every call.
+    """
+    pieces = []
+    slots = []
+    for literal, key, _, _ in _formatter.parse(text):
+        if literal:
+            pieces.append(literal)
+        if key is not None:
+            slots.append((len(pieces), key))
+            pieces.append("")
+    return tuple(pieces), tuple(slots)
+
+
+@lru_cache(maxsize=None)
+def compile_template(layout, airline):
+    """Build the embed for ``layout`` in ``airline``'s branding
+
+    Returns ``(data, fields, dynamic)``: the embed dict without its
+    fields, the field dicts, and ``(index, part, pieces, slots)`` for each
+    field name or value that still needs per-flight values, pre-split with
+    the branding already filled in. Compiled once per pair and shared, so
+    never mutate it.
+    """
+    brand = AIRLINES.get(airline, AIRLINES[DEFAULT_AIRLINE])
+    # Escaped so braces in branding text survive the per-flight format
+    branding = _KeepMissing({key: _escape(value) for key, value in brand.items()})
+    fields = []
+    dynamic = []
+    for index, (name, value, inline) in enumerate(LAYOUTS[layout]):
+        field = {"inline": inline}
+        for part, text in (("name", name), ("value", value)):
+            pieces, slots = _compile_text(text.format_map(branding))
+            field[part] = "".join(pieces)
+            if slots:
+                dynamic.append((index, part, pieces, slots))
+        fields.append(field)
+
+    template = discord.Embed(color=brand["color"])
+    template.set_thumbnail(url=brand["logo"])
+    template.set_footer(text=brand["footer"], icon_url=brand["logo"])
+    return template.to_dict(), tuple(fields), tuple(dynamic)
+
+
+def render(layout, airline, values):
+    """A fresh Embed from the compiled template, filling only the per-flight fields
+
+    ``Embed.from_dict`` keeps the dicts it is given, so every nested dict
+    is copied first; changing one rendered embed never reaches the
+    template or later renders.
+    """
+    data, fields, dynamic = compile_template(layout, airline)
+    data = {key: dict(value) if isinstance(value, dict) else value for key, value in data.items()}
+    fields = [dict(field) for field in fields]
+    for index, part, pieces, slots in dynamic:
+        pieces = list(pieces)
+        for position, key in slots:
+            pieces[position] = str(values[key])
+        fields[index][part] = "".join(pieces)
+    data["fields"] = fields
+    return discord.Embed.from_dict(data)
+
+
+# Status shown on a freshly posted flight plan
+DEFAULT_STATUS = "Confirmed"
+
+
+def flight_plan_values(session, status=DEFAULT_STATUS):
+    """Per-flight values for the ``flight_plan`` layout"""
+    arrival_timestamp = session.arrival_timestamp
+    route_details = ""
+    if session.route_distance is not None:
+        route_details += f"\n**Distance:** {session.route_distance:,} km"
+    if session.block_minutes is not None:
+        route_details += f"\n**Block Time:** ~{format_block_time(session.block_minutes)}"
+    return {
+        "flight_number": session.flight_number,
+        "aircraft": session.aircraft,
+        "departure_code": session.departure_code,
+        "departure_name": session.departure_name,
+        "departure_timestamp": session.combined_timestamp,
+        "arrival_code": session.arrival_code,
+        "arrival_name": session.arrival_name,
+        "arrival_estimate": f"\n<t:{arrival_timestamp}:F> (est.)" if arrival_timestamp else "",
+        "route_details": route_details,
+        "status": status,
+    }
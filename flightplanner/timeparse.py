@@ -0,0 +1,101 @@
+import re
+from datetime import date, timedelta
+from typing import NamedTuple, Optional
+
+MONTHS = ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec")
+
+# One alternative per accepted token; the input must be covered by tokens end to end
+_TOKEN = re.compile(
+    r"""
+    [\s,]*(?:
+        (?P<iso>(?P<iso_y>\d{4})-(?P<iso_m>\d{1,2})-(?P<iso_d>\d{1,2})
+            (?:[t\s]+(?P<iso_h>\d{1,2}):(?P<iso_min>\d{2})(?::\d{2})?)?)
+      | (?P<relative>today|tomorrow|tmrw|tmr)
+      | (?P<dmy>(?P<d>\d{1,2})(?P<sep>[/.\-\s])(?P<m>\d{1,2})(?P=sep)(?P<y>\d{4}|\d{2}))(?!\d)
+      | (?P<named>(?P<nd>\d{1,2})(?:st|nd|rd|th)?\s*(?P<mon>%s)[a-z]*\.?(?:\s+(?P<ny>\d{4}))?)
+      | (?P<clock>(?P<h>\d{1,2})[:.](?P<min>\d{2})(?:\s*(?P<ampm>[ap])\.?m\.?)?)(?![\d/.\-])
+      | (?P<hour>(?P<hh>\d{1,2})\s*(?P<hampm>[ap])\.?m\.?)
+      | (?P<compact>(?P<ch>\d{2})(?P<cm>\d{2}))(?!\d)
+      | (?P<filler>at|on)\b
+    )[\s,]*
+    """ % "|".join(MONTHS),
+    re.VERBOSE | re.IGNORECASE
+)
+
+
+class ParsedDateTime(NamedTuple):
+    # Minutes after local midnight, if a time was given
+    minutes: Optional[int]
+    day: Optional[date]
+
+
+def _clock(hours, minutes, meridiem=None):
+    if meridiem:
+        if not 1 <= hours <= 12:
+            raise ValueError("hour out of range for 12-hour time")
+        hours = hours % 12 + (12 if meridiem in "pP" else 0)
+    if hours > 23 or minutes > 59:
+        raise ValueError("time out of range")
+    return hours * 60 + minutes
+
+
+def _year(year):
+    return year + 2000 if year < 100 else year
+
+
+def parse_datetime(text, today):
+    """Parse a departure time, date or both from one message
+
+    ``today`` is the current date at the departure airport, used for
+    "today"/"tomorrow" and day-month dates without a year. Returns None if
+    any part of ``text`` isn't understood or a time or date is given twice.
+    """
+    minutes = day = None
+    position, end = 0, len(text)
+    while position < end:
+        match = _TOKEN.match(text, position)
+        if match is None or match.end() == position:
+            return None
+        position = match.end()
+        group = match.group
+
+        parsed_minutes = parsed_day = None
+        try:
+            if group("iso"):
+                parsed_day = date(int(group("iso_y")), int(group("iso_m")), int(group("iso_d")))
+                if group("iso_h"):
+                    parsed_minutes = _clock(int(group("iso_h")), int(group("iso_min")))
+            elif group("relative"):
+                parsed_day = today if group("relative").lower() == "today" else today + timedelta(days=1)
+            elif group("dmy"):
+                parsed_day = date(_year(int(group("y"))), int(group("m")), int(group("d")))
+            elif group("named"):
+                month = MONTHS.index(group("mon").lower()) + 1
+                if group("ny"):
+                    parsed_day = date(int(group("ny")), month, int(group("nd")))
+                else:
+                    # No year: the next time that day comes round
+                    parsed_day = date(today.year, month, int(group("nd")))
+                    if parsed_day < today:
+                        parsed_day = date(today.year + 1, month, int(group("nd")))
+            elif group("clock"):
+                parsed_minutes = _clock(int(group("h")), int(group("min")), group("ampm"))
+            elif group("hour"):
+                parsed_minutes = _clock(int(group("hh")), 0, group("hampm"))
+            elif group("compact"):
+                parsed_minutes = _clock(int(group("ch")), int(group("cm")))
+        except ValueError:
+            return None
+
+        if parsed_minutes is not None:
+            if minutes is not None:
+                return None
+            minutes = parsed_minutes
+        if parsed_day is not None:
+            if day is not None:
+                return None
+            day = parsed_day
+
+    if minutes is None and day is None:
+        return None
+    return ParsedDateTime(minutes, day)
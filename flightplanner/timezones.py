@@ -0,0 +1,50 @@
+from datetime import date, datetime, time as dtime
+from functools import lru_cache
+
+import pytz
+
+# Used when an airport record has no (or an unknown) timezone
+DEFAULT_TIMEZONE = "Australia/Sydney"
+
+
+@lru_cache(maxsize=None)
+def get_zone(name):
+    """Return the tzinfo for ``name``, built once per zone
+
+    Unknown or missing names fall back to :data:`DEFAULT_TIMEZONE`.
+    """
+    try:
+        return pytz.timezone(name or DEFAULT_TIMEZONE)
+    except pytz.UnknownTimeZoneError:
+        return pytz.timezone(DEFAULT_TIMEZONE)
+
+
+def airport_timezone(airport):
+    """The timezone name to interpret local times at ``airport`` in"""
+    name = airport.get('timezone') if airport else None
+    return name if name and get_zone(name).zone == name else DEFAULT_TIMEZONE
+
+
+def local_now(zone_name):
+    return datetime.now(get_zone(zone_name))
+
+
+def local_timestamp(zone_name, day, minutes):
+    """Unix timestamp of ``minutes`` after midnight on ``day`` in ``zone_name``
+
+    ``day`` is a :class:`date` or a date ordinal. A wall-clock time skipped
+    by a DST change is moved forward by the size of the gap; one that
+    happens twice resolves to its first occurrence.
+    """
+    if not isinstance(day, date):
+        day = date.fromordinal(day)
+    zone = get_zone(zone_name)
+    naive = datetime.combine(day, dtime(hour=minutes // 60, minute=minutes % 60))
+    try:
+        local = zone.localize(naive, is_dst=None)
+    except pytz.AmbiguousTimeError:
+        local = zone.localize(naive, is_dst=True)
+    except pytz.NonExistentTimeError:
+        # Read the skipped time with the pre-change offset, landing after the gap
+        local = zone.normalize(zone.localize(naive, is_dst=False))
+    return int(local.timestamp())
@@ -1,5 +1,26 @@
 import discord
 from discord.ui import View, Select, button
+from session import FlightSession
+from stages import PLANNING
+
+# Aircraft offered for each airline, in dropdown order
+FLEETS = {
+    "Qantas": (
+        "Bombardier Dash 8 Q400",
+        "Boeing 737-800",
+        "Airbus A330-200",
+        "Airbus A330-300",
+        "Boeing 787-9",
+        "Airbus A380",
+    ),
+    "Jetstar": (
+        "Airbus A320",
+        "Airbus A320neo",
+        "Airbus A321",
+        "Airbus A321neo",
+        "Boeing 787-8",
+    ),
+}
 
 
 class FlightSelectionView(View):
@@ -76,13 +97,7 @@ class JetstarAircraftDropdown(Select):
         self.airline = airline
         self.bot = bot
         
-        options = [
-            discord.SelectOption(label="Airbus A320", emoji="✈️"),
-            discord.SelectOption(label="Airbus A320neo", emoji="✈️"),
-            discord.SelectOption(label="Airbus A321", emoji="✈️"),
-            discord.SelectOption(label="Airbus A321neo", emoji="✈️"),
-            discord.SelectOption(label="Boeing 787-8", emoji="✈️"),
-        ]
+        options = [discord.SelectOption(label=aircraft, emoji="✈️") for aircraft in FLEETS["Jetstar"]]
         
         super().__init__(
             placeholder="Select an aircraft...",
@@ -101,27 +116,20 @@ class JetstarAircraftDropdown(Select):
         
         selected_aircraft = self.values[0]
         
-        # Ask for departure airport
-        embed = discord.Embed(
-            title="🛫 Departure Airport",
-            description="Please enter the **3-letter IATA code** of your departure airport.\n\nExample: `SYD` for Sydney, `MEL` for Melbourne",
-            color=discord.Color.green()
+        # Store the flight data and wait for IATA code
+        flight_data = FlightSession(
+            user_id=self.author.id,
+            channel_id=interaction.channel_id,
+            guild_id=interaction.guild_id,
+            airline=self.airline,
+            aircraft=selected_aircraft,
+            prompt_message_id=interaction.message.id
         )
-        embed.add_field(name="Airline", value=f"⭐ {self.airline}", inline=True)
-        embed.add_field(name="Aircraft", value=f"✈️ {selected_aircraft}", inline=True)
-        embed.set_footer(text="Type the 3-letter airport code in chat")
         
+        # Ask for departure airport
+        embed = PLANNING.prompt(flight_data.stage, flight_data)
         await interaction.response.edit_message(embed=embed, view=None)
         
-        # Store the flight data and wait for IATA code
-        flight_data = {
-            "airline": self.airline,
-            "aircraft": selected_aircraft,
-            "author": self.author,
-            "channel": interaction.channel,
-            "stage": "departure_iata"
-        }
-        
         # Register the wait for message
         self.bot.dispatch("flight_awaiting_input", flight_data)
 
@@ -134,14 +142,7 @@ class QantasAircraftDropdown(Select):
         self.airline = airline
         self.bot = bot
         
-        options = [
-            discord.SelectOption(label="Bombardier Dash 8 Q400", emoji="✈️"),
-            discord.SelectOption(label="Boeing 737-800", emoji="✈️"),
-            discord.SelectOption(label="Airbus A330-200", emoji="✈️"),
-            discord.SelectOption(label="Airbus A330-300", emoji="✈️"),
-            discord.SelectOption(label="Boeing 787-9", emoji="✈️"),
-            discord.SelectOption(label="Airbus A380", emoji="✈️"),
-        ]
+        options = [discord.SelectOption(label=aircraft, emoji="✈️") for aircraft in FLEETS["Qantas"]]
         
         super().__init__(
             placeholder="Select an aircraft...",
@@ -160,26 +161,19 @@ class QantasAircraftDropdown(Select):
         
         selected_aircraft = self.values[0]
         
-        # Ask for departure airport
-        embed = discord.Embed(
-            title="🛫 Departure Airport",
-            description="Please enter the **3-letter IATA code** of your departure airport.\n\nExample: `SYD` for Sydney, `MEL` for Melbourne",
-            color=discord.Color.red()
+        # Store the flight data and wait for IATA code
+        flight_data = FlightSession(
+            user_id=self.author.id,
+            channel_id=interaction.channel_id,
+            guild_id=interaction.guild_id,
+            airline=self.airline,
+            aircraft=selected_aircraft,
+            prompt_message_id=interaction.message.id
         )
-        embed.add_field(name="Airline", value=f"🦘 {self.airline}", inline=True)
-        embed.add_field(name="Aircraft", value=f"✈️ {selected_aircraft}", inline=True)
-        embed.set_footer(text="Type the 3-letter airport code in chat")
         
+        # Ask for departure airport
+        embed = PLANNING.prompt(flight_data.stage, flight_data)
         await interaction.response.edit_message(embed=embed, view=None)
         
-        # Store the flight data and wait for IATA code
-        flight_data = {
-            "airline": self.airline,
-            "aircraft": selected_aircraft,
-            "author": self.author,
-            "channel": interaction.channel,
-            "stage": "departure_iata"
-        }
-        
         # Register the wait for message
         self.bot.dispatch("flight_awaiting_input", flight_data)
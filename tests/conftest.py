@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The plugin's modules import each other by bare name, as Modmail loads them
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "flightplanner"))
@@ -0,0 +1,130 @@
+import asyncio
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+from airportapi import AirportAPIClient
+
+SYDNEY = {"name": "Sydney Kingsford Smith", "city": "Sydney", "country_code": "AU",
+          "timezone": "Australia/Sydney", "lat": -33.9461, "lng": 151.177}
+
+
+class StandInAPI:
+    """Local airport API: SYD is known, ERR fails, SLO answers slowly"""
+
+    def __init__(self):
+        self.requests = 0
+        self.connections = set()
+        self.runner = None
+        self.url = None
+
+    async def airports(self, request):
+        self.requests += 1
+        # One client port per TCP connection
+        self.connections.add(request.transport.get_extra_info("peername"))
+        code = request.query["iata_code"]
+        if code == "ERR":
+            return web.Response(status=503)
+        if code == "SLO":
+            await asyncio.sleep(0.5)
+        return web.json_response({"response": [SYDNEY] if code in ("SYD", "SLO") else []})
+
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_get("/airports", self.airports)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.runner.cleanup()
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_fetch_found_and_not_found():
+    async def main():
+        async with StandInAPI() as api:
+            client = AirportAPIClient(base_url=api.url)
+            try:
+                found = await client.fetch_airport("SYD")
+                missing = await client.fetch_airport("XQQ")
+            finally:
+                await client.close()
+        return found, missing
+
+    found, missing = run(main())
+    assert found["code"] == "SYD"
+    assert found["timezone"] == "Australia/Sydney"
+    assert found["lon"] == 151.177
+    assert missing is None
+
+
+def test_server_errors_propagate():
+    async def main():
+        async with StandInAPI() as api:
+            client = AirportAPIClient(base_url=api.url)
+            try:
+                await client.fetch_airport("ERR")
+            finally:
+                await client.close()
+
+    with pytest.raises(aiohttp.ClientResponseError):
+        run(main())
+
+
+def test_client_timeout_applies_without_override():
+    async def main():
+        async with StandInAPI() as api:
+            client = AirportAPIClient(base_url=api.url, timeout=0.1)
+            try:
+                await client.fetch_airport("SLO")
+            finally:
+                await client.close()
+
+    with pytest.raises(asyncio.TimeoutError):
+        run(main())
+
+
+def test_override_shortens_budget():
+    async def main():
+        async with StandInAPI() as api:
+            client = AirportAPIClient(base_url=api.url, timeout=5)
+            try:
+                await client.fetch_airport("SLO", timeout=0.1)
+            finally:
+                await client.close()
+
+    with pytest.raises(asyncio.TimeoutError):
+        run(main())
+
+
+def test_override_keeps_connect_timeout_and_caps_total():
+    client = AirportAPIClient(timeout=5, connect_timeout=2)
+    assert client.request_timeout(1).total == 1
+    assert client.request_timeout(1).sock_connect == 2
+    # A budget longer than the configured total doesn't extend it
+    assert client.request_timeout(30).total == 5
+
+
+def test_repeated_lookups_reuse_one_connection():
+    async def main():
+        async with StandInAPI() as api:
+            client = AirportAPIClient(base_url=api.url)
+            try:
+                for _ in range(10):
+                    await client.fetch_airport("SYD")
+            finally:
+                await client.close()
+            return api.requests, len(api.connections)
+
+    requests, connections = run(main())
+    assert requests == 10
+    assert connections == 1
@@ -0,0 +1,148 @@
+import asyncio
+
+import pytest
+
+from airportcache import AirportCache, SingleFlight
+
+
+class Upstream:
+    """Counts calls and answers once released"""
+
+    def __init__(self, error=None):
+        self.calls = 0
+        self.error = error
+        self.release = asyncio.Event()
+
+    async def fetch(self, code):
+        self.calls += 1
+        await self.release.wait()
+        if self.error:
+            raise self.error
+        return {"code": code}
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_concurrent_callers_share_one_fetch():
+    async def main():
+        flights = SingleFlight()
+        upstream = Upstream()
+        waiters = [asyncio.create_task(flights.do("SYD", upstream.fetch, "SYD")) for _ in range(50)]
+        await asyncio.sleep(0)
+        upstream.release.set()
+        results = await asyncio.gather(*waiters)
+        return flights, upstream, results
+
+    flights, upstream, results = run(main())
+    assert upstream.calls == 1
+    assert results == [{"code": "SYD"}] * 50
+    assert flights.stats == {"calls": 1, "shared": 49}
+    assert len(flights) == 0
+
+
+def test_different_keys_fetch_separately():
+    async def main():
+        flights = SingleFlight()
+        upstream = Upstream()
+        upstream.release.set()
+        return upstream, await asyncio.gather(
+            flights.do("SYD", upstream.fetch, "SYD"),
+            flights.do("MEL", upstream.fetch, "MEL"),
+        )
+
+    upstream, results = run(main())
+    assert upstream.calls == 2
+    assert results == [{"code": "SYD"}, {"code": "MEL"}]
+
+
+def test_cancelled_caller_does_not_stop_the_others():
+    async def main():
+        flights = SingleFlight()
+        upstream = Upstream()
+        first = asyncio.create_task(flights.do("SYD", upstream.fetch, "SYD"))
+        others = [asyncio.create_task(flights.do("SYD", upstream.fetch, "SYD")) for _ in range(3)]
+        await asyncio.sleep(0)
+        # The caller that started the fetch gives up
+        first.cancel()
+        await asyncio.sleep(0)
+        upstream.release.set()
+        results = await asyncio.gather(*others)
+        return flights, upstream, first, results
+
+    flights, upstream, first, results = run(main())
+    assert first.cancelled()
+    assert upstream.calls == 1
+    assert results == [{"code": "SYD"}] * 3
+    assert len(flights) == 0
+
+
+def test_fetch_finishes_when_every_caller_is_cancelled():
+    async def main():
+        flights = SingleFlight()
+        upstream = Upstream()
+        waiter = asyncio.create_task(flights.do("SYD", upstream.fetch, "SYD"))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.sleep(0)
+        upstream.release.set()
+        while len(flights):
+            await asyncio.sleep(0)
+        # The next caller starts a fresh fetch rather than joining a dead one
+        return upstream, await flights.do("SYD", upstream.fetch, "SYD")
+
+    upstream, result = run(main())
+    assert upstream.calls == 2
+    assert result == {"code": "SYD"}
+
+
+def test_exception_reaches_every_waiter():
+    async def main():
+        flights = SingleFlight()
+        upstream = Upstream(error=RuntimeError("upstream down"))
+        waiters = [asyncio.create_task(flights.do("SYD", upstream.fetch, "SYD")) for _ in range(5)]
+        await asyncio.sleep(0)
+        upstream.release.set()
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        return flights, upstream, results
+
+    flights, upstream, results = run(main())
+    assert upstream.calls == 1
+    assert len(results) == 5
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert len(flights) == 0
+
+
+def test_failed_fetch_is_not_reused():
+    async def main():
+        flights = SingleFlight()
+        upstream = Upstream(error=RuntimeError("upstream down"))
+        upstream.release.set()
+        with pytest.raises(RuntimeError):
+            await flights.do("SYD", upstream.fetch, "SYD")
+        upstream.error = None
+        return upstream, await flights.do("SYD", upstream.fetch, "SYD")
+
+    upstream, result = run(main())
+    assert upstream.calls == 2
+    assert result == {"code": "SYD"}
+
+
+def test_not_found_answer_drops_usage():
+    async def fetch(code):
+        return {"code": code} if code == "SYD" else None
+
+    async def main():
+        cache = AirportCache()
+        # Counts carried over from before, e.g. loaded from disk
+        cache.usage.update({"SYD": 3, "XQQ": 5})
+        await cache.get_or_fetch("SYD", fetch)
+        await cache.get_or_fetch("XQQ", fetch)
+        return cache
+
+    cache = run(main())
+    assert cache.usage == {"SYD": 3}
+    assert cache.most_used(50) == ["SYD"]
+    # The miss is still cached so the typo doesn't hit the API again
+    assert cache.get("XQQ") is None
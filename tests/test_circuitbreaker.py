@@ -0,0 +1,138 @@
+import asyncio
+
+import pytest
+
+import circuitbreaker
+from circuitbreaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(circuitbreaker, "time", clock)
+    return clock
+
+
+async def fail():
+    raise RuntimeError("upstream down")
+
+
+async def succeed():
+    return "ok"
+
+
+async def trip(breaker):
+    for _ in range(breaker.failure_threshold):
+        with pytest.raises(RuntimeError):
+            await breaker.call(fail)
+
+
+def test_slow_call_finishing_after_the_breaker_opened_does_not_close_it(clock):
+    async def main():
+        breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=30)
+        release = asyncio.Event()
+
+        async def slow():
+            await release.wait()
+            return "late"
+
+        # Admitted while closed, still running when the breaker trips
+        slow_call = asyncio.create_task(breaker.call(slow))
+        await asyncio.sleep(0)
+        await trip(breaker)
+        assert breaker.state == OPEN
+
+        release.set()
+        assert await slow_call == "late"
+        state_after_slow_call = breaker.state
+        with pytest.raises(CircuitOpenError):
+            await breaker.call(succeed)
+        return breaker, state_after_slow_call
+
+    breaker, state = asyncio.run(main())
+    assert state == OPEN
+    assert breaker.stats["closed"] == 0
+
+
+def test_slow_call_does_not_settle_the_half_open_probe(clock):
+    async def main():
+        breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=30)
+        release = asyncio.Event()
+
+        async def slow():
+            await release.wait()
+            raise RuntimeError("late failure")
+
+        slow_call = asyncio.create_task(breaker.call(slow))
+        await asyncio.sleep(0)
+        await trip(breaker)
+        clock.now += 30
+
+        probe_release = asyncio.Event()
+
+        async def probe():
+            await probe_release.wait()
+            return "probe"
+
+        probe_call = asyncio.create_task(breaker.call(probe))
+        await asyncio.sleep(0)
+        assert breaker.state == HALF_OPEN
+
+        # The old call's failure neither reopens nor frees a second probe
+        release.set()
+        with pytest.raises(RuntimeError):
+            await slow_call
+        assert breaker.state == HALF_OPEN
+        with pytest.raises(CircuitOpenError):
+            await breaker.call(succeed)
+
+        probe_release.set()
+        assert await probe_call == "probe"
+        return breaker
+
+    breaker = asyncio.run(main())
+    assert breaker.state == CLOSED
+
+
+def test_probe_result_decides_the_state(clock):
+    async def main():
+        breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=30)
+        await trip(breaker)
+        with pytest.raises(CircuitOpenError):
+            await breaker.call(succeed)
+
+        clock.now += 30
+        with pytest.raises(RuntimeError):
+            await breaker.call(fail)
+        reopened = breaker.state
+
+        clock.now += 30
+        assert await breaker.call(succeed) == "ok"
+        return breaker, reopened
+
+    breaker, reopened = asyncio.run(main())
+    assert reopened == OPEN
+    assert breaker.state == CLOSED
+    assert breaker.stats["opened"] == 2
+    assert breaker.stats["closed"] == 1
+
+
+def test_success_while_closed_resets_the_failure_count(clock):
+    async def main():
+        breaker = CircuitBreaker("test", failure_threshold=3)
+        for _ in range(5):
+            for call in (fail, fail):
+                with pytest.raises(RuntimeError):
+                    await breaker.call(call)
+            await breaker.call(succeed)
+        return breaker
+
+    assert asyncio.run(main()).state == CLOSED
@@ -0,0 +1,132 @@
+import asyncio
+
+import pytest
+
+from confirmations import (
+    CUSTOM_ID_LIMIT, PERSISTENT_BUTTONS, CheckInClosedButton, SendCheckInClosedButton,
+    SkipCheckInClosedButton, custom_id
+)
+
+
+def parse(item):
+    """Rebuild ``item`` from its custom_id the way discord.py does on a click"""
+    cls = type(item)
+    match = cls.__discord_ui_compiled_template__.fullmatch(item.custom_id)
+    assert match is not None, item.custom_id
+    return asyncio.run(cls.from_custom_id(None, item.item, match))
+
+
+@pytest.mark.parametrize("flight_number", ["QF1", "JQ9999A", "QF:1", "QF 1/2%"])
+def test_buttons_round_trip(flight_number):
+    button = parse(CheckInClosedButton("Qantas", flight_number))
+    assert (button.airline, button.flight_number) == ("Qantas", flight_number)
+
+    button = parse(SendCheckInClosedButton(123456789012345678, "Jetstar", flight_number))
+    assert (button.author_id, button.airline, button.flight_number) == (123456789012345678, "Jetstar", flight_number)
+
+    assert parse(SkipCheckInClosedButton(42)).author_id == 42
+
+
+def test_buttons_carry_the_departure():
+    button = parse(CheckInClosedButton("Qantas", "QF1", 1800000000))
+    assert (button.flight_number, button.departure) == ("QF1", 1800000000)
+
+    button = parse(SendCheckInClosedButton(42, "Qantas", "QF:1", 1800000000))
+    assert (button.author_id, button.flight_number, button.departure) == (42, "QF:1", 1800000000)
+
+
+def test_buttons_posted_without_a_departure_still_parse():
+    for cls, custom_id_, expected in (
+        (CheckInClosedButton, "flightplanner:checkin:Qantas:QF1", ("Qantas", "QF1", None)),
+        (SendCheckInClosedButton, "flightplanner:checkin-send:42:Qantas:QF1", ("Qantas", "QF1", None)),
+    ):
+        match = cls.__discord_ui_compiled_template__.fullmatch(custom_id_)
+        button = asyncio.run(cls.from_custom_id(None, None, match))
+        assert (button.airline, button.flight_number, button.departure) == expected
+        assert button.custom_id == custom_id_
+
+
+def test_templates_do_not_match_each_other():
+    send = SendCheckInClosedButton(1, "Qantas", "QF1").custom_id
+    for cls in PERSISTENT_BUTTONS:
+        if cls is not SendCheckInClosedButton:
+            assert cls.__discord_ui_compiled_template__.fullmatch(send) is None
+
+
+def test_custom_id_over_the_limit_is_refused():
+    assert len(custom_id("flightplanner:checkin", "Qantas", "Q" * 50)) <= CUSTOM_ID_LIMIT
+    with pytest.raises(ValueError):
+        custom_id("flightplanner:checkin", "Qantas", "Q" * 100)
+    with pytest.raises(ValueError):
+        SendCheckInClosedButton(123456789012345678, "Qantas", ":" * 30)
+
+
+class Handler:
+    def __init__(self):
+        self.ended = []
+
+    def end_session(self, user_id):
+        self.ended.append(user_id)
+
+
+class Destinations:
+    def channel_ids(self, guild_id):
+        return [10]
+
+    async def post(self, channel_ids, embed, priority):
+        return []
+
+
+class Cog:
+    def __init__(self):
+        self.flight_handler = Handler()
+        self.destinations = Destinations()
+        self.cancelled = []
+
+    def cancel_checkin_closed(self, guild_id, flight_number, departure):
+        self.cancelled.append((guild_id, flight_number, departure))
+
+
+class Client:
+    def __init__(self, cog):
+        self.cog = cog
+
+    def get_cog(self, name):
+        return self.cog
+
+
+class Response:
+    def __init__(self):
+        self.edits = []
+
+    async def edit_message(self, **kwargs):
+        self.edits.append(kwargs)
+
+
+class Interaction:
+    guild_id = 1234
+
+    def __init__(self, cog):
+        self.client = Client(cog)
+        self.response = Response()
+
+
+@pytest.mark.parametrize("button", [
+    SendCheckInClosedButton(42, "Qantas", "QF1", 1800000000),
+    SkipCheckInClosedButton(42),
+])
+def test_late_clicks_leave_a_new_session_alone(button):
+    # The plan's session ended when it was sent; by now the user may be planning another flight
+    cog = Cog()
+    interaction = Interaction(cog)
+    asyncio.run(button.callback(interaction))
+    assert cog.flight_handler.ended == []
+    assert len(interaction.response.edits) == 1
+
+
+def test_skip_says_only_the_notice_was_skipped():
+    interaction = Interaction(Cog())
+    asyncio.run(SkipCheckInClosedButton(42).callback(interaction))
+    description = interaction.response.edits[0]["embed"].description
+    assert "has been posted" in description
+    assert "not sent" in description and "check-in closed" in description
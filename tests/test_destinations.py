@@ -0,0 +1,97 @@
+import asyncio
+
+import discord
+
+from destinations import Destinations, parse_destinations
+from embedlimits import message_batches
+from sender import PRIORITY_PLAN, OutboundScheduler
+
+
+class Response:
+    status = 404
+    reason = "Not Found"
+
+
+class Channel:
+    def __init__(self, channel_id):
+        self.id = channel_id
+        self.sent = []
+
+    async def send(self, **kwargs):
+        self.sent.append(kwargs["embeds"])
+        return f"{self.id}:{len(self.sent)}"
+
+
+class Webhook(Channel):
+    """Posts ``lives`` messages, then behaves as if it was deleted"""
+
+    def __init__(self, webhook_id, lives):
+        super().__init__(webhook_id)
+        self.lives = lives
+
+    async def send(self, **kwargs):
+        if self.lives == 0:
+            raise discord.NotFound(Response(), "Unknown Webhook")
+        self.lives -= 1
+        return await super().send(**kwargs)
+
+
+class User:
+    display_name = "Planner"
+
+    class display_avatar:
+        url = "https://example.com/avatar.png"
+
+
+class Bot:
+    user = User()
+
+    def __init__(self, channels):
+        self.channels = channels
+
+    def get_channel(self, channel_id):
+        return self.channels.get(channel_id)
+
+
+def long_embed():
+    embed = discord.Embed(title="Schedule")
+    for number in range(60):
+        embed.add_field(name=f"Flight {number}", value="x" * 500, inline=False)
+    return embed
+
+
+def test_webhook_lost_midway_only_resends_the_rest():
+    embed = long_embed()
+    parts = len(message_batches(embed))
+    assert parts >= 3
+
+    async def main():
+        channel = Channel(1)
+        webhooks = [Webhook(101, lives=1), Webhook(102, lives=parts)]
+        created = []
+
+        async def find_or_create(channel):
+            created.append(webhooks[len(created)])
+            return created[-1]
+
+        destinations = Destinations(Bot({1: channel}), OutboundScheduler(), parse_destinations("1", []))
+        destinations._find_or_create_webhook = find_or_create
+        first = await destinations.post([1], embed, PRIORITY_PLAN)
+        cached = dict(destinations.webhooks)
+        second = await destinations.post([1], embed, PRIORITY_PLAN)
+        await destinations.scheduler.close()
+        return channel, webhooks, created, first[0], cached, second[0]
+
+    channel, webhooks, created, first, cached, second = asyncio.run(main())
+    assert first.error is None
+    # Part one went out through the webhook and only the rest through the channel
+    assert len(webhooks[0].sent) == 1
+    assert len(channel.sent) == parts - 1
+    posted = [[part.to_dict() for part in embeds] for embeds in webhooks[0].sent + channel.sent]
+    assert posted == [[part.to_dict() for part in batch] for batch in message_batches(embed)]
+    assert len(first.messages) == parts
+    # The dead webhook was dropped and the next post made a new one
+    assert cached == {}
+    assert created == webhooks
+    assert second.error is None
+    assert len(webhooks[1].sent) == parts
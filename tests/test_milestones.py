@@ -0,0 +1,128 @@
+import asyncio
+import time
+
+from livestatus import LiveStatusBoard, status_phases
+from milestones import MilestoneScheduler, flight_key, scheduled_departure
+from test_templates import VALUES
+
+GUILD = 1234
+HOUR = 3600
+DAY = 24 * HOUR
+
+
+async def ignore(job):
+    pass
+
+
+def daily(scheduler, days=3, flight_number="QF1"):
+    """Schedule ``flight_number`` at the same time on each of the next ``days`` days"""
+    first = int(time.time()) + 2 * HOUR
+    departures = [first + day * DAY for day in range(days)]
+    for departure in departures:
+        scheduler.schedule_flight(GUILD, "Qantas", flight_number, departure)
+    return departures
+
+
+def test_each_departure_keeps_its_own_jobs():
+    scheduler = MilestoneScheduler(ignore, {"checkin_closed": 45, "boarding": 30})
+    departures = daily(scheduler)
+    assert len(scheduler) == 6
+    assert scheduler.departures(GUILD, "QF1") == departures
+    assert {job["id"] for job in scheduler.jobs.values()} == {
+        f"{flight_key(GUILD, 'QF1', departure)}:{milestone}"
+        for departure in departures for milestone in ("checkin_closed", "boarding")
+    }
+
+
+def test_rescheduling_replaces_only_that_departure():
+    scheduler = MilestoneScheduler(ignore)
+    departures = daily(scheduler)
+    scheduler.schedule_flight(GUILD, "Qantas", "QF1", departures[1])
+    assert len(scheduler) == 3
+    assert scheduler.departures(GUILD, "QF1") == departures
+
+
+def test_cancel_targets_one_departure():
+    scheduler = MilestoneScheduler(ignore, {"checkin_closed": 45, "boarding": 30})
+    departures = daily(scheduler)
+    daily(scheduler, flight_number="QF2")
+
+    assert scheduler.cancel(GUILD, "QF1", departures[1], "checkin_closed") == 1
+    assert scheduler.cancel(GUILD, "QF1", departures[1]) == 1
+    assert scheduler.cancel(GUILD, "QF1", departures[1]) == 0
+    assert scheduler.departures(GUILD, "QF1") == [departures[0], departures[2]]
+    assert len(scheduler.departures(GUILD, "QF2")) == 3
+    # Another guild's flight of the same number is untouched
+    assert scheduler.cancel(GUILD + 1, "QF1", departures[0]) == 0
+
+
+def test_delay_moves_one_departure_and_keeps_its_id():
+    scheduler = MilestoneScheduler(ignore)
+    departures = daily(scheduler)
+    assert scheduler.delay(GUILD, "QF1", departures[0], 30) == 1
+
+    moved = [job for job in scheduler.jobs.values() if scheduled_departure(job) == departures[0]]
+    assert len(moved) == 1
+    assert moved[0]["departure"] == departures[0] + 30 * 60
+    assert moved[0]["due"] == departures[0] - 15 * 60
+    # Still found by the time it was scheduled for, so it can be delayed again
+    assert scheduler.delay(GUILD, "QF1", departures[0], 30) == 1
+    assert scheduler.departures(GUILD, "QF1") == departures
+    others = [job for job in scheduler.jobs.values() if scheduled_departure(job) != departures[0]]
+    assert all(job["departure"] == scheduled_departure(job) for job in others)
+
+
+def test_jobs_stored_without_a_scheduled_departure_are_still_found():
+    scheduler = MilestoneScheduler(ignore)
+    departure = int(time.time()) + 2 * HOUR
+    scheduler._push({
+        "id": f"{GUILD}:QF1:checkin_closed", "flight": f"{GUILD}:QF1", "milestone": "checkin_closed",
+        "due": departure - 45 * 60, "departure": departure, "guild_id": GUILD,
+        "airline": "Qantas", "flight_number": "QF1",
+    })
+    assert scheduler.departures(GUILD, "QF1") == [departure]
+    assert scheduler.cancel(GUILD, "QF1", departure) == 1
+
+
+class Guild:
+    id = GUILD
+
+
+class Message:
+    guild = Guild()
+
+    def __init__(self, message_id):
+        self.id = message_id
+        self.channel = self
+
+
+class Scheduler:
+    def __init__(self):
+        self.edits = []
+
+    def submit_edit(self, message, **kwargs):
+        self.edits.append(message.id)
+        return asyncio.get_running_loop().create_future()
+
+
+def test_live_delay_moves_one_departure():
+    async def main():
+        edits = Scheduler()
+        board = LiveStatusBoard(edits, status_phases({"checkin_closed": 45}))
+        first = int(time.time()) + 2 * HOUR
+        for day in range(3):
+            values = {**VALUES, "departure_timestamp": first + day * DAY}
+            board.track(Message(day), "Qantas", values)
+
+        assert board.departures(GUILD, "QF1") == [first, first + DAY, first + 2 * DAY]
+        assert board.delay(GUILD, "QF1", first + DAY, 30) == 1
+        assert board.delay(GUILD, "QF1", first + DAY, 30) == 1
+        assert board.delay(GUILD, "QF2", first, 30) == 0
+        return board, edits, first
+
+    board, edits, first = asyncio.run(main())
+    assert edits.edits == [1, 1]
+    assert board.flights[1].departure == first + DAY + HOUR
+    assert board.flights[1].values["departure_timestamp"] == first + DAY + HOUR
+    assert board.flights[0].departure == first
+    assert board.flights[2].departure == first + 2 * DAY
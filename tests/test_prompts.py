@@ -0,0 +1,20 @@
+import discord
+import pytest
+
+from session import FlightSession
+from stages import PLANNING
+
+
+@pytest.mark.parametrize("airline, emoji, color", [
+    ("Qantas", "🦘", discord.Color.red()),
+    ("Jetstar", "⭐", discord.Color.green()),
+])
+def test_first_prompt_recaps_the_menu_choices(airline, emoji, color):
+    session = FlightSession(user_id=1, channel_id=2, airline=airline, aircraft="Boeing 787-9")
+    embed = PLANNING.prompt(session.stage, session)
+    assert embed.title == "🛫 Departure Airport"
+    assert embed.color == color
+    assert [(field.name, field.value) for field in embed.fields] == [
+        ("Airline", f"{emoji} {airline}"),
+        ("Aircraft", "✈️ Boeing 787-9"),
+    ]
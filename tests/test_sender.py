@@ -0,0 +1,136 @@
+import asyncio
+import time
+
+import discord
+import pytest
+
+import sender
+from sender import PRIORITY_BULK, PRIORITY_CHECKIN, PRIORITY_STATUS, OutboundScheduler
+
+
+class Channel:
+    """Records what was sent to it and when"""
+
+    def __init__(self, channel_id, log):
+        self.id = channel_id
+        self.log = log
+
+    async def send(self, **kwargs):
+        self.log.append((self.id, kwargs["content"], time.monotonic()))
+        return kwargs["content"]
+
+
+class Message:
+    def __init__(self, channel, log):
+        self.channel = channel
+        self.log = log
+
+    async def edit(self, **kwargs):
+        self.log.append((("edit", self.channel.id), kwargs["content"], time.monotonic()))
+
+
+class RateLimited(discord.HTTPException):
+    def __init__(self, retry_after):
+        self.status = 429
+        self.retry_after = retry_after
+
+
+def test_saturated_channel_does_not_hold_up_a_checkin_elsewhere(monkeypatch):
+    # One token every 0.4s per channel
+    monkeypatch.setattr(sender, "CHANNEL_PER", 2.0)
+
+    async def main():
+        log = []
+        busy, quiet = Channel(1, log), Channel(2, log)
+        outbound = OutboundScheduler(workers=4)
+        for number in range(20):
+            outbound.submit(busy, PRIORITY_BULK if number % 2 else PRIORITY_STATUS, content=f"bulk {number}")
+        # Spends the busy channel's burst and leaves its backlog queued
+        await asyncio.sleep(0.05)
+        started = time.monotonic()
+        assert await asyncio.wait_for(outbound.submit(quiet, PRIORITY_CHECKIN, content="checkin"), 1) == "checkin"
+        waited = time.monotonic() - started
+        pending = len(outbound)
+        await outbound.close()
+        return log, waited, pending
+
+    log, waited, pending = asyncio.run(main())
+    assert waited < 0.2
+    assert sum(1 for channel_id, *_ in log if channel_id == 1) == sender.CHANNEL_RATE
+    assert pending == 20 - sender.CHANNEL_RATE
+
+
+def test_one_channel_keeps_its_order(monkeypatch):
+    monkeypatch.setattr(sender, "CHANNEL_PER", 0.1)
+
+    async def main():
+        log = []
+        channel = Channel(1, log)
+        outbound = OutboundScheduler(workers=4)
+        futures = [outbound.submit(channel, PRIORITY_BULK, content=number) for number in range(15)]
+        await asyncio.gather(*futures)
+        await outbound.close()
+        return log
+
+    log = asyncio.run(main())
+    assert [content for _, content, _ in log] == list(range(15))
+
+
+def test_edits_do_not_spend_the_channel_post_budget(monkeypatch):
+    monkeypatch.setattr(sender, "CHANNEL_PER", 60.0)
+
+    async def main():
+        log = []
+        channel = Channel(1, log)
+        message = Message(channel, log)
+        outbound = OutboundScheduler()
+        edits = [outbound.submit_edit(message, content=number) for number in range(sender.CHANNEL_RATE)]
+        await asyncio.gather(*edits)
+        post = await asyncio.wait_for(outbound.submit(channel, PRIORITY_BULK, content="plan"), 1)
+        await outbound.close()
+        return post
+
+    assert asyncio.run(main()) == "plan"
+
+
+def test_rate_limited_request_is_retried_in_place(monkeypatch):
+    monkeypatch.setattr(sender, "CHANNEL_PER", 0.1)
+
+    async def main():
+        log = []
+        channel = Channel(1, log)
+        send = channel.send
+        failures = [RateLimited(0.05)]
+
+        async def flaky(**kwargs):
+            if failures:
+                raise failures.pop()
+            return await send(**kwargs)
+
+        channel.send = flaky
+        outbound = OutboundScheduler()
+        futures = [outbound.submit(channel, PRIORITY_BULK, content=number) for number in range(3)]
+        await asyncio.gather(*futures)
+        await outbound.close()
+        return outbound, log
+
+    outbound, log = asyncio.run(main())
+    assert outbound.stats["retries"] == 1
+    assert [content for _, content, _ in log] == [0, 1, 2]
+
+
+def test_close_cancels_parked_requests(monkeypatch):
+    monkeypatch.setattr(sender, "CHANNEL_PER", 60.0)
+
+    async def main():
+        channel = Channel(1, [])
+        outbound = OutboundScheduler()
+        futures = [outbound.submit(channel, PRIORITY_BULK, content=number) for number in range(sender.CHANNEL_RATE + 2)]
+        await asyncio.gather(*futures[:sender.CHANNEL_RATE])
+        await outbound.close()
+        return futures
+
+    futures = asyncio.run(main())
+    assert all(future.cancelled() for future in futures[sender.CHANNEL_RATE:])
+    with pytest.raises(asyncio.CancelledError):
+        futures[-1].result()
@@ -0,0 +1,80 @@
+import asyncio
+import threading
+import time
+
+import storage
+from storage import SQLiteMilestoneBackend, SQLiteSessionBackend
+
+
+def test_connection_is_opened_off_the_event_loop(tmp_path, monkeypatch):
+    threads = []
+    connect = storage.sqlite3.connect
+
+    def recording_connect(*args, **kwargs):
+        threads.append(threading.current_thread())
+        return connect(*args, **kwargs)
+
+    monkeypatch.setattr(storage.sqlite3, "connect", recording_connect)
+    path = tmp_path / "planner.db"
+
+    async def main():
+        backend = SQLiteSessionBackend(str(path))
+        # Nothing touches the disk until the first query
+        created_early = path.exists()
+        keys = await backend.keys(60)
+        await backend.close()
+        return created_early, keys
+
+    created_early, keys = asyncio.run(main())
+    assert not created_early
+    assert keys == []
+    assert len(threads) == 1
+    assert threads[0] is not threading.main_thread()
+
+
+def test_sessions_round_trip_and_expire(tmp_path):
+    path = str(tmp_path / "planner.db")
+
+    async def main():
+        backend = SQLiteSessionBackend(path)
+        await backend.write({1: {"channel_id": 10, "stage": 2}, 2: {"channel_id": 20}}, [])
+        await backend.write({}, [2])
+        await backend.close()
+
+        reopened = SQLiteSessionBackend(path)
+        keys = await reopened.keys(60)
+        doc = await reopened.load(1)
+        missing = await reopened.load(2)
+        expired = await reopened.keys(-1)
+        await reopened.close()
+        return keys, doc, missing, expired
+
+    keys, doc, missing, expired = asyncio.run(main())
+    assert keys == [(1, 10)]
+    assert doc == {"channel_id": 10, "stage": 2}
+    assert missing is None
+    assert expired == []
+
+
+def test_milestones_share_a_file_with_sessions(tmp_path):
+    path = str(tmp_path / "planner.db")
+    job = {"id": "1:QF1:1800000000:boarding", "due": time.time() + 60}
+
+    async def main():
+        sessions = SQLiteSessionBackend(path)
+        milestones = SQLiteMilestoneBackend(path)
+        await sessions.write({1: {"channel_id": 10}}, [])
+        await milestones.write({job["id"]: job}, [])
+        loaded = await milestones.load_all()
+        await milestones.write({}, [job["id"]])
+        emptied = await milestones.load_all()
+        await sessions.close()
+        await milestones.close()
+        # Closing twice, or without ever connecting, is harmless
+        await milestones.close()
+        await SQLiteMilestoneBackend(path).close()
+        return loaded, emptied
+
+    loaded, emptied = asyncio.run(main())
+    assert loaded == [job]
+    assert emptied == []
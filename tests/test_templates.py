@@ -0,0 +1,79 @@
+import discord
+import pytest
+
+from templates import AIRLINES, DEFAULT_AIRLINE, LAYOUTS, render
+
+VALUES = {
+    "flight_number": "QF1",
+    "aircraft": "A380-800",
+    "departure_code": "SYD",
+    "departure_name": "Sydney Kingsford Smith",
+    "departure_timestamp": 1800000000,
+    "arrival_code": "LHR",
+    "arrival_name": "London Heathrow",
+    "arrival_estimate": "\n<t:1800080000:F> (est.)",
+    "route_details": "\n**Distance:** 17,016 km",
+    "status": "Confirmed",
+}
+
+
+def expected(layout, airline):
+    """The embed built the slow, obvious way: format every field, then from_dict"""
+    brand = AIRLINES.get(airline, AIRLINES[DEFAULT_AIRLINE])
+    values = {**brand, **VALUES}
+    return discord.Embed.from_dict({
+        "type": "rich",
+        "color": brand["color"],
+        "thumbnail": {"url": brand["logo"]},
+        "footer": {"text": brand["footer"], "icon_url": brand["logo"]},
+        "fields": [
+            {"name": name.format_map(values), "value": value.format_map(values), "inline": inline}
+            for name, value, inline in LAYOUTS[layout]
+        ],
+    })
+
+
+@pytest.mark.parametrize("airline", [*AIRLINES, "Unknown Air"])
+@pytest.mark.parametrize("layout", LAYOUTS)
+def test_render_matches_formatting_every_field(layout, airline):
+    embed = render(layout, airline, VALUES)
+    assert isinstance(embed, discord.Embed)
+    assert embed.to_dict() == expected(layout, airline).to_dict()
+
+
+def test_renders_do_not_share_fields():
+    first = render("flight_plan", "Qantas", VALUES)
+    second = render("flight_plan", "Qantas", {**VALUES, "flight_number": "QF2"})
+    first.set_field_at(5, name="changed", value="changed")
+    first.add_field(name="extra", value="extra")
+
+    assert second.fields[0].value.startswith("**Flight QF2**")
+    assert second.fields[5].name != "changed"
+    assert len(second.fields) == len(LAYOUTS["flight_plan"])
+    assert render("flight_plan", "Qantas", VALUES).to_dict() == expected("flight_plan", "Qantas").to_dict()
+
+
+def test_values_are_inserted_verbatim():
+    embed = render("flight_plan", "Jetstar", {**VALUES, "departure_name": "{not a placeholder} 100%"})
+    assert "**SYD** {not a placeholder} 100%\n" in embed.fields[1].value
+
+
+def test_missing_value_raises():
+    values = dict(VALUES)
+    del values["status"]
+    with pytest.raises(KeyError):
+        render("flight_plan", "Qantas", values)
+
+
+def test_changing_a_rendered_embed_leaves_the_next_render_alone():
+    first = render("flight_plan", "Qantas", VALUES)
+    # to_dict hands back the embed's own nested dicts
+    data = first.to_dict()
+    data["footer"]["text"] = "changed"
+    data["thumbnail"]["url"] = "https://example.com/changed.png"
+    data["fields"][0]["name"] = "changed"
+    first.set_footer(text="replaced")
+    first.set_thumbnail(url=None)
+
+    second = render("flight_plan", "Qantas", VALUES)
+    assert second.to_dict() == expected("flight_plan", "Qantas").to_dict()
@@ -0,0 +1,157 @@
+import random
+import string
+from datetime import date, timedelta
+
+import pytest
+
+from timeparse import MONTHS, ParsedDateTime, parse_datetime
+
+TODAY = date(2026, 10, 18)
+FULL_MONTHS = ("january", "february", "march", "april", "may", "june", "july",
+               "august", "september", "october", "november", "december")
+SUFFIXES = {1: "st", 2: "nd", 3: "rd", 21: "st", 22: "nd", 23: "rd", 31: "st"}
+CASES = 2000
+
+
+def random_day(rng):
+    # Two-digit years read as 20xx, so stay within this century
+    return date(2000, 1, 1) + timedelta(days=rng.randrange(36524))
+
+
+def date_forms(rng, day):
+    """Every accepted way of writing ``day`` when ``TODAY`` is today"""
+    d, m, y = day.day, day.month, day.year
+    forms = [
+        f"{y}-{m:02d}-{d:02d}",
+        f"{y}-{m}-{d}",
+    ]
+    for sep in "/-. ":
+        forms.append(f"{d}{sep}{m}{sep}{y}")
+        forms.append(f"{d:02d}{sep}{m:02d}{sep}{y % 100:02d}")
+    month = rng.choice((MONTHS[m - 1], FULL_MONTHS[m - 1], MONTHS[m - 1] + "."))
+    month = rng.choice((month, month.title(), month.upper()))
+    suffix = SUFFIXES.get(d, "th")
+    forms.append(f"{d} {month} {y}")
+    forms.append(f"{d}{suffix} {month} {y}")
+    forms.append(f"{d}{month} {y}")
+    return forms
+
+
+def yearless_forms(day):
+    """Named-month forms without a year; they read as the next such day"""
+    return [f"{day.day} {MONTHS[day.month - 1]}", f"{day.day}{SUFFIXES.get(day.day, 'th')} {FULL_MONTHS[day.month - 1]}"]
+
+
+def time_forms(rng, minutes):
+    """Every accepted way of writing ``minutes`` after midnight"""
+    h, m = divmod(minutes, 60)
+    twelve = h % 12 or 12
+    meridiem = rng.choice(("am", "AM", "a.m.", "a.m", " am")) if h < 12 else rng.choice(("pm", "PM", "p.m.", "p.m", " pm"))
+    forms = [
+        f"{h:02d}:{m:02d}",
+        f"{h}:{m:02d}",
+        f"{h}.{m:02d}",
+        f"{h:02d}{m:02d}",
+        f"{twelve}:{m:02d}{meridiem}",
+    ]
+    if m == 0:
+        forms.append(f"{twelve}{meridiem}")
+    return forms
+
+
+def test_every_date_form_round_trips():
+    rng = random.Random(1604)
+    for _ in range(CASES):
+        day = random_day(rng)
+        for text in date_forms(rng, day):
+            assert parse_datetime(text, TODAY) == ParsedDateTime(None, day), text
+
+
+def test_every_time_form_round_trips():
+    rng = random.Random(1605)
+    for _ in range(CASES):
+        minutes = rng.randrange(24 * 60)
+        for text in time_forms(rng, minutes):
+            assert parse_datetime(text, TODAY) == ParsedDateTime(minutes, None), text
+
+
+def test_time_and_date_together_in_either_order():
+    rng = random.Random(1606)
+    for _ in range(CASES):
+        day, minutes = random_day(rng), rng.randrange(24 * 60)
+        date_text = rng.choice(date_forms(rng, day))
+        time_text = rng.choice(time_forms(rng, minutes))
+        for text in (f"{date_text} at {time_text}", f"{time_text} on {date_text}", f"{time_text}, {date_text}"):
+            assert parse_datetime(text, TODAY) == ParsedDateTime(minutes, day), text
+
+
+def test_iso_date_with_time():
+    rng = random.Random(1607)
+    for _ in range(CASES):
+        day, minutes = random_day(rng), rng.randrange(24 * 60)
+        h, m = divmod(minutes, 60)
+        for text in (f"{day.isoformat()}T{h:02d}:{m:02d}", f"{day.isoformat()} {h}:{m:02d}:00"):
+            assert parse_datetime(text, TODAY) == ParsedDateTime(minutes, day), text
+
+
+def test_yearless_dates_are_never_in_the_past():
+    rng = random.Random(1608)
+    for _ in range(CASES):
+        day = TODAY + timedelta(days=rng.randrange(-400, 400))
+        for text in yearless_forms(day):
+            parsed = parse_datetime(text, TODAY)
+            if day.month == 2 and day.day == 29:
+                # Only valid in leap years; the next occurrence may not exist
+                continue
+            assert parsed.day >= TODAY, text
+            assert (parsed.day.month, parsed.day.day) == (day.month, day.day), text
+            assert parsed.day - TODAY < timedelta(days=366), text
+
+
+def test_relative_days():
+    assert parse_datetime("today", TODAY) == ParsedDateTime(None, TODAY)
+    for word in ("tomorrow", "Tomorrow", "tmrw", "tmr"):
+        assert parse_datetime(word, TODAY) == ParsedDateTime(None, TODAY + timedelta(days=1))
+    assert parse_datetime("tomorrow at 7pm", TODAY) == ParsedDateTime(19 * 60, TODAY + timedelta(days=1))
+
+
+@pytest.mark.parametrize("text", [
+    "",
+    "   ",
+    "soon",
+    "at",
+    "at on",
+    "24:00",
+    "12:60",
+    "2460",
+    "13pm",
+    "0am",
+    "13:30pm",
+    "31/02/2026",
+    "29/02/2027",
+    "2026-13-01",
+    "2026-12-32",
+    "32 jan",
+    "14:30 15:00",
+    "1430 2:30pm",
+    "today tomorrow",
+    "25/01/2026 2026-01-25",
+    "14:30x",
+    "14:30 later",
+    "12345",
+    "1430/2026",
+    "14:30/01",
+])
+def test_rejects(text):
+    assert parse_datetime(text, TODAY) is None
+
+
+def test_never_raises_on_noise():
+    rng = random.Random(1609)
+    alphabet = string.digits + " :/.-,apmtAPMonjanfebocttoday"
+    for _ in range(CASES * 5):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randrange(1, 24)))
+        result = parse_datetime(text, TODAY)
+        assert result is None or isinstance(result, ParsedDateTime)
+        if result is not None and result.minutes is not None:
+            assert 0 <= result.minutes < 24 * 60
@@ -0,0 +1,69 @@
+from datetime import date, datetime, timezone
+
+import pytest
+
+from timezones import DEFAULT_TIMEZONE, airport_timezone, get_zone, local_timestamp
+
+
+def utc(*args):
+    return int(datetime(*args, tzinfo=timezone.utc).timestamp())
+
+
+def at(hour, minute=0):
+    return hour * 60 + minute
+
+
+def test_ordinary_time():
+    # AEST, UTC+10
+    assert local_timestamp("Australia/Sydney", date(2026, 7, 1), at(9, 30)) == utc(2026, 6, 30, 23, 30)
+    # EDT, UTC-4
+    assert local_timestamp("America/New_York", date(2026, 7, 1), at(9, 30)) == utc(2026, 7, 1, 13, 30)
+
+
+def test_day_may_be_an_ordinal():
+    day = date(2026, 7, 1)
+    assert local_timestamp("Australia/Sydney", day.toordinal(), at(9)) == local_timestamp("Australia/Sydney", day, at(9))
+
+
+@pytest.mark.parametrize("zone_name, day, skipped, expected", [
+    # Sydney jumps from 02:00 AEST to 03:00 AEDT; 02:30 reads as 03:30 AEDT
+    ("Australia/Sydney", date(2026, 10, 4), at(2, 30), utc(2026, 10, 3, 16, 30)),
+    # New York jumps from 02:00 EST to 03:00 EDT; 02:30 reads as 03:30 EDT
+    ("America/New_York", date(2026, 3, 8), at(2, 30), utc(2026, 3, 8, 7, 30)),
+])
+def test_skipped_time_moves_past_the_gap(zone_name, day, skipped, expected):
+    timestamp = local_timestamp(zone_name, day, skipped)
+    assert timestamp == expected
+    # An hour after the same wall-clock time is the same instant
+    assert timestamp == local_timestamp(zone_name, day, skipped + 60)
+
+
+@pytest.mark.parametrize("zone_name, day, repeated, expected", [
+    # Sydney goes back from 03:00 AEDT to 02:00 AEST; the first 02:30 is AEDT
+    ("Australia/Sydney", date(2026, 4, 5), at(2, 30), utc(2026, 4, 4, 15, 30)),
+    # New York goes back from 02:00 EDT to 01:00 EST; the first 01:30 is EDT
+    ("America/New_York", date(2026, 11, 1), at(1, 30), utc(2026, 11, 1, 5, 30)),
+])
+def test_repeated_time_resolves_to_first_occurrence(zone_name, day, repeated, expected):
+    timestamp = local_timestamp(zone_name, day, repeated)
+    assert timestamp == expected
+    # The hour before the change is still an hour earlier
+    assert local_timestamp(zone_name, day, repeated - 60) == expected - 3600
+
+
+@pytest.mark.parametrize("zone_name, day", [
+    ("Australia/Sydney", date(2026, 4, 5)),
+    ("America/New_York", date(2026, 11, 1)),
+])
+def test_repeated_hour_keeps_wall_clock_order(zone_name, day):
+    # Picking the first occurrence keeps later inputs at later instants
+    timestamps = [local_timestamp(zone_name, day, minutes) for minutes in range(0, 24 * 60, 15)]
+    assert timestamps == sorted(timestamps)
+
+
+def test_unknown_zone_falls_back_to_default():
+    assert get_zone("Mars/Olympus_Mons") is get_zone(DEFAULT_TIMEZONE)
+    assert get_zone(None) is get_zone(DEFAULT_TIMEZONE)
+    assert airport_timezone({"timezone": "Mars/Olympus_Mons"}) == DEFAULT_TIMEZONE
+    assert airport_timezone({"timezone": "America/New_York"}) == "America/New_York"
+    assert airport_timezone(None) == DEFAULT_TIMEZONE